@@ -1,19 +1,33 @@
-import { MongoClient, Db } from 'mongodb';
 import { v4 as uuidv4 } from 'uuid';
+import { Collection } from 'mongodb';
 import { NextRequest, NextResponse } from 'next/server';
-
-// MongoDB connection
-let client: MongoClient | null = null;
-let db: Db | null = null;
-
-async function connectToMongo(): Promise<Db> {
-  if (!client) {
-    client = new MongoClient(process.env.MONGO_URL!);
-    await client.connect();
-    db = client.db(process.env.DB_NAME);
-  }
-  return db!;
-}
+import { connectToMongo, getPoolMetrics } from '@/lib/db';
+import {
+  bulkUpsertStudents, DEFAULT_STUDENT_PASSWORD, defaultPasswordHash, ingestStudentStream, toStudentDocument
+} from '@/lib/student-import';
+import { getPasswordHashMetrics, hashPassword, verifyPassword } from '@/lib/password';
+import {
+  clearSessionCookies, issueSession, refreshTokenFromRequest, SESSION_ROLES, sessionFromRequest,
+  SessionRole, setSessionCookies, verifyToken
+} from '@/lib/session';
+import { streamCSVRows, streamExcelRows } from '@/lib/excel-parser';
+import { verifyQueryPlans } from '@/lib/indexes';
+import { findPage, PageCursor, parseCursor, parseLimit, Page } from '@/lib/pagination';
+import { adjustStats, batchStatusDelta, getStats, rebuildStats, statusDelta } from '@/lib/stats';
+import { subscribe } from '@/lib/notification-hub';
+import { RouteHandler, Router } from '@/lib/router';
+import { observeRequest, renderMetrics } from '@/lib/metrics';
+import { getCertificate, hasCertificate } from '@/lib/certificates';
+import { bytesResponse, strongETag } from '@/lib/byte-range';
+import { createZip } from '@/lib/zip';
+import { enqueueNotifications, getNotificationQueueMetrics } from '@/lib/notification-queue';
+import { encodedResponse } from '@/lib/compression';
+import { columnarChunks, jsonArrayChunks } from '@/lib/json-stream';
+import { CATALOG_CACHE_CONTROL, CatalogSnapshot, getCatalog, invalidateCatalog } from '@/lib/catalog';
+import {
+  createdAtRange, EXPORT_CONTENT_TYPES, ExportColumn, exportChunks, ExportFormat, exportRows,
+  parseExportFormat, REQUEST_EXPORT_COLUMNS, STUDENT_EXPORT_COLUMNS
+} from '@/lib/export';
 
 // Helper function to handle CORS
 function handleCORS(response: NextResponse): NextResponse {
@@ -24,6 +38,74 @@ function handleCORS(response: NextResponse): NextResponse {
   return response;
 }
 
+type ListFormat = 'rows' | 'columns';
+
+// `?format=columns` sends field names once; null means an unknown format was asked for
+function parseListFormat(url: URL): ListFormat | null {
+  const format = url.searchParams.get('format');
+  if (!format || format === 'rows') return 'rows';
+  return format === 'columns' ? 'columns' : null;
+}
+
+function invalidFormatResponse(): NextResponse {
+  return handleCORS(NextResponse.json(
+    { error: 'format must be rows or columns' },
+    { status: 400 }
+  ));
+}
+
+// Return a page as a plain array (or columns), with the cursor for the next page in a header.
+// Rows are serialized as the body is read, and compressed when it is big enough.
+async function pageResponse(request: NextRequest, page: Page<any>, format: ListFormat): Promise<NextResponse> {
+  const headers: Record<string, string> = {
+    'Content-Type': 'application/json',
+    'Access-Control-Expose-Headers': 'X-Next-Cursor'
+  };
+  if (page.nextCursor) {
+    headers['X-Next-Cursor'] = page.nextCursor;
+  }
+  const chunks = format === 'columns' ? columnarChunks(page.items) : jsonArrayChunks(page.items);
+  return handleCORS(await encodedResponse(request, chunks, headers));
+}
+
+interface ExportParams {
+  format: ExportFormat;
+  range: Record<string, any>;
+  after: PageCursor | null;
+}
+
+// format, from/to and the resume cursor shared by the export endpoints; a string is the error to report
+function parseExportParams(url: URL): ExportParams | string {
+  const format = parseExportFormat(url.searchParams.get('format'));
+  if (!format) return 'format must be ndjson, csv or xlsx';
+  const range = createdAtRange(url.searchParams.get('from'), url.searchParams.get('to'));
+  if (!range) return 'from and to must be dates (YYYY-MM-DD) or ISO timestamps';
+  // Unlike the list endpoints, a bad cursor is an error: restarting from the top would duplicate rows
+  const afterParam = url.searchParams.get('after');
+  const after = parseCursor(afterParam);
+  if (afterParam && !after) return 'after must be <createdAt>,<id> of the last row received';
+  return { format, range, after };
+}
+
+// Stream an export as a download named <name>-<date>.<format>
+async function exportResponse(
+  request: NextRequest,
+  name: string,
+  params: ExportParams,
+  rows: AsyncIterable<Record<string, any>>,
+  columns: ExportColumn[]
+): Promise<NextResponse> {
+  const { format, after } = params;
+  const filename = `${name.toLowerCase()}-${new Date().toISOString().slice(0, 10)}.${format}`;
+  const chunks = exportChunks(format, rows, columns, { sheetName: name, header: !after });
+  return handleCORS(await encodedResponse(request, chunks, {
+    'Content-Type': EXPORT_CONTENT_TYPES[format],
+    'Content-Disposition': `attachment; filename="${filename}"`,
+    'Cache-Control': 'no-store',
+    'Access-Control-Expose-Headers': 'Content-Disposition'
+  }, { compress: format !== 'xlsx' }));
+}
+
 // OPTIONS handler for CORS
 export async function OPTIONS(): Promise<NextResponse> {
   return handleCORS(new NextResponse(null, { status: 200 }));
@@ -60,16 +142,37 @@ function getServiceName(type: string): string {
   }
 }
 
-// Create notification helper
-async function createNotification(
-  db: Db,
+// Notification sent to the student when a request is approved or rejected
+function statusNotification(
+  serviceType: string,
+  status: string,
+  remarks?: string
+): { title: string; message: string; type: 'success' | 'error' } | null {
+  if (status !== 'approved' && status !== 'rejected') return null;
+  const serviceName = getServiceName(serviceType);
+  if (status === 'approved') {
+    return {
+      title: `${serviceName} Approved!`,
+      message: `Your ${serviceName} request has been approved. You can now download it from your dashboard.`,
+      type: 'success'
+    };
+  }
+  return {
+    title: `${serviceName} Rejected`,
+    message: `Your ${serviceName} request has been rejected. ${remarks ? `Reason: ${remarks}` : 'Please contact the academic section for more details.'}`,
+    type: 'error'
+  };
+}
+
+// Build a notification document; delivery goes through the background queue
+function newNotification(
   userId: string,
   title: string,
   message: string,
   type: 'success' | 'info' | 'warning' | 'error',
   relatedRequestId?: string
-): Promise<void> {
-  await db.collection('notifications').insertOne({
+): Record<string, any> {
+  return {
     id: uuidv4(),
     userId,
     title,
@@ -78,533 +181,1072 @@ async function createNotification(
     read: false,
     relatedRequestId,
     createdAt: new Date()
-  });
+  };
 }
 
-// Route handler function
-async function handleRoute(
-  request: NextRequest,
-  { params }: { params: { path?: string[] } }
-): Promise<NextResponse> {
-  const { path = [] } = params;
-  const route = `/${path.join('/')}`;
-  const method = request.method;
+// Route table: method + path pattern -> handler, compiled once at module load.
+// Every request's access token is verified up front; handlers read it from `session`.
+const router = new Router().authenticate(sessionFromRequest);
 
-  try {
-    const db = await connectToMongo();
+// Only run the handler for a caller whose verified session has one of these roles
+function requireRole<P extends string>(roles: SessionRole[], handler: RouteHandler<P>): RouteHandler<P> {
+  return async context => {
+    if (!context.session) {
+      return handleCORS(NextResponse.json(
+        { error: 'Authentication required' },
+        { status: 401, headers: { 'WWW-Authenticate': 'Bearer' } }
+      ));
+    }
+    if (!roles.includes(context.session.role)) {
+      return handleCORS(NextResponse.json({ error: 'Not allowed for this role' }, { status: 403 }));
+    }
+    return handler(context);
+  };
+}
+
+const SLOW_REQUEST_MS = parseInt(process.env.SLOW_REQUEST_MS || '1000', 10);
+router.onTiming(timing => {
+  observeRequest(timing);
+  if (timing.durationMs > SLOW_REQUEST_MS) {
+    console.warn(`Slow request: ${timing.method} ${timing.pattern} -> ${timing.status} in ${timing.durationMs.toFixed(0)}ms`);
+  }
+});
+
+
+// Root endpoint - GET /api and GET /api/root
+const rootHandler = async () => handleCORS(NextResponse.json({ message: 'Institute Service Portal API' }));
+router.get('/', rootHandler);
+router.get('/root', rootHandler);
 
-    // Root endpoint
-    if ((route === '/' || route === '/root') && method === 'GET') {
-      return handleCORS(NextResponse.json({ message: 'Institute Service Portal API' }));
+// ============ AUTH ROUTES ============
+
+// Answer a login or refresh with the account and a fresh access/refresh token pair
+function sessionResponse(request: NextRequest, user: Record<string, any>, message: string): NextResponse {
+  const issued = issueSession({ id: user.id, role: user.role, name: user.name });
+  const response = NextResponse.json({ user, accessToken: issued.accessToken, expiresIn: issued.expiresIn, message });
+  setSessionCookies(response, issued, new URL(request.url).protocol === 'https:');
+  return handleCORS(response);
+}
+
+// Check a login password. A plaintext or outdated stored value is replaced with a fresh hash
+// in the background; the update is conditional on the old value so a concurrent change wins.
+async function checkPassword(
+  collection: Collection,
+  account: Record<string, any>,
+  password: string,
+  fallback = ''
+): Promise<boolean> {
+  const { valid, needsRehash } = await verifyPassword(password, account.password || fallback);
+  if (needsRehash) {
+    hashPassword(password)
+      .then(hash => collection.updateOne({ id: account.id, password: account.password ?? null }, { $set: { password: hash } }))
+      .catch(error => console.error('Password rehash failed:', error.message));
+  }
+  return valid;
+}
+
+// Login - POST /api/auth/login
+router.post('/auth/login', async ({ request, getDb }) => {
+  const db = await getDb();
+  const body = await request.json();
+  const { userId, password, role, name } = body;
+  
+  if (!userId || !password || !role) {
+    return handleCORS(NextResponse.json(
+      { error: 'userId, password, and role are required' },
+      { status: 400 }
+    ));
+  }
+
+  // For Academic/Admin login
+  if (role === 'academic') {
+    let user = await db.collection('users').findOne({ userId, role: 'academic' });
+    
+    if (!user) {
+      user = {
+        id: uuidv4(),
+        userId,
+        name: name || 'Academic Admin',
+        role: 'academic',
+        password: await hashPassword(password),
+        createdAt: new Date()
+      };
+      await db.collection('users').insertOne(user);
+    } else if (!await checkPassword(db.collection('users'), user, password)) {
+      return handleCORS(NextResponse.json(
+        { error: 'Invalid credentials' },
+        { status: 401 }
+      ));
     }
+    
+    const { password: _, _id, ...userData } = user;
+    return sessionResponse(request, userData, 'Login successful');
+  }
 
-    // ============ AUTH ROUTES ============
+  // For Faculty login
+  if (role === 'faculty') {
+    let user = await db.collection('users').findOne({ userId, role: 'faculty' });
     
-    // Login - POST /api/auth/login
-    if (route === '/auth/login' && method === 'POST') {
-      const body = await request.json();
-      const { userId, password, role, name } = body;
-      
-      if (!userId || !password || !role) {
-        return handleCORS(NextResponse.json(
-          { error: 'userId, password, and role are required' },
-          { status: 400 }
-        ));
-      }
+    if (!user) {
+      user = {
+        id: uuidv4(),
+        userId,
+        name: name || 'Faculty Member',
+        role: 'faculty',
+        password: await hashPassword(password),
+        department: 'General',
+        createdAt: new Date()
+      };
+      await db.collection('users').insertOne(user);
+    } else if (!await checkPassword(db.collection('users'), user, password)) {
+      return handleCORS(NextResponse.json(
+        { error: 'Invalid credentials' },
+        { status: 401 }
+      ));
+    }
+    
+    const { password: _, _id, ...userData } = user;
+    return sessionResponse(request, userData, 'Login successful');
+  }
 
-      // For Academic/Admin login
-      if (role === 'academic') {
-        let user = await db.collection('users').findOne({ userId, role: 'academic' });
-        
-        if (!user) {
-          user = {
-            id: uuidv4(),
-            userId,
-            name: name || 'Academic Admin',
-            role: 'academic',
-            password,
-            createdAt: new Date()
-          };
-          await db.collection('users').insertOne(user);
-        } else if (user.password !== password) {
-          return handleCORS(NextResponse.json(
-            { error: 'Invalid credentials' },
-            { status: 401 }
-          ));
-        }
-        
-        const { password: _, _id, ...userData } = user;
-        return handleCORS(NextResponse.json({ user: userData, message: 'Login successful' }));
-      }
+  // For Student login
+  if (role === 'student') {
+    const student = await db.collection('students').findOne({ email: userId });
+    
+    if (!student) {
+      return handleCORS(NextResponse.json(
+        { error: 'Student not found. Please contact Academic section.' },
+        { status: 404 }
+      ));
+    }
+    
+    if (!await checkPassword(db.collection('students'), student, password, DEFAULT_STUDENT_PASSWORD)) {
+      return handleCORS(NextResponse.json(
+        { error: 'Invalid password' },
+        { status: 401 }
+      ));
+    }
+    
+    const { _id, password: _, ...studentData } = student;
+    return sessionResponse(request, { ...studentData, role: 'student' }, 'Login successful');
+  }
 
-      // For Faculty login
-      if (role === 'faculty') {
-        let user = await db.collection('users').findOne({ userId, role: 'faculty' });
-        
-        if (!user) {
-          user = {
-            id: uuidv4(),
-            userId,
-            name: name || 'Faculty Member',
-            role: 'faculty',
-            password,
-            department: 'General',
-            createdAt: new Date()
-          };
-          await db.collection('users').insertOne(user);
-        } else if (user.password !== password) {
-          return handleCORS(NextResponse.json(
-            { error: 'Invalid credentials' },
-            { status: 401 }
-          ));
-        }
-        
-        const { password: _, _id, ...userData } = user;
-        return handleCORS(NextResponse.json({ user: userData, message: 'Login successful' }));
-      }
+  return handleCORS(NextResponse.json(
+    { error: 'Invalid role' },
+    { status: 400 }
+  ));
+});
 
-      // For Student login
-      if (role === 'student') {
-        const student = await db.collection('students').findOne({ email: userId });
-        
-        if (!student) {
-          return handleCORS(NextResponse.json(
-            { error: 'Student not found. Please contact Academic section.' },
-            { status: 404 }
-          ));
-        }
-        
-        const studentPassword = student.password || 'student@123';
-        if (password !== studentPassword) {
-          return handleCORS(NextResponse.json(
-            { error: 'Invalid password' },
-            { status: 401 }
-          ));
-        }
-        
-        const { _id, password: _, ...studentData } = student;
-        return handleCORS(NextResponse.json({ 
-          user: { ...studentData, role: 'student' }, 
-          message: 'Login successful' 
-        }));
-      }
+// Exchange a refresh token for a new token pair - POST /api/auth/refresh
+// The refresh token comes from its cookie, or `{ refreshToken }` for clients without cookies.
+// The old refresh token stays valid until it expires; the account is re-read so removed users can't renew.
+router.post('/auth/refresh', async ({ request, getDb }) => {
+  const body = await request.json().catch(() => ({}));
+  const token = refreshTokenFromRequest(request) || (typeof body.refreshToken === 'string' ? body.refreshToken : null);
+  const claims = token ? verifyToken(token, 'refresh') : null;
+  const unauthorized = (error: string) => {
+    const response = NextResponse.json({ error }, { status: 401 });
+    clearSessionCookies(response);
+    return handleCORS(response);
+  };
+  if (!claims) return unauthorized('Invalid or expired refresh token');
+
+  const db = await getDb();
+  if (claims.role === 'student') {
+    const student = await db.collection('students').findOne({ id: claims.sub }, { projection: { _id: 0, password: 0 } });
+    if (!student) return unauthorized('Account no longer exists');
+    return sessionResponse(request, { ...student, role: 'student' }, 'Session refreshed');
+  }
+  const user = await db.collection('users').findOne({ id: claims.sub, role: claims.role }, { projection: { _id: 0, password: 0 } });
+  if (!user) return unauthorized('Account no longer exists');
+  return sessionResponse(request, user, 'Session refreshed');
+});
+
+// Logout - POST /api/auth/logout (tokens are stateless; this drops the cookies)
+router.post('/auth/logout', async () => {
+  const response = NextResponse.json({ message: 'Logged out' });
+  clearSessionCookies(response);
+  return handleCORS(response);
+});
+
+// Current session - GET /api/auth/me
+router.get('/auth/me', requireRole(SESSION_ROLES, async ({ session }) => {
+  const { sub, role, name, exp } = session!;
+  return handleCORS(NextResponse.json({ id: sub, role, name, expiresAt: new Date(exp * 1000).toISOString() }));
+}));
+
+// ============ STUDENT ROUTES ============
 
+// Upload students via CSV/Excel - POST /api/students/upload
+router.post('/students/upload', async ({ request, getDb }) => {
+  const db = await getDb();
+  const body = await request.json();
+  const { csvData, students: studentsList } = body;
+  
+  let studentsToInsert: any[] = [];
+  const passwordHash = await defaultPasswordHash();
+
+  // Handle direct student list (from Excel)
+  if (studentsList && Array.isArray(studentsList)) {
+    studentsToInsert = studentsList.map(student => toStudentDocument(student, passwordHash));
+  }
+  // Handle CSV data
+  else if (csvData) {
+    const students = parseCSV(csvData);
+    
+    if (students.length === 0) {
       return handleCORS(NextResponse.json(
-        { error: 'Invalid role' },
+        { error: 'No valid data found' },
         { status: 400 }
       ));
     }
 
-    // ============ STUDENT ROUTES ============
-    
-    // Upload students via CSV/Excel - POST /api/students/upload
-    if (route === '/students/upload' && method === 'POST') {
-      const body = await request.json();
-      const { csvData, students: studentsList } = body;
-      
-      let studentsToInsert: any[] = [];
-
-      // Handle direct student list (from Excel)
-      if (studentsList && Array.isArray(studentsList)) {
-        studentsToInsert = studentsList.map((s: any) => ({
-          id: uuidv4(),
-          name: s.name || '',
-          email: s.email || '',
-          rollNo: s.rollNo || '',
-          department: s.department || '',
-          password: 'student@123',
-          createdAt: new Date()
-        }));
-      }
-      // Handle CSV data
-      else if (csvData) {
-        const students = parseCSV(csvData);
-        
-        if (students.length === 0) {
-          return handleCORS(NextResponse.json(
-            { error: 'No valid data found' },
-            { status: 400 }
-          ));
-        }
+    studentsToInsert = students.map(s => ({
+      id: uuidv4(),
+      name: s.name || '',
+      email: s.email || s.email_id || '',
+      rollNo: s.roll_no || s.rollno || '',
+      department: s.department || '',
+      password: passwordHash,
+      createdAt: new Date()
+    }));
+  } else {
+    return handleCORS(NextResponse.json(
+      { error: 'No data provided' },
+      { status: 400 }
+    ));
+  }
 
-        studentsToInsert = students.map(s => ({
-          id: uuidv4(),
-          name: s.name || '',
-          email: s.email || s.email_id || '',
-          rollNo: s.roll_no || s.rollno || '',
-          department: s.department || '',
-          password: 'student@123',
-          createdAt: new Date()
-        }));
-      } else {
-        return handleCORS(NextResponse.json(
-          { error: 'No data provided' },
-          { status: 400 }
-        ));
-      }
+  // Remove duplicates based on email using chunked bulk upserts
+  const result = await bulkUpsertStudents(db, studentsToInsert);
+  const uploadedCount = result.inserted + result.updated;
+  await adjustStats(db, { totalStudents: result.inserted });
 
-      // Remove duplicates based on email using upsert
-      let insertedCount = 0;
-      for (const student of studentsToInsert) {
-        if (student.email) {
-          await db.collection('students').updateOne(
-            { email: student.email },
-            { $set: student },
-            { upsert: true }
-          );
-          insertedCount++;
-        }
-      }
+  return handleCORS(NextResponse.json({ 
+    message: `${uploadedCount} students uploaded successfully`,
+    count: uploadedCount,
+    ...result
+  }));
+});
 
-      return handleCORS(NextResponse.json({ 
-        message: `${insertedCount} students uploaded successfully`,
-        count: insertedCount
-      }));
-    }
+// Stream a raw CSV/XLSX upload - POST /api/students/upload/stream?format=csv|xlsx
+// Responds with NDJSON progress events while rows are written in batches.
+router.post('/students/upload/stream', async ({ request, url, getDb }) => {
+  const db = await getDb();
+  const contentType = request.headers.get('content-type') || '';
+  const format = url.searchParams.get('format') || (contentType.includes('csv') ? 'csv' : 'xlsx');
 
-    // Get all students - GET /api/students
-    if (route === '/students' && method === 'GET') {
-      const students = await db.collection('students').find({}).toArray();
-      const cleanedStudents = students.map(({ _id, password, ...rest }) => rest);
-      return handleCORS(NextResponse.json(cleanedStudents));
-    }
+  if (!request.body) {
+    return handleCORS(NextResponse.json(
+      { error: 'No data provided' },
+      { status: 400 }
+    ));
+  }
+  if (format !== 'csv' && format !== 'xlsx') {
+    return handleCORS(NextResponse.json(
+      { error: 'format must be csv or xlsx' },
+      { status: 400 }
+    ));
+  }
 
-    // Get single student by ID - GET /api/students/:id
-    if (route.startsWith('/students/') && method === 'GET' && path.length === 2) {
-      const studentId = path[1];
-      const student = await db.collection('students').findOne({ id: studentId });
-      
-      if (!student) {
-        return handleCORS(NextResponse.json(
-          { error: 'Student not found' },
-          { status: 404 }
-        ));
-      }
-      
-      const { _id, password, ...cleanedStudent } = student;
-      return handleCORS(NextResponse.json(cleanedStudent));
+  const rows = format === 'csv'
+    ? streamCSVRows(request.body)
+    : streamExcelRows(await request.arrayBuffer());
+
+  const encoder = new TextEncoder();
+  const { readable, writable } = new TransformStream<Uint8Array, Uint8Array>();
+  const writer = writable.getWriter();
+  const send = (event: Record<string, any>) =>
+    writer.write(encoder.encode(JSON.stringify(event) + '\n'));
+
+  (async () => {
+    try {
+      let countedInserts = 0;
+      const result = await ingestStudentStream(db, rows, {
+        onProgress: async ({ errors, ...counts }) => {
+          await adjustStats(db, { totalStudents: counts.inserted - countedInserts });
+          countedInserts = counts.inserted;
+          await send({ type: 'progress', ...counts });
+        }
+      });
+      const uploadedCount = result.inserted + result.updated;
+      await send({
+        type: 'done',
+        message: `${uploadedCount} students uploaded successfully`,
+        count: uploadedCount,
+        ...result
+      });
+    } catch (error: any) {
+      console.error('Upload stream error:', error);
+      await send({ type: 'error', error: error.message }).catch(() => {});
+    } finally {
+      await writer.close().catch(() => {});
     }
+  })();
 
-    // Update student profile - PUT /api/students/:id
-    if (route.startsWith('/students/') && method === 'PUT' && path.length === 2) {
-      const studentId = path[1];
-      const body = await request.json();
-      const { name, phone, address, dateOfBirth, guardianName, guardianPhone, bloodGroup } = body;
-      
-      const updateData: Record<string, any> = {
-        ...(name && { name }),
-        ...(phone && { phone }),
-        ...(address && { address }),
-        ...(dateOfBirth && { dateOfBirth }),
-        ...(guardianName && { guardianName }),
-        ...(guardianPhone && { guardianPhone }),
-        ...(bloodGroup && { bloodGroup }),
-        updatedAt: new Date()
-      };
+  return handleCORS(new NextResponse(readable, {
+    headers: { 'Content-Type': 'application/x-ndjson', 'Cache-Control': 'no-cache' }
+  }));
+});
 
-      const result = await db.collection('students').findOneAndUpdate(
-        { id: studentId },
-        { $set: updateData },
-        { returnDocument: 'after' }
-      );
+// Get students, newest first - GET /api/students?department=&after=<createdAt,id>&limit=&format=
+router.get('/students', async ({ request, url, getDb }) => {
+  const format = parseListFormat(url);
+  if (!format) return invalidFormatResponse();
+  const db = await getDb();
+  const department = url.searchParams.get('department');
 
-      if (!result) {
-        return handleCORS(NextResponse.json(
-          { error: 'Student not found' },
-          { status: 404 }
-        ));
-      }
+  const query: Record<string, any> = {};
+  if (department) {
+    query.department = department;
+  }
+
+  const page = await findPage(db.collection('students'), query, {
+    after: parseCursor(url.searchParams.get('after')),
+    limit: parseLimit(url.searchParams.get('limit')),
+    projection: { _id: 0, password: 0 }
+  });
+  return pageResponse(request, page, format);
+});
 
-      const { _id, password: _, ...cleanedResult } = result;
-      return handleCORS(NextResponse.json(cleanedResult));
+// Export students - GET /api/students/export?format=ndjson|csv|xlsx&department=&from=&to=&after=<createdAt,id>
+router.get('/students/export', requireRole(['academic'], async ({ request, url, getDb }) => {
+  const params = parseExportParams(url);
+  if (typeof params === 'string') {
+    return handleCORS(NextResponse.json({ error: params }, { status: 400 }));
+  }
+  const db = await getDb();
+
+  const query: Record<string, any> = { ...params.range };
+  const department = url.searchParams.get('department');
+  if (department) {
+    query.department = department;
+  }
+
+  const rows = exportRows(db.collection('students'), query, params.after, { _id: 0, password: 0 });
+  return exportResponse(request, 'Students', params, rows, STUDENT_EXPORT_COLUMNS);
+}));
+
+// Get single student by ID - GET /api/students/:id
+router.get('/students/:id', async ({ params, getDb }) => {
+  const db = await getDb();
+  const studentId = params.id;
+  const student = await db.collection('students').findOne({ id: studentId });
+  
+  if (!student) {
+    return handleCORS(NextResponse.json(
+      { error: 'Student not found' },
+      { status: 404 }
+    ));
+  }
+  
+  const { _id, password, ...cleanedStudent } = student;
+  return handleCORS(NextResponse.json(cleanedStudent));
+});
+
+// Update student profile - PUT /api/students/:id
+router.put('/students/:id', async ({ request, params, getDb }) => {
+  const db = await getDb();
+  const studentId = params.id;
+  const body = await request.json();
+  const { name, phone, address, dateOfBirth, guardianName, guardianPhone, bloodGroup } = body;
+  
+  const updateData: Record<string, any> = {
+    ...(name && { name }),
+    ...(phone && { phone }),
+    ...(address && { address }),
+    ...(dateOfBirth && { dateOfBirth }),
+    ...(guardianName && { guardianName }),
+    ...(guardianPhone && { guardianPhone }),
+    ...(bloodGroup && { bloodGroup }),
+    updatedAt: new Date()
+  };
+
+  const result = await db.collection('students').findOneAndUpdate(
+    { id: studentId },
+    { $set: updateData },
+    { returnDocument: 'after' }
+  );
+
+  if (!result) {
+    return handleCORS(NextResponse.json(
+      { error: 'Student not found' },
+      { status: 404 }
+    ));
+  }
+
+  const { _id, password: _, ...cleanedResult } = result;
+  return handleCORS(NextResponse.json(cleanedResult));
+});
+
+// Delete student - DELETE /api/students/:id
+router.delete('/students/:id', async ({ params, getDb }) => {
+  const db = await getDb();
+  const studentId = params.id;
+  
+  const result = await db.collection('students').deleteOne({ id: studentId });
+  
+  if (result.deletedCount === 0) {
+    return handleCORS(NextResponse.json(
+      { error: 'Student not found' },
+      { status: 404 }
+    ));
+  }
+  await adjustStats(db, { totalStudents: -1 });
+
+  return handleCORS(NextResponse.json({ message: 'Student deleted successfully' }));
+});
+
+// ============ SERVICE REQUEST ROUTES ============
+
+// Create service request - POST /api/requests
+router.post('/requests', async ({ request, getDb }) => {
+  const db = await getDb();
+  const body = await request.json();
+  const { studentId, studentName, studentEmail, rollNo, department, serviceType, details } = body;
+  
+  if (!studentId || !serviceType) {
+    return handleCORS(NextResponse.json(
+      { error: 'studentId and serviceType are required' },
+      { status: 400 }
+    ));
+  }
+
+  const request_doc = {
+    id: uuidv4(),
+    studentId,
+    studentName: studentName || '',
+    studentEmail: studentEmail || '',
+    rollNo: rollNo || '',
+    department: department || '',
+    serviceType,
+    details: details || {},
+    status: 'pending',
+    createdAt: new Date(),
+    updatedAt: new Date()
+  };
+
+  await db.collection('service_requests').insertOne(request_doc);
+  await adjustStats(db, { totalRequests: 1, pendingRequests: 1 });
+  const { _id, ...cleanedRequest } = request_doc as any;
+  return handleCORS(NextResponse.json(cleanedRequest));
+});
+
+// Get requests, newest first - GET /api/requests?studentId=&status=&department=&serviceType=&after=&limit=&format=
+router.get('/requests', async ({ request, url, getDb }) => {
+  const format = parseListFormat(url);
+  if (!format) return invalidFormatResponse();
+  const db = await getDb();
+  
+  let query: Record<string, any> = {};
+  for (const field of ['studentId', 'status', 'department', 'serviceType']) {
+    const value = url.searchParams.get(field);
+    if (value) {
+      query[field] = value;
     }
+  }
+  
+  const page = await findPage(db.collection('service_requests'), query, {
+    after: parseCursor(url.searchParams.get('after')),
+    limit: parseLimit(url.searchParams.get('limit')),
+    projection: { _id: 0 }
+  });
+  return pageResponse(request, page, format);
+});
 
-    // Delete student - DELETE /api/students/:id
-    if (route.startsWith('/students/') && method === 'DELETE' && path.length === 2) {
-      const studentId = path[1];
-      
-      const result = await db.collection('students').deleteOne({ id: studentId });
-      
-      if (result.deletedCount === 0) {
-        return handleCORS(NextResponse.json(
-          { error: 'Student not found' },
-          { status: 404 }
-        ));
-      }
+// Export requests - GET /api/requests/export?format=&status=&department=&serviceType=&from=&to=&after=
+router.get('/requests/export', requireRole(['academic'], async ({ request, url, getDb }) => {
+  const params = parseExportParams(url);
+  if (typeof params === 'string') {
+    return handleCORS(NextResponse.json({ error: params }, { status: 400 }));
+  }
+  const db = await getDb();
 
-      return handleCORS(NextResponse.json({ message: 'Student deleted successfully' }));
+  const query: Record<string, any> = { ...params.range };
+  for (const field of ['status', 'department', 'serviceType']) {
+    const value = url.searchParams.get(field);
+    if (value) {
+      query[field] = value;
     }
+  }
 
-    // ============ SERVICE REQUEST ROUTES ============
-    
-    // Create service request - POST /api/requests
-    if (route === '/requests' && method === 'POST') {
-      const body = await request.json();
-      const { studentId, studentName, studentEmail, rollNo, department, serviceType, details } = body;
-      
-      if (!studentId || !serviceType) {
-        return handleCORS(NextResponse.json(
-          { error: 'studentId and serviceType are required' },
-          { status: 400 }
-        ));
-      }
+  const rows = exportRows(db.collection('service_requests'), query, params.after, { _id: 0 });
+  return exportResponse(request, 'Requests', params, rows, REQUEST_EXPORT_COLUMNS);
+}));
 
-      const request_doc = {
-        id: uuidv4(),
-        studentId,
-        studentName: studentName || '',
-        studentEmail: studentEmail || '',
-        rollNo: rollNo || '',
-        department: department || '',
-        serviceType,
-        details: details || {},
-        status: 'pending',
-        createdAt: new Date(),
-        updatedAt: new Date()
-      };
+const REQUEST_BATCH_LIMIT = parseInt(process.env.REQUEST_BATCH_LIMIT || '1000', 10);
 
-      await db.collection('service_requests').insertOne(request_doc);
-      const { _id, ...cleanedRequest } = request_doc as any;
-      return handleCORS(NextResponse.json(cleanedRequest));
-    }
+// Update many requests at once - PUT /api/requests/batch
+// Guarded updateMany calls; the notifications are queued and written by the background worker in batches.
+router.put('/requests/batch', async ({ request, getDb }) => {
+  const db = await getDb();
+  const body = await request.json();
+  const { ids, status, remarks } = body;
 
-    // Get all requests - GET /api/requests
-    if (route === '/requests' && method === 'GET') {
-      const url = new URL(request.url);
-      const studentId = url.searchParams.get('studentId');
-      
-      let query: Record<string, any> = {};
-      if (studentId) {
-        query.studentId = studentId;
-      }
-      
-      const requests = await db.collection('service_requests')
-        .find(query)
-        .sort({ createdAt: -1 })
+  if (!Array.isArray(ids) || ids.length === 0 || !ids.every(id => typeof id === 'string') || !status) {
+    return handleCORS(NextResponse.json(
+      { error: 'ids (non-empty array) and status are required' },
+      { status: 400 }
+    ));
+  }
+  if (ids.length > REQUEST_BATCH_LIMIT) {
+    return handleCORS(NextResponse.json(
+      { error: `At most ${REQUEST_BATCH_LIMIT} requests can be updated at once` },
+      { status: 400 }
+    ));
+  }
+
+  const uniqueIds = Array.from(new Set<string>(ids));
+  const requests = db.collection('service_requests');
+  const previous = await requests
+    .find({ id: { $in: uniqueIds } }, { projection: { _id: 0, id: 1, status: 1, serviceType: 1, studentId: 1 } })
+    .toArray();
+  const found = new Map(previous.map(doc => [doc.id, doc]));
+
+  const updateData = {
+    status,
+    remarks: remarks || '',
+    updatedAt: new Date()
+  };
+
+  // One updateMany per status that was read, guarded on that status, so a request another
+  // reviewer moved in between is left alone and never counted twice in the stats
+  const byStatus = new Map<string, string[]>();
+  for (const doc of previous) byStatus.set(doc.status, [...(byStatus.get(doc.status) || []), doc.id]);
+  const updated = new Set<string>();
+  for (const [fromStatus, groupIds] of Array.from(byStatus)) {
+    const { matchedCount } = await requests.updateMany(
+      { id: { $in: groupIds }, status: fromStatus },
+      { $set: updateData }
+    );
+    if (matchedCount === groupIds.length) {
+      groupIds.forEach(id => updated.add(id));
+    } else if (matchedCount > 0) {
+      // Some rows changed under us: the ones carrying this update's timestamp are ours
+      const matched = await requests
+        .find({ id: { $in: groupIds }, status, updatedAt: updateData.updatedAt }, { projection: { _id: 0, id: 1 } })
         .toArray();
-      
-      const cleanedRequests = requests.map(({ _id, ...rest }) => rest);
-      return handleCORS(NextResponse.json(cleanedRequests));
+      matched.forEach(doc => updated.add(doc.id));
     }
+  }
+  const applied = previous.filter(doc => updated.has(doc.id));
+  if (applied.length > 0) {
+    await adjustStats(db, batchStatusDelta(applied.map(doc => doc.status), status));
+  }
 
-    // Update request status - PUT /api/requests/:id
-    if (route.startsWith('/requests/') && method === 'PUT') {
-      const requestId = path[1];
-      const body = await request.json();
-      const { status, remarks } = body;
-      
-      if (!status) {
-        return handleCORS(NextResponse.json(
-          { error: 'status is required' },
-          { status: 400 }
-        ));
-      }
+  const notifications = applied.flatMap(doc => {
+    const notification = statusNotification(doc.serviceType, status, remarks);
+    return notification
+      ? [newNotification(doc.studentId, notification.title, notification.message, notification.type, doc.id)]
+      : [];
+  });
+  await enqueueNotifications(db, notifications);
 
-      const updateData = {
-        status,
-        remarks: remarks || '',
-        updatedAt: new Date()
-      };
+  const results = uniqueIds.map(id => {
+    if (updated.has(id)) return { id, ok: true, previousStatus: found.get(id)!.status };
+    return { id, ok: false, error: found.has(id) ? 'Request changed during the update' : 'Request not found' };
+  });
 
-      const result = await db.collection('service_requests').findOneAndUpdate(
-        { id: requestId },
-        { $set: updateData },
-        { returnDocument: 'after' }
-      );
+  return handleCORS(NextResponse.json({
+    status,
+    updated: applied.length,
+    failed: uniqueIds.length - applied.length,
+    results
+  }));
+});
 
-      if (!result) {
-        return handleCORS(NextResponse.json(
-          { error: 'Request not found' },
-          { status: 404 }
-        ));
-      }
+// Update request status - PUT /api/requests/:id
+router.put('/requests/:id', async ({ request, params, getDb }) => {
+  const db = await getDb();
+  const requestId = params.id;
+  const body = await request.json();
+  const { status, remarks } = body;
+  
+  if (!status) {
+    return handleCORS(NextResponse.json(
+      { error: 'status is required' },
+      { status: 400 }
+    ));
+  }
 
-      // Create notification for student when request is approved/rejected
-      if (status === 'approved' || status === 'rejected') {
-        const serviceName = getServiceName(result.serviceType);
-        const notificationTitle = status === 'approved' 
-          ? `${serviceName} Approved!` 
-          : `${serviceName} Rejected`;
-        const notificationMessage = status === 'approved'
-          ? `Your ${serviceName} request has been approved. You can now download it from your dashboard.`
-          : `Your ${serviceName} request has been rejected. ${remarks ? `Reason: ${remarks}` : 'Please contact the academic section for more details.'}`;
-        
-        await createNotification(
-          db,
-          result.studentId,
-          notificationTitle,
-          notificationMessage,
-          status === 'approved' ? 'success' : 'error',
-          requestId
-        );
-      }
+  const updateData = {
+    status,
+    remarks: remarks || '',
+    updatedAt: new Date()
+  };
 
-      const { _id, ...cleanedResult } = result;
-      return handleCORS(NextResponse.json(cleanedResult));
-    }
+  // Read the previous status so the dashboard counters can move the request between buckets
+  const previous = await db.collection('service_requests').findOneAndUpdate(
+    { id: requestId },
+    { $set: updateData },
+    { returnDocument: 'before' }
+  );
 
-    // ============ NOTIFICATION ROUTES ============
-    
-    // Get notifications for user - GET /api/notifications
-    if (route === '/notifications' && method === 'GET') {
-      const url = new URL(request.url);
-      const userId = url.searchParams.get('userId');
-      
-      if (!userId) {
-        return handleCORS(NextResponse.json(
-          { error: 'userId is required' },
-          { status: 400 }
-        ));
+  if (!previous) {
+    return handleCORS(NextResponse.json(
+      { error: 'Request not found' },
+      { status: 404 }
+    ));
+  }
+
+  const result = { ...previous, ...updateData };
+  await adjustStats(db, statusDelta(previous.status, status));
+
+  // Notify the student when the request is approved/rejected, without waiting for the insert
+  const notification = statusNotification(result.serviceType, status, remarks);
+  if (notification) {
+    await enqueueNotifications(db, [newNotification(
+      result.studentId,
+      notification.title,
+      notification.message,
+      notification.type,
+      requestId
+    )]);
+  }
+
+  const { _id, ...cleanedResult } = result;
+  return handleCORS(NextResponse.json(cleanedResult));
+});
+
+// ============ CERTIFICATES ============
+
+const CERTIFICATE_BATCH_LIMIT = parseInt(process.env.CERTIFICATE_BATCH_LIMIT || '500', 10);
+
+// All certificates approved on one day as a ZIP - GET /api/requests/certificates?date=YYYY-MM-DD
+router.get('/requests/certificates', async ({ request, url, getDb }) => {
+  const db = await getDb();
+  const date = url.searchParams.get('date') || new Date().toISOString().slice(0, 10);
+  const start = new Date(`${date}T00:00:00.000Z`);
+
+  if (!/^\d{4}-\d{2}-\d{2}$/.test(date) || isNaN(start.getTime())) {
+    return handleCORS(NextResponse.json(
+      { error: 'date must be YYYY-MM-DD' },
+      { status: 400 }
+    ));
+  }
+
+  const end = new Date(start.getTime() + 24 * 60 * 60 * 1000);
+  const approved = await db.collection('service_requests')
+    .find({ status: 'approved', updatedAt: { $gte: start, $lt: end } }, { projection: { _id: 0 } })
+    .sort({ updatedAt: 1 })
+    .limit(CERTIFICATE_BATCH_LIMIT)
+    .toArray();
+  const printable = approved.filter(doc => hasCertificate(doc.serviceType));
+
+  if (printable.length === 0) {
+    return handleCORS(NextResponse.json(
+      { error: `No approved certificates for ${date}` },
+      { status: 404 }
+    ));
+  }
+
+  // Rendered one at a time: jsPDF is synchronous, so parallel renders would only queue up anyway
+  const entries = [];
+  for (const doc of printable) {
+    const certificate = await getCertificate(db, doc);
+    entries.push({ name: certificate.filename, data: certificate.bytes, modified: certificate.modified });
+  }
+  const zip = createZip(entries);
+
+  return handleCORS(bytesResponse(request, zip, strongETag(zip), {
+    'Content-Type': 'application/zip',
+    'Content-Disposition': `attachment; filename="certificates-${date}.zip"`,
+    'Cache-Control': 'private, no-cache'
+  }));
+});
+
+// Certificate PDF for an approved request - GET /api/requests/:id/certificate
+// Cached per (id, updatedAt, fee catalog); supports If-None-Match and byte ranges.
+router.get('/requests/:id/certificate', async ({ request, params, getDb }) => {
+  const db = await getDb();
+  const serviceRequest = await db.collection('service_requests').findOne(
+    { id: params.id },
+    { projection: { _id: 0 } }
+  );
+
+  if (!serviceRequest) {
+    return handleCORS(NextResponse.json(
+      { error: 'Request not found' },
+      { status: 404 }
+    ));
+  }
+  if (serviceRequest.status !== 'approved' || !hasCertificate(serviceRequest.serviceType)) {
+    return handleCORS(NextResponse.json(
+      { error: 'Certificate is only available for approved requests' },
+      { status: 409 }
+    ));
+  }
+
+  const certificate = await getCertificate(db, serviceRequest);
+  return handleCORS(bytesResponse(request, certificate.bytes, certificate.etag, {
+    'Content-Type': 'application/pdf',
+    'Content-Disposition': `attachment; filename="${certificate.filename}"`,
+    'Cache-Control': 'private, no-cache',
+    'Last-Modified': certificate.modified.toUTCString()
+  }));
+});
+
+// ============ NOTIFICATION ROUTES ============
+
+// Get notifications for user - GET /api/notifications
+router.get('/notifications', async ({ url, getDb }) => {
+  const db = await getDb();
+  const userId = url.searchParams.get('userId');
+  
+  if (!userId) {
+    return handleCORS(NextResponse.json(
+      { error: 'userId is required' },
+      { status: 400 }
+    ));
+  }
+  
+  const notifications = await db.collection('notifications')
+    .find({ userId })
+    .sort({ createdAt: -1 })
+    .limit(50)
+    .toArray();
+  
+  const cleanedNotifications = notifications.map(({ _id, ...rest }) => rest);
+  return handleCORS(NextResponse.json(cleanedNotifications));
+});
+
+// Latest notifications and unread count in one query - GET /api/notifications/feed?userId=&limit=
+// Supports If-None-Match so unchanged polls cost a 304 with no body.
+router.get('/notifications/feed', async ({ request, url, getDb }) => {
+  const db = await getDb();
+  const userId = url.searchParams.get('userId');
+  const limit = parseLimit(url.searchParams.get('limit'), 50);
+  
+  if (!userId) {
+    return handleCORS(NextResponse.json(
+      { error: 'userId is required' },
+      { status: 400 }
+    ));
+  }
+
+  // Sorting before $facet keeps the {userId, createdAt} index in play
+  const [feed] = await db.collection('notifications').aggregate([
+    { $match: { userId } },
+    { $sort: { createdAt: -1 } },
+    {
+      $facet: {
+        notifications: [{ $limit: limit }, { $project: { _id: 0 } }],
+        unread: [{ $match: { read: false } }, { $count: 'count' }]
       }
-      
-      const notifications = await db.collection('notifications')
-        .find({ userId })
-        .sort({ createdAt: -1 })
-        .limit(50)
-        .toArray();
-      
-      const cleanedNotifications = notifications.map(({ _id, ...rest }) => rest);
-      return handleCORS(NextResponse.json(cleanedNotifications));
     }
+  ]).toArray();
 
-    // Mark notification as read - PUT /api/notifications/:id
-    if (route.startsWith('/notifications/') && method === 'PUT') {
-      const notificationId = path[1];
-      
-      await db.collection('notifications').updateOne(
-        { id: notificationId },
-        { $set: { read: true } }
-      );
+  const notifications = feed?.notifications || [];
+  const unreadCount = feed?.unread[0]?.count || 0;
+  const newest = notifications[0];
+  const etag = `W/"${newest ? `${new Date(newest.createdAt).getTime()}-${newest.id}` : 'empty'}-${unreadCount}"`;
 
-      return handleCORS(NextResponse.json({ message: 'Notification marked as read' }));
-    }
+  const headers = { 'ETag': etag, 'Cache-Control': 'private, no-cache' };
+  if (request.headers.get('if-none-match') === etag) {
+    return handleCORS(new NextResponse(null, { status: 304, headers }));
+  }
+  return handleCORS(NextResponse.json({ notifications, unreadCount }, { headers }));
+});
 
-    // Mark all notifications as read - PUT /api/notifications/mark-all-read
-    if (route === '/notifications/mark-all-read' && method === 'PUT') {
-      const body = await request.json();
-      const { userId } = body;
-      
-      if (!userId) {
-        return handleCORS(NextResponse.json(
-          { error: 'userId is required' },
-          { status: 400 }
+// Live notifications over Server-Sent Events - GET /api/notifications/stream?userId=
+// Reconnecting clients send Last-Event-ID (or ?lastEventId=) to receive what they missed.
+router.get('/notifications/stream', async ({ request, url, getDb }) => {
+  const db = await getDb();
+  const userId = url.searchParams.get('userId');
+  const lastEventId = request.headers.get('last-event-id') || url.searchParams.get('lastEventId');
+  
+  if (!userId) {
+    return handleCORS(NextResponse.json(
+      { error: 'userId is required' },
+      { status: 400 }
+    ));
+  }
+
+  const notifications = db.collection('notifications');
+  const encoder = new TextEncoder();
+  let cleanup = () => {};
+
+  const stream = new ReadableStream<Uint8Array>({
+    async start(controller) {
+      let closed = false;
+      const send = (event: string, data: unknown, id?: string) => {
+        if (closed) return;
+        controller.enqueue(encoder.encode(
+          `${id ? `id: ${id}\n` : ''}event: ${event}\ndata: ${JSON.stringify(data)}\n\n`
         ));
-      }
+      };
 
-      await db.collection('notifications').updateMany(
-        { userId, read: false },
-        { $set: { read: true } }
-      );
+      // Coalesce bursts (e.g. mark-all-read) into a single unread count query
+      let countTimer: ReturnType<typeof setTimeout> | null = null;
+      const sendUnreadCount = () => {
+        if (countTimer) return;
+        countTimer = setTimeout(async () => {
+          countTimer = null;
+          try {
+            send('unread', { count: await notifications.countDocuments({ userId, read: false }) });
+          } catch (error: any) {
+            console.error('Unread count failed:', error.message);
+          }
+        }, 250);
+      };
 
-      return handleCORS(NextResponse.json({ message: 'All notifications marked as read' }));
-    }
+      const unsubscribe = subscribe(db, userId, event => {
+        if (event.type === 'notification') {
+          send('notification', event.notification, event.notification.id);
+        }
+        sendUnreadCount();
+      });
+      const heartbeat = setInterval(() => {
+        if (!closed) controller.enqueue(encoder.encode(': ping\n\n'));
+      }, 25000);
 
-    // Get unread notification count - GET /api/notifications/unread-count
-    if (route === '/notifications/unread-count' && method === 'GET') {
-      const url = new URL(request.url);
-      const userId = url.searchParams.get('userId');
-      
-      if (!userId) {
-        return handleCORS(NextResponse.json(
-          { error: 'userId is required' },
-          { status: 400 }
-        ));
+      cleanup = () => {
+        if (closed) return;
+        closed = true;
+        unsubscribe();
+        clearInterval(heartbeat);
+        if (countTimer) clearTimeout(countTimer);
+        try { controller.close(); } catch {}
+      };
+      request.signal.addEventListener('abort', cleanup);
+
+      try {
+        const resumeFrom = lastEventId
+          ? await notifications.findOne({ id: lastEventId, userId }, { projection: { createdAt: 1 } })
+          : null;
+
+        if (resumeFrom) {
+          const missed = await notifications
+            .find({ userId, createdAt: { $gt: resumeFrom.createdAt } }, { projection: { _id: 0 } })
+            .sort({ createdAt: 1 })
+            .limit(50)
+            .toArray();
+          missed.forEach(notification => send('notification', notification, notification.id));
+        } else {
+          const latest = await notifications
+            .find({ userId }, { projection: { _id: 0 } })
+            .sort({ createdAt: -1 })
+            .limit(50)
+            .toArray();
+          send('snapshot', { notifications: latest }, latest[0]?.id);
+        }
+        send('unread', { count: await notifications.countDocuments({ userId, read: false }) });
+      } catch (error: any) {
+        console.error('Notification stream error:', error);
+        cleanup();
       }
-      
-      const count = await db.collection('notifications').countDocuments({ 
-        userId, 
-        read: false 
-      });
-      
-      return handleCORS(NextResponse.json({ count }));
+    },
+    cancel() {
+      cleanup();
     }
+  });
 
-    // ============ SERVICES MANAGEMENT ============
-    
-    // Get services - GET /api/services
-    if (route === '/services' && method === 'GET') {
-      const services = await db.collection('services').find({}).toArray();
-      
-      if (services.length === 0) {
-        const defaultServices = [
-          { id: uuidv4(), name: 'Bonafide Certificate', enabled: true, description: 'Certificate for various purposes' },
-          { id: uuidv4(), name: 'Fee Structure', enabled: true, description: 'Get fee details for your category' },
-          { id: uuidv4(), name: 'Transfer Certificate', enabled: true, description: 'TC for institute transfer' },
-          { id: uuidv4(), name: 'NOC', enabled: true, description: 'No Objection Certificate' }
-        ];
-        await db.collection('services').insertMany(defaultServices);
-        return handleCORS(NextResponse.json(defaultServices));
-      }
-      
-      const cleanedServices = services.map(({ _id, ...rest }) => rest);
-      return handleCORS(NextResponse.json(cleanedServices));
+  return handleCORS(new NextResponse(stream, {
+    headers: {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache, no-transform',
+      'Connection': 'keep-alive',
+      'X-Accel-Buffering': 'no'
     }
+  }));
+});
 
-    // Update service - PUT /api/services/:id
-    if (route.startsWith('/services/') && method === 'PUT') {
-      const serviceId = path[1];
-      const body = await request.json();
-      
-      const result = await db.collection('services').findOneAndUpdate(
-        { id: serviceId },
-        { $set: { ...body, updatedAt: new Date() } },
-        { returnDocument: 'after' }
-      );
-
-      if (!result) {
-        return handleCORS(NextResponse.json(
-          { error: 'Service not found' },
-          { status: 404 }
-        ));
-      }
+// Mark notification as read - PUT /api/notifications/:id
+router.put('/notifications/:id', async ({ params, getDb }) => {
+  const db = await getDb();
+  const notificationId = params.id;
+  
+  await db.collection('notifications').updateOne(
+    { id: notificationId },
+    { $set: { read: true } }
+  );
 
-      const { _id, ...cleanedResult } = result;
-      return handleCORS(NextResponse.json(cleanedResult));
-    }
+  return handleCORS(NextResponse.json({ message: 'Notification marked as read' }));
+});
 
-    // ============ FEE STRUCTURE ============
-    
-    // Get fee structures - GET /api/fee-structures
-    if (route === '/fee-structures' && method === 'GET') {
-      const feeStructures = await db.collection('fee_structures').find({}).toArray();
-      
-      if (feeStructures.length === 0) {
-        const defaultFees = [
-          { id: uuidv4(), category: 'General', tuitionFee: 50000, examFee: 5000, libraryFee: 2000, totalFee: 57000 },
-          { id: uuidv4(), category: 'OBC', tuitionFee: 40000, examFee: 4000, libraryFee: 1500, totalFee: 45500 },
-          { id: uuidv4(), category: 'SC/ST', tuitionFee: 25000, examFee: 2500, libraryFee: 1000, totalFee: 28500 },
-          { id: uuidv4(), category: 'EWS', tuitionFee: 30000, examFee: 3000, libraryFee: 1200, totalFee: 34200 }
-        ];
-        await db.collection('fee_structures').insertMany(defaultFees);
-        return handleCORS(NextResponse.json(defaultFees));
-      }
-      
-      const cleanedFees = feeStructures.map(({ _id, ...rest }) => rest);
-      return handleCORS(NextResponse.json(cleanedFees));
-    }
+// Mark all notifications as read - PUT /api/notifications/mark-all-read
+router.put('/notifications/mark-all-read', async ({ request, getDb }) => {
+  const db = await getDb();
+  const body = await request.json();
+  const { userId } = body;
+  
+  if (!userId) {
+    return handleCORS(NextResponse.json(
+      { error: 'userId is required' },
+      { status: 400 }
+    ));
+  }
 
-    // ============ STATS ============
-    
-    // Get dashboard stats - GET /api/stats
-    if (route === '/stats' && method === 'GET') {
-      const totalStudents = await db.collection('students').countDocuments();
-      const totalRequests = await db.collection('service_requests').countDocuments();
-      const pendingRequests = await db.collection('service_requests').countDocuments({ status: 'pending' });
-      const approvedRequests = await db.collection('service_requests').countDocuments({ status: 'approved' });
-      const rejectedRequests = await db.collection('service_requests').countDocuments({ status: 'rejected' });
-      
-      return handleCORS(NextResponse.json({
-        totalStudents,
-        totalRequests,
-        pendingRequests,
-        approvedRequests,
-        rejectedRequests
-      }));
+  await db.collection('notifications').updateMany(
+    { userId, read: false },
+    { $set: { read: true } }
+  );
+
+  return handleCORS(NextResponse.json({ message: 'All notifications marked as read' }));
+});
+
+// Get unread notification count - GET /api/notifications/unread-count
+router.get('/notifications/unread-count', async ({ url, getDb }) => {
+  const db = await getDb();
+  const userId = url.searchParams.get('userId');
+  
+  if (!userId) {
+    return handleCORS(NextResponse.json(
+      { error: 'userId is required' },
+      { status: 400 }
+    ));
+  }
+  
+  const count = await db.collection('notifications').countDocuments({ 
+    userId, 
+    read: false 
+  });
+  
+  return handleCORS(NextResponse.json({ count }));
+});
+
+// ============ SERVICES MANAGEMENT ============
+
+// Serve a cached catalog; clients revalidate with If-None-Match and usually get a 304
+function catalogResponse(request: NextRequest, snapshot: CatalogSnapshot): NextResponse {
+  const headers = {
+    'ETag': snapshot.etag,
+    'Cache-Control': CATALOG_CACHE_CONTROL,
+    'Access-Control-Expose-Headers': 'ETag'
+  };
+  const ifNoneMatch = request.headers.get('if-none-match');
+  if (ifNoneMatch && ifNoneMatch.split(/\s*,\s*/).includes(snapshot.etag)) {
+    return handleCORS(new NextResponse(null, { status: 304, headers }));
+  }
+  return handleCORS(new NextResponse(snapshot.body, {
+    headers: { ...headers, 'Content-Type': 'application/json' }
+  }));
+}
+
+// Get services - GET /api/services
+// Served from memory; defaults are seeded at startup (see lib/catalog)
+router.get('/services', async ({ request, getDb }) => {
+  const db = await getDb();
+  return catalogResponse(request, await getCatalog(db, 'services'));
+});
+
+// Update service - PUT /api/services/:id
+router.put('/services/:id', async ({ request, params, getDb }) => {
+  const db = await getDb();
+  const serviceId = params.id;
+  const body = await request.json();
+  
+  const result = await db.collection('services').findOneAndUpdate(
+    { id: serviceId },
+    { $set: { ...body, updatedAt: new Date() } },
+    { returnDocument: 'after' }
+  );
+
+  if (!result) {
+    return handleCORS(NextResponse.json(
+      { error: 'Service not found' },
+      { status: 404 }
+    ));
+  }
+  invalidateCatalog('services');
+
+  const { _id, ...cleanedResult } = result;
+  return handleCORS(NextResponse.json(cleanedResult));
+});
+
+// ============ FEE STRUCTURE ============
+
+// Get fee structures - GET /api/fee-structures
+router.get('/fee-structures', async ({ request, getDb }) => {
+  const db = await getDb();
+  return catalogResponse(request, await getCatalog(db, 'fee_structures'));
+});
+
+// ============ STATS ============
+
+// Get dashboard stats - GET /api/stats
+router.get('/stats', async ({ url, getDb }) => {
+  const db = await getDb();
+  const stats = url.searchParams.get('refresh') === 'true'
+    ? await rebuildStats(db)
+    : await getStats(db);
+  
+  return handleCORS(NextResponse.json(stats));
+});
+
+// ============ MAINTENANCE ============
+
+// Connection pool health - GET /api/health
+router.get('/health', async ({ getDb }) => {
+  const db = await getDb();
+  await db.command({ ping: 1 });
+  return handleCORS(NextResponse.json({
+    status: 'ok',
+    pool: getPoolMetrics(),
+    notificationQueue: getNotificationQueueMetrics(),
+    passwordHashing: getPasswordHashMetrics()
+  }));
+});
+
+// Prometheus metrics - GET /api/metrics
+router.get('/metrics', async () => {
+  const pool = getPoolMetrics();
+  const queue = getNotificationQueueMetrics();
+  const hashing = getPasswordHashMetrics();
+  const body = renderMetrics({
+    mongo_pool_connections: { type: 'gauge', help: 'Open MongoDB connections', value: pool.totalConnections },
+    mongo_pool_checked_out: { type: 'gauge', help: 'MongoDB connections currently checked out', value: pool.checkedOut },
+    mongo_pool_wait_queue_length: { type: 'gauge', help: 'Operations waiting for a MongoDB connection', value: pool.waitQueueLength },
+    mongo_pool_checkouts_total: { type: 'counter', help: 'MongoDB connection checkouts', value: pool.checkouts },
+    mongo_pool_checkout_failures_total: { type: 'counter', help: 'Failed MongoDB connection checkouts', value: pool.checkoutFailures },
+    mongo_pool_wait_avg_ms: { type: 'gauge', help: 'Average wait for a MongoDB connection in milliseconds', value: pool.avgWaitMs },
+    mongo_pool_wait_max_ms: { type: 'gauge', help: 'Longest wait for a MongoDB connection in milliseconds', value: pool.maxWaitMs },
+    notification_queue_depth: { type: 'gauge', help: 'Notifications waiting to be written', value: queue.depth },
+    notification_queue_in_flight: { type: 'gauge', help: 'Notifications being written', value: queue.inFlight },
+    notification_queue_oldest_lag_ms: { type: 'gauge', help: 'Age of the oldest waiting notification in milliseconds', value: queue.oldestLagMs },
+    notification_queue_last_lag_ms: { type: 'gauge', help: 'Enqueue-to-write delay of the last notification in milliseconds', value: queue.lastLagMs },
+    notification_queue_max_lag_ms: { type: 'gauge', help: 'Longest enqueue-to-write delay in milliseconds', value: queue.maxLagMs },
+    notification_queue_delivered_total: { type: 'counter', help: 'Notifications written', value: queue.delivered },
+    notification_queue_failed_attempts_total: { type: 'counter', help: 'Failed notification write attempts', value: queue.failedAttempts },
+    notification_queue_retries_total: { type: 'counter', help: 'Notification writes retried', value: queue.retries },
+    notification_queue_dropped_total: { type: 'counter', help: 'Notifications dropped after the last retry', value: queue.dropped },
+    notification_queue_batches_total: { type: 'counter', help: 'Notification batches written', value: queue.batches },
+    password_hash_active: { type: 'gauge', help: 'Password hashes running', value: hashing.active },
+    password_hash_queued: { type: 'gauge', help: 'Password hashes waiting for a slot', value: hashing.queued },
+    password_hash_computations_total: { type: 'counter', help: 'scrypt computations', value: hashing.hashes },
+    password_verify_cache_hits_total: { type: 'counter', help: 'Password checks answered from the verification cache', value: hashing.cacheHits },
+    password_verify_cache_misses_total: { type: 'counter', help: 'Password checks that needed scrypt', value: hashing.cacheMisses }
+  });
+  return new NextResponse(body, {
+    headers: { 'Content-Type': 'text/plain; version=0.0.4; charset=utf-8' }
+  });
+});
+
+// Verify hot queries use indexes - GET /api/indexes/check
+router.get('/indexes/check', async ({ getDb }) => {
+  const db = await getDb();
+  const plans = await verifyQueryPlans(db);
+  const ok = plans.every(plan => plan.ok);
+  return handleCORS(NextResponse.json({ ok, plans }, { status: ok ? 200 : 500 }));
+});
+
+// Route handler function
+async function handleRoute(
+  request: NextRequest,
+  { params }: { params: { path?: string[] } }
+): Promise<NextResponse> {
+  const { path = [] } = params;
+
+  try {
+    const response = await router.dispatch(request, path, connectToMongo);
+    if (response) {
+      return response;
     }
 
     // Route not found
+    observeRequest({ method: request.method, pattern: 'unmatched', status: 404, durationMs: 0 });
     return handleCORS(NextResponse.json(
-      { error: `Route ${route} not found` },
+      { error: `Route /${path.join('/')} not found` },
       { status: 404 }
     ));
 
@@ -1,15 +1,16 @@
 'use client';
 
-import { useState, useEffect, useRef, useCallback } from 'react';
+import { useState, useEffect, useRef, useCallback, useMemo } from 'react';
 import { toast } from 'sonner';
-import * as XLSX from 'xlsx';
 
 // Types
 import type { 
   User, Student, ServiceRequest, Notification, FeeStructure, 
   DashboardStats, ServiceType, RequestStatus, LoginForm, 
-  BonafideForm, FeeForm, ProfileForm 
+  BonafideForm, FeeForm, ProfileForm, BatchUpdateResult 
 } from '@/types';
+import { cachedGet, invalidate, patchCached, clearCache, type CachedResponse } from '@/lib/api-cache';
+import type { RosterParseMessage } from '@/lib/roster-parser.worker';
 
 // UI Components
 import { Button } from '@/components/ui/button';
@@ -25,6 +26,9 @@ import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '@
 import { ScrollArea } from '@/components/ui/scroll-area';
 import { Separator } from '@/components/ui/separator';
 import { Progress } from '@/components/ui/progress';
+import { Checkbox } from '@/components/ui/checkbox';
+import { VirtualTable } from '@/components/virtual-table';
+import type { ColumnDef } from '@tanstack/react-table';
 
 // Icons
 import {
@@ -56,178 +60,34 @@ const LottieAnimation = ({ url, className = '' }: { url: string; className?: str
   return <Lottie animationData={animationData} loop className={className} />;
 };
 
-// PDF Generator
-const generatePDF = async (request: ServiceRequest, feeStructures: FeeStructure[] = []) => {
-  const { jsPDF } = await import('jspdf');
-  const doc = new jsPDF();
-  
-  const today = new Date().toLocaleDateString('en-IN', {
-    day: '2-digit',
-    month: 'long',
-    year: 'numeric'
-  });
-
-  if (request.serviceType === 'bonafide') {
-    doc.setFontSize(20);
-    doc.setFont('helvetica', 'bold');
-    doc.text('BONAFIDE CERTIFICATE', 105, 30, { align: 'center' });
-    
-    doc.setFontSize(16);
-    doc.text('EduPortal Institute of Technology', 105, 50, { align: 'center' });
-    doc.setFontSize(10);
-    doc.setFont('helvetica', 'normal');
-    doc.text('(Affiliated to State University)', 105, 57, { align: 'center' });
-    doc.text('123 Education Lane, Knowledge City - 500001', 105, 63, { align: 'center' });
-    
-    doc.line(20, 70, 190, 70);
-    
-    doc.setFontSize(11);
-    doc.text(`Ref No: BON/${request.id?.substring(0, 8).toUpperCase()}`, 20, 85);
-    doc.text(`Date: ${today}`, 150, 85);
-    
-    doc.setFontSize(14);
-    doc.setFont('helvetica', 'bold');
-    doc.text('TO WHOM IT MAY CONCERN', 105, 105, { align: 'center' });
-    
-    doc.setFontSize(11);
-    doc.setFont('helvetica', 'normal');
-    
-    const content = `This is to certify that ${request.studentName || 'the student'} bearing Roll No. ${request.rollNo || 'N/A'} is a bonafide student of this institution, currently enrolled in the Department of ${request.department || 'N/A'}.
-
-The student's email ID registered with us is: ${request.studentEmail || 'N/A'}
-
-Purpose: ${request.details?.purpose || 'General Purpose'}
-
-This certificate is issued upon the request of the student for the purpose mentioned above.`;
-
-    const splitContent = doc.splitTextToSize(content, 170);
-    doc.text(splitContent, 20, 125);
-    
-    doc.text('This certificate is valid for a period of 6 months from the date of issue.', 20, 185);
-    
-    doc.setFont('helvetica', 'bold');
-    doc.text('Academic Section', 150, 220);
-    doc.text('EduPortal Institute', 150, 227);
-  } else if (request.serviceType === 'fee') {
-    doc.setFontSize(20);
-    doc.setFont('helvetica', 'bold');
-    doc.text('FEE STRUCTURE', 105, 30, { align: 'center' });
-    
-    doc.setFontSize(16);
-    doc.text('EduPortal Institute of Technology', 105, 50, { align: 'center' });
-    doc.setFontSize(10);
-    doc.setFont('helvetica', 'normal');
-    doc.text('Academic Year 2025-26', 105, 57, { align: 'center' });
-    
-    doc.line(20, 65, 190, 65);
-    
-    doc.setFontSize(11);
-    doc.text(`Date: ${today}`, 150, 80);
-    doc.text(`Student: ${request.studentName || 'N/A'}`, 20, 80);
-    doc.text(`Roll No: ${request.rollNo || 'N/A'}`, 20, 87);
-    doc.text(`Department: ${request.department || 'N/A'}`, 20, 94);
-    doc.text(`Category: ${request.details?.category || 'General'}`, 20, 101);
-    
-    doc.line(20, 115, 190, 115);
-    
-    const selectedFee = feeStructures.find(f => f.category === request.details?.category) || {
-      tuitionFee: 50000, examFee: 5000, libraryFee: 2000, totalFee: 57000
-    };
-    
-    doc.setFontSize(12);
-    doc.setFont('helvetica', 'bold');
-    doc.text('Fee Breakdown', 105, 130, { align: 'center' });
-    
-    doc.setFontSize(11);
-    doc.setFont('helvetica', 'normal');
-    
-    doc.setFillColor(240, 240, 240);
-    doc.rect(30, 140, 150, 10, 'F');
-    doc.setFont('helvetica', 'bold');
-    doc.text('Particulars', 35, 147);
-    doc.text('Amount (INR)', 145, 147);
-    
-    doc.setFont('helvetica', 'normal');
-    doc.text('Tuition Fee', 35, 160);
-    doc.text(`₹ ${selectedFee.tuitionFee?.toLocaleString()}`, 145, 160);
-    doc.text('Examination Fee', 35, 172);
-    doc.text(`₹ ${selectedFee.examFee?.toLocaleString()}`, 145, 172);
-    doc.text('Library Fee', 35, 184);
-    doc.text(`₹ ${selectedFee.libraryFee?.toLocaleString()}`, 145, 184);
-    
-    doc.line(30, 192, 180, 192);
-    doc.setFont('helvetica', 'bold');
-    doc.text('Total Fee', 35, 202);
-    doc.text(`₹ ${selectedFee.totalFee?.toLocaleString()}`, 145, 202);
-    
-    doc.setFont('helvetica', 'bold');
-    doc.text('Accounts Section', 150, 260);
-  } else if (request.serviceType === 'tc') {
-    doc.setFontSize(20);
-    doc.setFont('helvetica', 'bold');
-    doc.text('TRANSFER CERTIFICATE', 105, 30, { align: 'center' });
-    
-    doc.setFontSize(16);
-    doc.text('EduPortal Institute of Technology', 105, 50, { align: 'center' });
-    
-    doc.line(20, 65, 190, 65);
-    
-    doc.setFontSize(11);
-    doc.setFont('helvetica', 'normal');
-    doc.text(`TC No: TC/${request.id?.substring(0, 8).toUpperCase()}`, 20, 80);
-    doc.text(`Date: ${today}`, 150, 80);
-    
-    doc.setFontSize(12);
-    doc.setFont('helvetica', 'bold');
-    doc.text('Student Details:', 20, 100);
-    
-    doc.setFont('helvetica', 'normal');
-    doc.text(`Name: ${request.studentName || 'N/A'}`, 30, 115);
-    doc.text(`Roll No: ${request.rollNo || 'N/A'}`, 30, 125);
-    doc.text(`Department: ${request.department || 'N/A'}`, 30, 135);
-    doc.text('Conduct: Good', 30, 150);
-    doc.text('Dues: Cleared', 30, 160);
-    
-    doc.setFont('helvetica', 'bold');
-    doc.text('Principal', 150, 250);
-  } else if (request.serviceType === 'noc') {
-    doc.setFontSize(20);
-    doc.setFont('helvetica', 'bold');
-    doc.text('NO OBJECTION CERTIFICATE', 105, 30, { align: 'center' });
-    
-    doc.setFontSize(16);
-    doc.text('EduPortal Institute of Technology', 105, 50, { align: 'center' });
-    
-    doc.line(20, 65, 190, 65);
-    
-    doc.setFontSize(11);
-    doc.setFont('helvetica', 'normal');
-    doc.text(`Ref No: NOC/${request.id?.substring(0, 8).toUpperCase()}`, 20, 80);
-    doc.text(`Date: ${today}`, 150, 80);
-    
-    doc.setFontSize(14);
-    doc.setFont('helvetica', 'bold');
-    doc.text('TO WHOM IT MAY CONCERN', 105, 100, { align: 'center' });
-    
-    doc.setFontSize(11);
-    doc.setFont('helvetica', 'normal');
-    
-    const nocContent = `This is to certify that we have no objection to ${request.studentName || 'the student'}, Roll No. ${request.rollNo || 'N/A'}, Department of ${request.department || 'N/A'}, participating in external activities, internships, or competitions.`;
-    
-    const splitNOC = doc.splitTextToSize(nocContent, 170);
-    doc.text(splitNOC, 20, 120);
-    
-    doc.text('This certificate is valid for a period of 3 months from the date of issue.', 20, 180);
-    
-    doc.setFont('helvetica', 'bold');
-    doc.text('HOD / Dean', 150, 230);
+// Download a file produced by the API, keeping the server's filename when it sends one
+const downloadFromApi = async (path: string, fallbackName: string): Promise<string> => {
+  const response = await fetch(path);
+  if (!response.ok) {
+    const data = await response.json().catch(() => ({}));
+    throw new Error(data.error || `Download failed (${response.status})`);
   }
-  
-  const filename = `${request.serviceType}_${request.studentName?.replace(/\s+/g, '_') || 'certificate'}_${request.id?.substring(0, 8)}.pdf`;
-  doc.save(filename);
+
+  const blob = await response.blob();
+  const disposition = response.headers.get('Content-Disposition') || '';
+  const filename = disposition.match(/filename="([^"]+)"/)?.[1] || fallbackName;
+  const link = document.createElement('a');
+  link.href = URL.createObjectURL(blob);
+  link.download = filename;
+  link.click();
+  // The browser may still be reading the blob after click() returns, so free it a minute later
+  setTimeout(() => URL.revokeObjectURL(link.href), 60000);
   return filename;
 };
 
+// Exports can be large, so let the browser stream them to disk instead of buffering a blob
+const streamDownload = (path: string) => {
+  const link = document.createElement('a');
+  link.href = path;
+  link.download = '';
+  link.click();
+};
+
 // Service name helper
 const getServiceName = (type: string): string => {
   switch (type) {
@@ -239,6 +99,49 @@ const getServiceName = (type: string): string => {
   }
 };
 
+const STATUS_COUNTERS: Record<string, keyof DashboardStats> = {
+  pending: 'pendingRequests',
+  approved: 'approvedRequests',
+  rejected: 'rejectedRequests'
+};
+
+// Move requests between the status counters, as the server does in lib/stats
+const moveStatusCounts = (stats: DashboardStats | null, fromStatuses: string[], to: string): DashboardStats | null => {
+  if (!stats || typeof stats !== 'object') return stats;
+  const next = { ...stats };
+  for (const from of fromStatuses) {
+    if (from === to) continue;
+    if (STATUS_COUNTERS[from]) next[STATUS_COUNTERS[from]]--;
+    if (STATUS_COUNTERS[to]) next[STATUS_COUNTERS[to]]++;
+  }
+  return next;
+};
+
+// Row updaters shared by React state and the cached list responses
+const withStatus = (ids: Set<string>, status: RequestStatus) => (rows: ServiceRequest[]) =>
+  Array.isArray(rows) ? rows.map(row => ids.has(row.id) ? { ...row, status, updatedAt: new Date() } : row) : rows;
+
+const replaceRow = <T extends { id: string }>(updated: T) => (rows: T[]) =>
+  Array.isArray(rows) ? rows.map(row => row.id === updated.id ? updated : row) : rows;
+
+type RequestPartitions = Record<'all' | RequestStatus, ServiceRequest[]>;
+
+// Split requests by status in one pass, for the tab lists and the counts
+const partitionByStatus = (rows: ServiceRequest[]): RequestPartitions => {
+  const partitions: RequestPartitions = { all: rows, pending: [], approved: [], rejected: [] };
+  for (const row of rows) partitions[row.status]?.push(row);
+  return partitions;
+};
+
+// Rows per message from the roster parser worker, and per POST /api/students/upload
+const PARSE_CHUNK_SIZE = 1000;
+const UPLOAD_CHUNK_SIZE = 2000;
+// Ids per PUT /api/requests/batch call; must not exceed the server's REQUEST_BATCH_LIMIT
+const BATCH_UPDATE_SIZE = 1000;
+
+const STUDENT_ROW_HEIGHT = 57;
+const REQUEST_ROW_HEIGHT = 69;
+
 // Main App Component
 export default function App() {
   // Auth state
@@ -247,12 +150,16 @@ export default function App() {
   const [showLoginModal, setShowLoginModal] = useState(false);
   const [selectedRole, setSelectedRole] = useState<string | null>(null);
   const [loginForm, setLoginForm] = useState<LoginForm>({ userId: '', password: '', name: '' });
+  // When the access token cookie runs out; renewed from the refresh token shortly before
+  const [sessionExpiresAt, setSessionExpiresAt] = useState<number | null>(null);
   const [isLoading, setIsLoading] = useState(false);
   const [mobileMenuOpen, setMobileMenuOpen] = useState(false);
 
   // Data state
   const [students, setStudents] = useState<Student[]>([]);
   const [requests, setRequests] = useState<ServiceRequest[]>([]);
+  const [studentsCursor, setStudentsCursor] = useState<string | null>(null);
+  const [requestsCursor, setRequestsCursor] = useState<string | null>(null);
   const [stats, setStats] = useState<DashboardStats | null>(null);
   const [feeStructures, setFeeStructures] = useState<FeeStructure[]>([]);
   const [notifications, setNotifications] = useState<Notification[]>([]);
@@ -265,6 +172,7 @@ export default function App() {
   const [showServiceDialog, setShowServiceDialog] = useState(false);
   const [activeService, setActiveService] = useState<ServiceType | null>(null);
   const [requestDetailDialog, setRequestDetailDialog] = useState<ServiceRequest | null>(null);
+  const [selectedRequestIds, setSelectedRequestIds] = useState<Set<string>>(new Set());
 
   // Profile state
   const [profileForm, setProfileForm] = useState<ProfileForm>({
@@ -276,8 +184,15 @@ export default function App() {
   // File upload state
   const [selectedFile, setSelectedFile] = useState<File | null>(null);
   const [parsedStudents, setParsedStudents] = useState<Student[]>([]);
+  const [uploadProgress, setUploadProgress] = useState<number | null>(null);
+  const [parsingRows, setParsingRows] = useState<number | null>(null);
   const [isDragging, setIsDragging] = useState(false);
   const fileInputRef = useRef<HTMLInputElement>(null);
+  const lastNotificationId = useRef<string | null>(null);
+  const rosterParser = useRef<Worker | null>(null);
+  const parseJobId = useRef(0);
+
+  const requestsByStatus = useMemo(() => partitionByStatus(requests), [requests]);
 
   // Load data based on user role
   useEffect(() => {
@@ -289,7 +204,6 @@ export default function App() {
     } else if (user?.role === 'student') {
       fetchMyRequests();
       fetchFeeStructures();
-      fetchNotifications();
       setProfileForm({
         name: user.name || '',
         phone: user.phone || '',
@@ -302,30 +216,119 @@ export default function App() {
     }
   }, [user]);
 
-  // Fetch notifications periodically for students
+  // Resume a session from an earlier visit; the refresh cookie outlives a page reload
   useEffect(() => {
-    if (user?.role === 'student') {
-      const interval = setInterval(fetchNotifications, 30000);
-      return () => clearInterval(interval);
-    }
+    fetch('/api/auth/refresh', { method: 'POST' })
+      .then(res => (res.ok ? res.json() : null))
+      .then(data => {
+        if (!data) return;
+        setUser(current => current ?? data.user);
+        setSessionExpiresAt(Date.now() + data.expiresIn * 1000);
+        setCurrentPage(page => (page === 'home' ? (data.user.role === 'student' ? 'student-home' : 'dashboard') : page));
+      })
+      .catch(() => {});
+  }, []);
+
+  // Renew the access token a minute before it expires, for as long as someone is logged in
+  useEffect(() => {
+    if (!user?.id || !sessionExpiresAt) return;
+    const timer = setTimeout(async () => {
+      try {
+        const res = await fetch('/api/auth/refresh', { method: 'POST' });
+        setSessionExpiresAt(res.ok ? Date.now() + (await res.json()).expiresIn * 1000 : null);
+      } catch {
+        // Network trouble: try again in 30 seconds
+        setSessionExpiresAt(Date.now() + 90_000);
+      }
+    }, Math.max(5_000, sessionExpiresAt - Date.now() - 60_000));
+    return () => clearTimeout(timer);
+  }, [user?.id, sessionExpiresAt]);
+
+  // Start the roster parser worker (and with it the xlsx library) only while the upload panel is open
+  useEffect(() => {
+    if (user?.role !== 'academic' || currentPage !== 'students') return;
+    const worker = new Worker(new URL('../lib/roster-parser.worker.ts', import.meta.url));
+    rosterParser.current = worker;
+    return () => {
+      worker.terminate();
+      rosterParser.current = null;
+      setParsingRows(null);
+    };
+  }, [user?.role, currentPage]);
+
+  // Live notifications for students over Server-Sent Events
+  useEffect(() => {
+    if (user?.role !== 'student' || !user.id) return;
+
+    let source: EventSource | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | null = null;
+    let retryDelay = 1000;
+    let stopped = false;
+
+    const connect = () => {
+      // EventSource resends Last-Event-ID on its own retries; pass it explicitly when we reopen
+      const resume = lastNotificationId.current ? `&lastEventId=${encodeURIComponent(lastNotificationId.current)}` : '';
+      source = new EventSource(`/api/notifications/stream?userId=${encodeURIComponent(user.id)}${resume}`);
+
+      source.addEventListener('snapshot', (e) => {
+        const data = JSON.parse((e as MessageEvent).data);
+        setNotifications(Array.isArray(data.notifications) ? data.notifications : []);
+        if ((e as MessageEvent).lastEventId) lastNotificationId.current = (e as MessageEvent).lastEventId;
+      });
+      source.addEventListener('notification', (e) => {
+        const notification: Notification = JSON.parse((e as MessageEvent).data);
+        setNotifications(prev => [notification, ...prev.filter(n => n.id !== notification.id)].slice(0, 50));
+        lastNotificationId.current = (e as MessageEvent).lastEventId;
+      });
+      source.addEventListener('unread', (e) => {
+        setUnreadCount(JSON.parse((e as MessageEvent).data).count || 0);
+      });
+      source.onopen = () => {
+        retryDelay = 1000;
+      };
+      source.onerror = () => {
+        // The browser retries transient drops itself; only reopen once it has given up
+        if (source?.readyState !== EventSource.CLOSED || stopped) return;
+        source.close();
+        retryTimer = setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      };
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      source?.close();
+      if (retryTimer) clearTimeout(retryTimer);
+    };
   }, [user]);
 
   // API calls
-  const fetchStudents = async () => {
+  // Lists are paginated server-side; passing the last cursor appends the next page
+  // Reads go through lib/api-cache: repeated calls are served from memory and shared while in flight
+  const fetchStudents = async (after?: string) => {
+    const apply = ({ data, cursor }: CachedResponse<Student[]>) => {
+      const page = Array.isArray(data) ? data : [];
+      setStudents(prev => after ? [...prev, ...page] : page);
+      setStudentsCursor(cursor);
+    };
     try {
-      const res = await fetch('/api/students');
-      const data = await res.json();
-      setStudents(Array.isArray(data) ? data : []);
+      const url = after ? `/api/students?after=${encodeURIComponent(after)}` : '/api/students';
+      apply(await cachedGet<Student[]>(url, { onRevalidate: after ? undefined : apply }));
     } catch (error) {
       console.error('Error fetching students:', error);
     }
   };
 
-  const fetchRequests = async () => {
+  const fetchRequests = async (after?: string) => {
+    const apply = ({ data, cursor }: CachedResponse<ServiceRequest[]>) => {
+      const page = Array.isArray(data) ? data : [];
+      setRequests(prev => after ? [...prev, ...page] : page);
+      setRequestsCursor(cursor);
+    };
     try {
-      const res = await fetch('/api/requests');
-      const data = await res.json();
-      setRequests(Array.isArray(data) ? data : []);
+      const url = after ? `/api/requests?after=${encodeURIComponent(after)}` : '/api/requests';
+      apply(await cachedGet<ServiceRequest[]>(url, { onRevalidate: after ? undefined : apply }));
     } catch (error) {
       console.error('Error fetching requests:', error);
     }
@@ -333,51 +336,68 @@ export default function App() {
 
   const fetchMyRequests = async () => {
     if (!user?.id) return;
+    const apply = ({ data }: CachedResponse<ServiceRequest[]>) => setRequests(Array.isArray(data) ? data : []);
     try {
-      const res = await fetch(`/api/requests?studentId=${user.id}`);
-      const data = await res.json();
-      setRequests(Array.isArray(data) ? data : []);
+      apply(await cachedGet<ServiceRequest[]>(`/api/requests?studentId=${user.id}`, { onRevalidate: apply }));
     } catch (error) {
       console.error('Error fetching requests:', error);
     }
   };
 
   const fetchStats = async () => {
+    const apply = ({ data }: CachedResponse<DashboardStats>) => setStats(data);
     try {
-      const res = await fetch('/api/stats');
-      const data = await res.json();
-      setStats(data);
+      apply(await cachedGet<DashboardStats>('/api/stats', { onRevalidate: apply }));
     } catch (error) {
       console.error('Error fetching stats:', error);
     }
   };
 
   const fetchFeeStructures = async () => {
+    const apply = ({ data }: CachedResponse<FeeStructure[]>) => setFeeStructures(Array.isArray(data) ? data : []);
     try {
-      const res = await fetch('/api/fee-structures');
-      const data = await res.json();
-      setFeeStructures(Array.isArray(data) ? data : []);
+      // Revalidating an unchanged catalog is a 304, so it follows the default 30s like everything else
+      apply(await cachedGet<FeeStructure[]>('/api/fee-structures', { onRevalidate: apply }));
     } catch (error) {
       console.error('Error fetching fee structures:', error);
     }
   };
 
+  // The browser revalidates with the feed's ETag, so an unchanged feed comes back as a 304
   const fetchNotifications = async () => {
     if (!user?.id) return;
     try {
-      const [notifRes, countRes] = await Promise.all([
-        fetch(`/api/notifications?userId=${user.id}`),
-        fetch(`/api/notifications/unread-count?userId=${user.id}`)
-      ]);
-      const notifData = await notifRes.json();
-      const countData = await countRes.json();
-      setNotifications(Array.isArray(notifData) ? notifData : []);
-      setUnreadCount(countData.count || 0);
+      const res = await fetch(`/api/notifications/feed?userId=${user.id}`);
+      const data = await res.json();
+      setNotifications(Array.isArray(data.notifications) ? data.notifications : []);
+      setUnreadCount(data.unreadCount || 0);
     } catch (error) {
       console.error('Error fetching notifications:', error);
     }
   };
 
+  // Optimistically change request rows and the dashboard counters, in state and in the cache.
+  // Returns an undo for when the server rejects the change.
+  const applyRequestChange = (
+    update: (rows: ServiceRequest[]) => ServiceRequest[],
+    fromStatuses: string[],
+    to: RequestStatus
+  ) => {
+    const previousRequests = requests;
+    const previousStats = stats;
+    const updateStats = (current: DashboardStats | null) => moveStatusCounts(current, fromStatuses, to);
+    setRequests(update);
+    setStats(updateStats);
+    const undoRequests = patchCached('/api/requests', update);
+    const undoStats = patchCached('/api/stats', updateStats);
+    return () => {
+      setRequests(previousRequests);
+      setStats(previousStats);
+      undoRequests();
+      undoStats();
+    };
+  };
+
   // Login handler
   const handleLogin = async (e?: React.FormEvent) => {
     if (e) e.preventDefault();
@@ -408,6 +428,7 @@ export default function App() {
       }
 
       setUser(data.user);
+      setSessionExpiresAt(Date.now() + data.expiresIn * 1000);
       setShowLoginModal(false);
       setSelectedRole(null);
       setLoginForm({ userId: '', password: '', name: '' });
@@ -422,13 +443,19 @@ export default function App() {
 
   // Logout handler
   const handleLogout = () => {
+    fetch('/api/auth/logout', { method: 'POST' }).catch(() => {});
+    clearCache();
     setUser(null);
+    setSessionExpiresAt(null);
     setCurrentPage('home');
     setStudents([]);
     setRequests([]);
+    setStudentsCursor(null);
+    setRequestsCursor(null);
     setStats(null);
     setNotifications([]);
     setUnreadCount(0);
+    lastNotificationId.current = null;
     toast.success('Logged out successfully');
   };
 
@@ -451,116 +478,94 @@ export default function App() {
     parseFile(file);
   }, []);
 
-  const parseFile = async (file: File) => {
-    try {
-      if (file.name.endsWith('.csv')) {
-        const text = await file.text();
-        const parsed = parseCSVContent(text);
-        setParsedStudents(parsed);
-        toast.success(`Found ${parsed.length} students in file`);
-      } else {
-        const buffer = await file.arrayBuffer();
-        const workbook = XLSX.read(buffer, { type: 'array' });
-        const sheetName = workbook.SheetNames[0];
-        const worksheet = workbook.Sheets[sheetName];
-        const jsonData = XLSX.utils.sheet_to_json(worksheet, { header: 1 }) as string[][];
-        
-        if (jsonData.length < 2) {
+  // Parsing runs in the roster worker; rows arrive in chunks and only the final list is set
+  // in state. A newer file supersedes any parse still in progress.
+  const parseFile = (file: File) => {
+    const worker = rosterParser.current;
+    if (!worker) {
+      toast.error('File parser is not ready yet, please try again');
+      return;
+    }
+
+    const id = ++parseJobId.current;
+    const parsed: Student[] = [];
+    setParsedStudents([]);
+    setParsingRows(0);
+
+    worker.onmessage = (event: MessageEvent<RosterParseMessage>) => {
+      const message = event.data;
+      if (message.id !== parseJobId.current) return;
+
+      if (message.type === 'chunk') {
+        for (const student of message.students) parsed.push({ id: '', ...student });
+      } else if (message.type === 'progress') {
+        setParsingRows(message.rows);
+      } else if (message.type === 'done') {
+        setParsingRows(null);
+        if (parsed.length === 0) {
           toast.error('File is empty or has no data rows');
           return;
         }
-
-        const headers = jsonData[0].map(h => String(h).trim().toLowerCase().replace(/\s+/g, '_'));
-        const parsed: Student[] = [];
-
-        for (let i = 1; i < jsonData.length; i++) {
-          const row = jsonData[i];
-          if (!row || row.length === 0 || !row.some(cell => cell)) continue;
-
-          const student: Record<string, string> = {};
-          headers.forEach((header, index) => {
-            student[header] = String(row[index] || '').trim();
-          });
-
-          if (student.email || student.email_id) {
-            parsed.push({
-              id: '',
-              name: student.name || student.student_name || '',
-              email: student.email || student.email_id || '',
-              rollNo: student.roll_no || student.rollno || student.roll_number || '',
-              department: student.department || student.dept || ''
-            });
-          }
-        }
-
         setParsedStudents(parsed);
         toast.success(`Found ${parsed.length} students in file`);
+      } else {
+        setParsingRows(null);
+        console.error('Parse error:', message.error);
+        toast.error('Failed to parse file');
       }
-    } catch (error) {
-      console.error('Parse error:', error);
-      toast.error('Failed to parse file');
-    }
-  };
-
-  const parseCSVContent = (content: string): Student[] => {
-    const lines = content.trim().split('\n');
-    if (lines.length < 2) return [];
-
-    const headers = lines[0].split(',').map(h => h.trim().toLowerCase().replace(/\s+/g, '_'));
-    const parsed: Student[] = [];
-
-    for (let i = 1; i < lines.length; i++) {
-      const values = lines[i].split(',');
-      const student: Record<string, string> = {};
-      
-      headers.forEach((header, index) => {
-        student[header] = values[index]?.trim() || '';
-      });
-
-      if (student.email || student.email_id) {
-        parsed.push({
-          id: '',
-          name: student.name || student.student_name || '',
-          email: student.email || student.email_id || '',
-          rollNo: student.roll_no || student.rollno || student.roll_number || '',
-          department: student.department || student.dept || ''
-        });
-      }
-    }
-
-    return parsed;
+    };
+    worker.postMessage({ id, file, chunkSize: PARSE_CHUNK_SIZE });
   };
 
+  // Post the parsed rows in chunks so each request stays small and progress is per chunk
   const handleUploadStudents = async () => {
-    if (parsedStudents.length === 0) {
+    if (parsedStudents.length === 0 || !selectedFile) {
       toast.error('No students to upload');
       return;
     }
 
     setIsLoading(true);
+    setUploadProgress(0);
+    const totals = { count: 0, failed: 0 };
     try {
-      const res = await fetch('/api/students/upload', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ students: parsedStudents })
-      });
+      for (let offset = 0; offset < parsedStudents.length; offset += UPLOAD_CHUNK_SIZE) {
+        const chunk = parsedStudents.slice(offset, offset + UPLOAD_CHUNK_SIZE).map(({ id, ...student }) => student);
+        const res = await fetch('/api/students/upload', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ students: chunk })
+        });
+        const data = await res.json().catch(() => ({}));
 
-      const data = await res.json();
+        if (!res.ok) {
+          toast.error(data.error || 'Upload failed');
+          if (totals.count > 0) toast.warning(`${totals.count} students were uploaded before the error`);
+          return;
+        }
 
-      if (!res.ok) {
-        toast.error(data.error || 'Upload failed');
-        return;
+        totals.count += data.count || 0;
+        totals.failed += data.failed || 0;
+        setUploadProgress(Math.round(((offset + chunk.length) / parsedStudents.length) * 100));
       }
 
-      toast.success(data.message);
+      toast.success(`${totals.count} students uploaded successfully`);
+      if (totals.failed > 0) {
+        toast.warning(`${totals.failed} rows could not be uploaded`);
+      }
       setSelectedFile(null);
       setParsedStudents([]);
-      fetchStudents();
-      fetchStats();
     } catch (error) {
       toast.error('Upload failed. Please try again.');
     } finally {
       setIsLoading(false);
+      setUploadProgress(null);
+      if (totals.count > 0) {
+        // A bulk upload touches too many rows to patch locally
+        invalidate('/api/students');
+        invalidate('/api/stats');
+        fetchStudents();
+        fetchStats();
+      }
     }
   };
 
@@ -584,18 +589,34 @@ export default function App() {
   const handleDeleteStudent = async (studentId: string) => {
     if (!confirm('Are you sure you want to delete this student?')) return;
 
+    const previousStudents = students;
+    const previousStats = stats;
+    const removeRow = (rows: Student[]) => Array.isArray(rows) ? rows.filter(row => row.id !== studentId) : rows;
+    const decrement = (current: DashboardStats | null) =>
+      current && typeof current === 'object' ? { ...current, totalStudents: current.totalStudents - 1 } : current;
+    setStudents(removeRow);
+    setStats(decrement);
+    const undoStudents = patchCached('/api/students', removeRow);
+    const undoStats = patchCached('/api/stats', decrement);
+    const undo = () => {
+      setStudents(previousStudents);
+      setStats(previousStats);
+      undoStudents();
+      undoStats();
+    };
+
     try {
       const res = await fetch(`/api/students/${studentId}`, { method: 'DELETE' });
       
       if (!res.ok) {
+        undo();
         toast.error('Failed to delete student');
         return;
       }
 
       toast.success('Student deleted successfully');
-      fetchStudents();
-      fetchStats();
     } catch (error) {
+      undo();
       toast.error('Delete failed');
     }
   };
@@ -647,7 +668,12 @@ export default function App() {
       setActiveService(null);
       setBonafideForm({ purpose: '' });
       setFeeForm({ paymentMode: '', category: '' });
-      fetchMyRequests();
+      // The response is the new request; add it locally instead of refetching the list.
+      // Only first pages get it: later (?after=) pages and other students' lists don't hold it.
+      const prepend = (rows: ServiceRequest[]) => Array.isArray(rows) ? [data, ...rows] : rows;
+      setRequests(prepend);
+      patchCached('/api/requests', prepend, { exact: true });
+      patchCached(`/api/requests?studentId=${data.studentId}`, prepend, { exact: true });
     } catch (error) {
       toast.error('Request failed. Please try again.');
     } finally {
@@ -657,6 +683,9 @@ export default function App() {
 
   // Update request status (Admin)
   const handleUpdateRequest = async (requestId: string, status: RequestStatus, remarks?: string) => {
+    const current = requests.find(r => r.id === requestId);
+    const undo = applyRequestChange(withStatus(new Set([requestId]), status), current ? [current.status] : [], status);
+    setRequestDetailDialog(null);
     setIsLoading(true);
     try {
       const res = await fetch(`/api/requests/${requestId}`, {
@@ -666,21 +695,85 @@ export default function App() {
       });
 
       if (!res.ok) {
+        undo();
         toast.error('Update failed');
         return;
       }
 
+      // Swap in the server's copy of the row (timestamps, remarks)
+      const updated: ServiceRequest = await res.json();
+      setRequests(replaceRow(updated));
+      patchCached('/api/requests', replaceRow(updated));
       toast.success(`Request ${status}!`);
-      setRequestDetailDialog(null);
-      fetchRequests();
-      fetchStats();
     } catch (error) {
+      undo();
       toast.error('Update failed');
     } finally {
       setIsLoading(false);
     }
   };
 
+  // Approve or reject every selected request in one call (Admin)
+  const handleBatchUpdate = async (status: RequestStatus) => {
+    if (selectedRequestIds.size === 0) return;
+    const ids = new Set(selectedRequestIds);
+    const fromStatuses = requests.filter(r => ids.has(r.id)).map(r => r.status);
+    const undo = applyRequestChange(withStatus(ids, status), fromStatuses, status);
+    setSelectedRequestIds(new Set());
+    setIsLoading(true);
+    try {
+      // "Select all pending" can exceed the server's limit, so send the ids in slices
+      const allIds = Array.from(ids);
+      const results: BatchUpdateResult['results'] = [];
+      let error = '';
+      for (let start = 0; start < allIds.length; start += BATCH_UPDATE_SIZE) {
+        const chunk = allIds.slice(start, start + BATCH_UPDATE_SIZE);
+        try {
+          const res = await fetch('/api/requests/batch', {
+            method: 'PUT',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ ids: chunk, status })
+          });
+          const data: BatchUpdateResult = await res.json();
+          if (!res.ok) throw new Error((data as any).error || 'Update failed');
+          results.push(...data.results);
+        } catch (chunkError: any) {
+          error = chunkError.message || 'Update failed';
+          results.push(...chunk.map(id => ({ id, ok: false, error })));
+        }
+      }
+
+      const updated = results.filter(result => result.ok);
+      const failed = results.length - updated.length;
+      if (updated.length === 0) {
+        undo();
+        toast.error(error || 'Update failed');
+      } else if (failed > 0) {
+        // Redo the local change with only the rows the server updated, using its previous statuses
+        undo();
+        applyRequestChange(
+          withStatus(new Set(updated.map(result => result.id)), status),
+          updated.map(result => result.previousStatus || ''),
+          status
+        );
+        toast.warning(`${updated.length} requests ${status}, ${failed} could not be updated`);
+      } else {
+        toast.success(`${updated.length} requests ${status}!`);
+      }
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
+  const toggleRequestSelection = (requestId: string, selected: boolean) => {
+    setSelectedRequestIds(previous => {
+      const next = new Set(previous);
+      if (selected) next.add(requestId);
+      else next.delete(requestId);
+      return next;
+    });
+  };
+
   // Update profile handler
   const handleUpdateProfile = async () => {
     if (!user?.id) return;
@@ -712,37 +805,59 @@ export default function App() {
 
   // Mark notification as read
   const handleMarkNotificationRead = async (notificationId: string) => {
+    const wasUnread = notifications.some(n => n.id === notificationId && !n.read);
+    setNotifications(prev => prev.map(n => n.id === notificationId ? { ...n, read: true } : n));
+    if (wasUnread) setUnreadCount(count => Math.max(0, count - 1));
     try {
-      await fetch(`/api/notifications/${notificationId}`, { method: 'PUT' });
-      fetchNotifications();
+      const res = await fetch(`/api/notifications/${notificationId}`, { method: 'PUT' });
+      if (!res.ok) throw new Error(`Status ${res.status}`);
     } catch (error) {
       console.error('Error marking notification read:', error);
+      fetchNotifications();
     }
   };
 
   // Mark all notifications as read
   const handleMarkAllRead = async () => {
     if (!user?.id) return;
+    setNotifications(prev => prev.map(n => ({ ...n, read: true })));
+    setUnreadCount(0);
     try {
-      await fetch('/api/notifications/mark-all-read', {
+      const res = await fetch('/api/notifications/mark-all-read', {
         method: 'PUT',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ userId: user.id })
       });
-      fetchNotifications();
+      if (!res.ok) throw new Error(`Status ${res.status}`);
     } catch (error) {
       console.error('Error marking all read:', error);
+      fetchNotifications();
     }
   };
 
-  // Download PDF handler
+  // Download PDF handler - certificates are rendered and cached on the server
   const handleDownloadPDF = async (request: ServiceRequest) => {
     try {
       toast.info('Generating PDF...');
-      const filename = await generatePDF(request, feeStructures);
+      const filename = await downloadFromApi(
+        `/api/requests/${request.id}/certificate`,
+        `${request.serviceType}_${request.id?.substring(0, 8)}.pdf`
+      );
       toast.success(`Downloaded: ${filename}`);
-    } catch (error) {
-      toast.error('Failed to generate PDF');
+    } catch (error: any) {
+      toast.error(error.message || 'Failed to generate PDF');
+    }
+  };
+
+  // Download every certificate approved today as one ZIP
+  const handleDownloadTodaysCertificates = async () => {
+    const today = new Date().toISOString().slice(0, 10);
+    try {
+      toast.info('Preparing certificates...');
+      const filename = await downloadFromApi(`/api/requests/certificates?date=${today}`, `certificates-${today}.zip`);
+      toast.success(`Downloaded: ${filename}`);
+    } catch (error: any) {
+      toast.error(error.message || 'Failed to download certificates');
     }
   };
 
@@ -1248,6 +1363,132 @@ export default function App() {
   );
 
   // Students Management Page
+  // Column definitions for the admin tables; cells are only rendered for rows in view.
+  // They are memoized so VirtualTable keeps its column model between renders; row actions go
+  // through a ref so the cells always call the current handlers, not the ones from the memo's render.
+  const rowActions = useRef({ handleDeleteStudent, handleUpdateRequest, handleDownloadPDF, toggleRequestSelection });
+  rowActions.current = { handleDeleteStudent, handleUpdateRequest, handleDownloadPDF, toggleRequestSelection };
+
+  const studentColumns = useMemo<ColumnDef<Student>[]>(() => [
+    { accessorKey: 'name', header: 'Name', meta: { className: 'font-medium' } },
+    { accessorKey: 'email', header: 'Email', meta: { className: 'text-gray-600' } },
+    { accessorKey: 'rollNo', header: 'Roll No' },
+    {
+      accessorKey: 'department',
+      header: 'Department',
+      cell: ({ row }) => (
+        <Badge variant="outline" className="bg-blue-50 text-blue-700 border-blue-200">
+          {row.original.department}
+        </Badge>
+      )
+    },
+    {
+      id: 'actions',
+      header: 'Actions',
+      meta: { className: 'text-right' },
+      cell: ({ row }) => (
+        <Button 
+          variant="ghost" 
+          size="sm" 
+          className="text-red-600 hover:text-red-700 hover:bg-red-50"
+          onClick={() => rowActions.current.handleDeleteStudent(row.original.id)}
+        >
+          <Trash2 className="w-4 h-4" />
+        </Button>
+      )
+    }
+  ], []);
+
+  // One column set per tab; `selectable` is the pending rows the header checkbox selects on it
+  const requestColumnsByTab = useMemo(() => {
+    const requestColumns = (selectable: ServiceRequest[]): ColumnDef<ServiceRequest>[] => [
+      {
+        id: 'select',
+        meta: { className: 'w-10' },
+        header: () => {
+          const allSelected = selectable.length > 0 && selectable.every(r => selectedRequestIds.has(r.id));
+          return (
+            <Checkbox
+              aria-label="Select all pending requests"
+              disabled={selectable.length === 0}
+              checked={allSelected}
+              onCheckedChange={(checked) => setSelectedRequestIds(checked ? new Set(selectable.map(r => r.id)) : new Set())}
+            />
+          );
+        },
+        cell: ({ row: { original: req } }) => req.status === 'pending' && (
+          <Checkbox
+            aria-label={`Select request from ${req.studentName}`}
+            checked={selectedRequestIds.has(req.id)}
+            onCheckedChange={(checked) => rowActions.current.toggleRequestSelection(req.id, checked === true)}
+          />
+        )
+      },
+      {
+        id: 'student',
+        header: 'Student',
+        cell: ({ row: { original: req } }) => (
+          <div>
+            <p className="font-medium">{req.studentName}</p>
+            <p className="text-sm text-gray-500">{req.studentEmail}</p>
+          </div>
+        )
+      },
+      {
+        id: 'service',
+        header: 'Service',
+        meta: { className: 'font-medium' },
+        cell: ({ row }) => getServiceName(row.original.serviceType)
+      },
+      {
+        id: 'department',
+        header: 'Department',
+        cell: ({ row }) => <Badge variant="outline">{row.original.department || 'N/A'}</Badge>
+      },
+      {
+        id: 'date',
+        header: 'Date',
+        meta: { className: 'text-gray-500' },
+        cell: ({ row }) => new Date(row.original.createdAt).toLocaleDateString()
+      },
+      {
+        id: 'status',
+        header: 'Status',
+        cell: ({ row }) => <StatusBadge status={row.original.status} />
+      },
+      {
+        id: 'actions',
+        header: 'Actions',
+        meta: { className: 'text-right' },
+        cell: ({ row: { original: req } }) => (
+          <div className="flex items-center justify-end gap-1">
+            <Button size="sm" variant="ghost" onClick={() => setRequestDetailDialog(req)}>
+              <Eye className="w-4 h-4" />
+            </Button>
+            {req.status === 'approved' && (
+              <Button size="sm" variant="ghost" className="text-green-600" onClick={() => rowActions.current.handleDownloadPDF(req)}>
+                <Download className="w-4 h-4" />
+              </Button>
+            )}
+            {req.status === 'pending' && (
+              <>
+                <Button size="sm" variant="ghost" className="text-green-600 hover:bg-green-50" onClick={() => rowActions.current.handleUpdateRequest(req.id, 'approved')}>
+                  <CheckCircle2 className="w-4 h-4" />
+                </Button>
+                <Button size="sm" variant="ghost" className="text-red-600 hover:bg-red-50" onClick={() => rowActions.current.handleUpdateRequest(req.id, 'rejected')}>
+                  <XCircle className="w-4 h-4" />
+                </Button>
+              </>
+            )}
+          </div>
+        )
+      }
+    ];
+    const pendingColumns = requestColumns(requestsByStatus.pending);
+    const otherColumns = requestColumns([]);
+    return { all: pendingColumns, pending: pendingColumns, approved: otherColumns, rejected: otherColumns };
+  }, [requestsByStatus.pending, selectedRequestIds]);
+
   const StudentsPage = () => (
     <div className="min-h-screen py-8 bg-gradient-to-br from-gray-50 to-blue-50">
       <div className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
@@ -1295,7 +1536,9 @@ export default function App() {
                   {selectedFile ? (
                     <>
                       <p className="font-semibold text-green-700">{selectedFile.name}</p>
-                      <p className="text-sm text-green-600">{parsedStudents.length} students found</p>
+                      <p className="text-sm text-green-600">
+                        {parsingRows !== null ? `Reading file... ${parsingRows} rows` : `${parsedStudents.length} students found`}
+                      </p>
                     </>
                   ) : (
                     <>
@@ -1321,7 +1564,7 @@ export default function App() {
                       <span className="text-sm font-medium truncate">{selectedFile.name}</span>
                     </div>
                     <button 
-                      onClick={(e) => { e.stopPropagation(); setSelectedFile(null); setParsedStudents([]); }}
+                      onClick={(e) => { e.stopPropagation(); parseJobId.current++; setParsingRows(null); setSelectedFile(null); setParsedStudents([]); }}
                       className="p-1 hover:bg-gray-200 rounded"
                     >
                       <X className="w-4 h-4 text-gray-500" />
@@ -1360,10 +1603,16 @@ export default function App() {
                   </div>
                 )}
               </CardContent>
-              <CardFooter className="bg-gray-50 border-t">
+              <CardFooter className="bg-gray-50 border-t flex-col gap-3">
+                {uploadProgress !== null && (
+                  <div className="w-full">
+                    <Progress value={uploadProgress} />
+                    <p className="text-xs text-gray-500 mt-1 text-center">{uploadProgress}% processed</p>
+                  </div>
+                )}
                 <Button 
                   onClick={handleUploadStudents} 
-                  disabled={isLoading || parsedStudents.length === 0} 
+                  disabled={isLoading || parsingRows !== null || parsedStudents.length === 0} 
                   className="w-full bg-gradient-to-r from-blue-500 to-purple-600 hover:from-blue-600 hover:to-purple-700"
                 >
                   {isLoading ? 'Uploading...' : `Upload ${parsedStudents.length} Students`}
@@ -1378,9 +1627,17 @@ export default function App() {
               <CardHeader className="flex flex-row items-center justify-between bg-gradient-to-r from-gray-50 to-blue-50 border-b">
                 <div>
                   <CardTitle>Student Records</CardTitle>
-                  <CardDescription>{students.length} students in database</CardDescription>
+                  <CardDescription>{stats?.totalStudents ?? students.length} students in database</CardDescription>
+                </div>
+                <div className="flex gap-2">
+                  <Button variant="outline" size="sm" onClick={() => streamDownload('/api/students/export?format=csv')}>
+                    <Download className="w-4 h-4 mr-1" /> CSV
+                  </Button>
+                  <Button variant="outline" size="sm" onClick={() => streamDownload('/api/students/export?format=xlsx')}>
+                    <FileSpreadsheet className="w-4 h-4 mr-1" /> Excel
+                  </Button>
+                  <Button variant="outline" size="sm" onClick={() => { invalidate('/api/students'); fetchStudents(); }}>Refresh</Button>
                 </div>
-                <Button variant="outline" size="sm" onClick={fetchStudents}>Refresh</Button>
               </CardHeader>
               <CardContent className="p-0">
                 {students.length === 0 ? (
@@ -1390,43 +1647,17 @@ export default function App() {
                     <p className="text-sm">Upload an Excel or CSV file to add students</p>
                   </div>
                 ) : (
-                  <ScrollArea className="h-[500px]">
-                    <Table>
-                      <TableHeader>
-                        <TableRow className="bg-gray-50">
-                          <TableHead>Name</TableHead>
-                          <TableHead>Email</TableHead>
-                          <TableHead>Roll No</TableHead>
-                          <TableHead>Department</TableHead>
-                          <TableHead className="text-right">Actions</TableHead>
-                        </TableRow>
-                      </TableHeader>
-                      <TableBody>
-                        {students.map((student) => (
-                          <TableRow key={student.id} className="hover:bg-gray-50">
-                            <TableCell className="font-medium">{student.name}</TableCell>
-                            <TableCell className="text-gray-600">{student.email}</TableCell>
-                            <TableCell>{student.rollNo}</TableCell>
-                            <TableCell>
-                              <Badge variant="outline" className="bg-blue-50 text-blue-700 border-blue-200">
-                                {student.department}
-                              </Badge>
-                            </TableCell>
-                            <TableCell className="text-right">
-                              <Button 
-                                variant="ghost" 
-                                size="sm" 
-                                className="text-red-600 hover:text-red-700 hover:bg-red-50"
-                                onClick={() => handleDeleteStudent(student.id)}
-                              >
-                                <Trash2 className="w-4 h-4" />
-                              </Button>
-                            </TableCell>
-                          </TableRow>
-                        ))}
-                      </TableBody>
-                    </Table>
-                  </ScrollArea>
+                  <VirtualTable
+                    data={students}
+                    columns={studentColumns}
+                    getRowId={(student) => student.id}
+                    rowHeight={STUDENT_ROW_HEIGHT}
+                    footer={studentsCursor && (
+                      <div className="p-4 text-center">
+                        <Button variant="outline" size="sm" onClick={() => fetchStudents(studentsCursor)}>Load more</Button>
+                      </div>
+                    )}
+                  />
                 )}
               </CardContent>
             </Card>
@@ -1440,93 +1671,74 @@ export default function App() {
   const RequestsPage = () => (
     <div className="min-h-screen py-8 bg-gradient-to-br from-gray-50 to-purple-50">
       <div className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-        <div className="mb-8">
-          <h1 className="text-3xl font-bold mb-2">Service Requests</h1>
-          <p className="text-gray-600">Manage student service requests</p>
+        <div className="mb-8 flex flex-col sm:flex-row sm:items-end sm:justify-between gap-4">
+          <div>
+            <h1 className="text-3xl font-bold mb-2">Service Requests</h1>
+            <p className="text-gray-600">Manage student service requests</p>
+          </div>
+          <div className="flex flex-wrap gap-2">
+            <Button variant="outline" onClick={() => streamDownload('/api/requests/export?format=csv')}>
+              <Download className="w-4 h-4 mr-2" /> Export CSV
+            </Button>
+            <Button variant="outline" onClick={() => streamDownload('/api/requests/export?format=xlsx')}>
+              <FileSpreadsheet className="w-4 h-4 mr-2" /> Export Excel
+            </Button>
+            <Button variant="outline" onClick={handleDownloadTodaysCertificates} className="text-green-600">
+              <Download className="w-4 h-4 mr-2" /> Today&apos;s Certificates (ZIP)
+            </Button>
+          </div>
         </div>
 
+        {selectedRequestIds.size > 0 && (
+          <div className="mb-4 flex flex-wrap items-center gap-3 rounded-xl bg-white p-3 shadow-md">
+            <span className="text-sm font-medium">{selectedRequestIds.size} selected</span>
+            <Button size="sm" className="bg-green-600 hover:bg-green-700" disabled={isLoading} onClick={() => handleBatchUpdate('approved')}>
+              <CheckCircle2 className="w-4 h-4 mr-1" /> Approve selected
+            </Button>
+            <Button size="sm" variant="destructive" disabled={isLoading} onClick={() => handleBatchUpdate('rejected')}>
+              <XCircle className="w-4 h-4 mr-1" /> Reject selected
+            </Button>
+            <Button size="sm" variant="ghost" onClick={() => setSelectedRequestIds(new Set())}>Clear</Button>
+          </div>
+        )}
+
         <Tabs defaultValue="all" className="space-y-6">
           <TabsList className="bg-white p-1 rounded-xl shadow-md">
             <TabsTrigger value="all" className="rounded-lg data-[state=active]:bg-blue-500 data-[state=active]:text-white">
               All ({requests.length})
             </TabsTrigger>
             <TabsTrigger value="pending" className="rounded-lg data-[state=active]:bg-yellow-500 data-[state=active]:text-white">
-              Pending ({requests.filter(r => r.status === 'pending').length})
+              Pending ({requestsByStatus.pending.length})
             </TabsTrigger>
             <TabsTrigger value="approved" className="rounded-lg data-[state=active]:bg-green-500 data-[state=active]:text-white">
-              Approved ({requests.filter(r => r.status === 'approved').length})
+              Approved ({requestsByStatus.approved.length})
             </TabsTrigger>
             <TabsTrigger value="rejected" className="rounded-lg data-[state=active]:bg-red-500 data-[state=active]:text-white">
-              Rejected ({requests.filter(r => r.status === 'rejected').length})
+              Rejected ({requestsByStatus.rejected.length})
             </TabsTrigger>
           </TabsList>
 
-          {['all', 'pending', 'approved', 'rejected'].map((tab) => (
+          {(['all', 'pending', 'approved', 'rejected'] as const).map((tab) => (
             <TabsContent key={tab} value={tab}>
               <Card className="border-0 shadow-xl">
                 <CardContent className="p-0">
-                  {requests.filter(r => tab === 'all' || r.status === tab).length === 0 ? (
+                  {requestsByStatus[tab].length === 0 ? (
                     <div className="text-center py-16 text-gray-500">
                       <FileText className="w-16 h-16 mx-auto mb-4 opacity-20" />
                       <p>No {tab !== 'all' ? tab : ''} requests</p>
                     </div>
                   ) : (
-                    <ScrollArea className="h-[500px]">
-                      <Table>
-                        <TableHeader>
-                          <TableRow className="bg-gray-50">
-                            <TableHead>Student</TableHead>
-                            <TableHead>Service</TableHead>
-                            <TableHead>Department</TableHead>
-                            <TableHead>Date</TableHead>
-                            <TableHead>Status</TableHead>
-                            <TableHead className="text-right">Actions</TableHead>
-                          </TableRow>
-                        </TableHeader>
-                        <TableBody>
-                          {requests
-                            .filter(r => tab === 'all' || r.status === tab)
-                            .map((req) => (
-                              <TableRow key={req.id} className="hover:bg-gray-50">
-                                <TableCell>
-                                  <div>
-                                    <p className="font-medium">{req.studentName}</p>
-                                    <p className="text-sm text-gray-500">{req.studentEmail}</p>
-                                  </div>
-                                </TableCell>
-                                <TableCell className="font-medium">{getServiceName(req.serviceType)}</TableCell>
-                                <TableCell>
-                                  <Badge variant="outline">{req.department || 'N/A'}</Badge>
-                                </TableCell>
-                                <TableCell className="text-gray-500">{new Date(req.createdAt).toLocaleDateString()}</TableCell>
-                                <TableCell><StatusBadge status={req.status} /></TableCell>
-                                <TableCell className="text-right">
-                                  <div className="flex items-center justify-end gap-1">
-                                    <Button size="sm" variant="ghost" onClick={() => setRequestDetailDialog(req)}>
-                                      <Eye className="w-4 h-4" />
-                                    </Button>
-                                    {req.status === 'approved' && (
-                                      <Button size="sm" variant="ghost" className="text-green-600" onClick={() => handleDownloadPDF(req)}>
-                                        <Download className="w-4 h-4" />
-                                      </Button>
-                                    )}
-                                    {req.status === 'pending' && (
-                                      <>
-                                        <Button size="sm" variant="ghost" className="text-green-600 hover:bg-green-50" onClick={() => handleUpdateRequest(req.id, 'approved')}>
-                                          <CheckCircle2 className="w-4 h-4" />
-                                        </Button>
-                                        <Button size="sm" variant="ghost" className="text-red-600 hover:bg-red-50" onClick={() => handleUpdateRequest(req.id, 'rejected')}>
-                                          <XCircle className="w-4 h-4" />
-                                        </Button>
-                                      </>
-                                    )}
-                                  </div>
-                                </TableCell>
-                              </TableRow>
-                            ))}
-                        </TableBody>
-                      </Table>
-                    </ScrollArea>
+                    <VirtualTable
+                      data={requestsByStatus[tab]}
+                      columns={requestColumnsByTab[tab]}
+                      getRowId={(req) => req.id}
+                      rowHeight={REQUEST_ROW_HEIGHT}
+                      footer={requestsCursor && (
+                        <div className="p-4 text-center">
+                          <Button variant="outline" size="sm" onClick={() => fetchRequests(requestsCursor)}>Load more</Button>
+                        </div>
+                      )}
+                    />
                   )}
                 </CardContent>
               </Card>
@@ -1853,14 +2065,14 @@ export default function App() {
                     <Clock className="w-5 h-5 text-yellow-600" />
                     <span className="text-sm font-medium">Pending</span>
                   </div>
-                  <Badge className="bg-yellow-500">{requests.filter(r => r.status === 'pending').length}</Badge>
+                  <Badge className="bg-yellow-500">{requestsByStatus.pending.length}</Badge>
                 </div>
                 <div className="flex items-center justify-between p-3 bg-green-50 rounded-lg">
                   <div className="flex items-center gap-2">
                     <CheckCircle2 className="w-5 h-5 text-green-600" />
                     <span className="text-sm font-medium">Approved</span>
                   </div>
-                  <Badge className="bg-green-500">{requests.filter(r => r.status === 'approved').length}</Badge>
+                  <Badge className="bg-green-500">{requestsByStatus.approved.length}</Badge>
                 </div>
               </CardContent>
             </Card>
@@ -2299,9 +2511,11 @@ export default function App() {
       {!user && currentPage === 'about' && <AboutPage />}
       {!user && currentPage === 'courses' && <CoursesPage />}
       
+      {/* Called rather than mounted as <Page />: these are redefined on every render, and as
+          elements they would remount each time, resetting table scroll and the active tab */}
       {user?.role === 'academic' && currentPage === 'dashboard' && <AdminDashboard />}
-      {user?.role === 'academic' && currentPage === 'students' && <StudentsPage />}
-      {user?.role === 'academic' && currentPage === 'requests' && <RequestsPage />}
+      {user?.role === 'academic' && currentPage === 'students' && StudentsPage()}
+      {user?.role === 'academic' && currentPage === 'requests' && RequestsPage()}
       
       {user?.role === 'faculty' && currentPage === 'dashboard' && <AdminDashboard />}
       
@@ -5,16 +5,24 @@ Tests all backend endpoints systematically
 """
 
 import requests
+import base64
+import hashlib
+import hmac
+import io
 import json
 import sys
 import os
+import zipfile
 from datetime import datetime
 
+from namespaced_suite import NamespacedSuite
+
 # Get base URL from environment
-BASE_URL = "https://agent-alarm-3.preview.emergentagent.com/api"
+BASE_URL = os.environ.get("API_BASE_URL", "https://agent-alarm-3.preview.emergentagent.com/api")
 
-class APITester:
-    def __init__(self):
+class APITester(NamespacedSuite):
+    def __init__(self, namespace=None):
+        super().__init__(namespace)
         self.base_url = BASE_URL
         self.session = requests.Session()
         self.test_results = []
@@ -56,7 +64,8 @@ class APITester:
     def test_csv_upload(self):
         """Test CSV student upload"""
         try:
-            csv_data = "Name,Email,Roll No,Department\nJohn Doe,john.doe@test.com,CS001,Computer Science\nJane Smith,jane.smith@test.com,CS002,Computer Science\nBob Wilson,bob.wilson@test.com,EE001,Electrical Engineering"
+            ns, dept = self.namespace, self.department
+            csv_data = f"Name,Email,Roll No,Department\nJohn Doe,john.doe+{ns}@test.com,CS001,{dept}\nJane Smith,jane.smith+{ns}@test.com,CS002,{dept}\nBob Wilson,bob.wilson+{ns}@test.com,EE001,{dept}"
             
             payload = {"csvData": csv_data}
             response = self.session.post(f"{self.base_url}/students/upload", json=payload)
@@ -79,7 +88,7 @@ class APITester:
     def test_get_students(self):
         """Test getting all students"""
         try:
-            response = self.session.get(f"{self.base_url}/students")
+            response = self.session.get(f"{self.base_url}/students", params={"department": self.department})
             
             if response.status_code == 200:
                 data = response.json()
@@ -98,6 +107,105 @@ class APITester:
             self.log_test("Get Students", False, f"Exception: {str(e)}")
             return False
     
+    def test_get_students_columns(self):
+        """Test the columnar list format matches the default rows"""
+        try:
+            params = {"department": self.department}
+            rows = self.session.get(f"{self.base_url}/students", params=params)
+            columnar = self.session.get(f"{self.base_url}/students", params={**params, "format": "columns"})
+            invalid = self.session.get(f"{self.base_url}/students", params={**params, "format": "xml"})
+
+            if rows.status_code != 200 or columnar.status_code != 200:
+                self.log_test("Get Students (Columns)", False, f"Status: {rows.status_code}/{columnar.status_code}")
+                return False
+            if invalid.status_code != 400:
+                self.log_test("Get Students (Columns)", False, f"Unknown format returned {invalid.status_code}, expected 400")
+                return False
+
+            data = columnar.json()
+            columns = data.get("columns", [])
+            rebuilt = [
+                {column: value for column, value in zip(columns, row) if value is not None}
+                for row in data.get("rows", [])
+            ]
+            expected = [{key: value for key, value in row.items() if value is not None} for row in rows.json()]
+            if rebuilt == expected and len(set(columns)) == len(columns):
+                self.log_test("Get Students (Columns)", True, f"{len(rebuilt)} rows across {len(columns)} columns")
+                return True
+            self.log_test("Get Students (Columns)", False, "Columnar rows differ from the default format")
+            return False
+        except Exception as e:
+            self.log_test("Get Students (Columns)", False, f"Exception: {str(e)}")
+            return False
+
+    def test_export_students(self):
+        """Test the student export matches the list and resumes from a row cursor"""
+        try:
+            params = {"department": self.department}
+            anonymous = requests.get(f"{self.base_url}/students/export", params=params)
+            if anonymous.status_code != 401:
+                self.log_test("Export Students", False, f"Export without a session returned {anonymous.status_code}, expected 401")
+                return False
+            login = self.session.post(f"{self.base_url}/auth/login", json={
+                "userId": f"admin+{self.namespace}@institute.edu", "password": "admin123", "role": "academic"
+            })
+            if login.status_code != 200:
+                self.log_test("Export Students", False, f"Academic login failed: {login.status_code}")
+                return False
+
+            rows = self.session.get(f"{self.base_url}/students", params={**params, "limit": 1000})
+            export = self.session.get(f"{self.base_url}/students/export", params=params)
+            as_csv = self.session.get(f"{self.base_url}/students/export", params={**params, "format": "csv"})
+            invalid = self.session.get(f"{self.base_url}/students/export", params={**params, "format": "xml"})
+
+            if rows.status_code != 200 or export.status_code != 200 or as_csv.status_code != 200:
+                self.log_test("Export Students", False, f"Status: {rows.status_code}/{export.status_code}/{as_csv.status_code}")
+                return False
+            if invalid.status_code != 400:
+                self.log_test("Export Students", False, f"Unknown format returned {invalid.status_code}, expected 400")
+                return False
+
+            exported = [json.loads(line) for line in export.text.splitlines() if line]
+            if [row["id"] for row in exported] != [row["id"] for row in rows.json()]:
+                self.log_test("Export Students", False, "Exported rows differ from GET /students")
+                return False
+            if any("password" in row for row in exported):
+                self.log_test("Export Students", False, "Export includes password hashes")
+                return False
+            csv_lines = as_csv.content.decode("utf-8-sig").splitlines()
+            if not csv_lines or not csv_lines[0].startswith("id,name,email") or len(csv_lines) != len(exported) + 1:
+                self.log_test("Export Students", False, f"Unexpected CSV: {len(csv_lines)} lines")
+                return False
+
+            if exported:
+                first = exported[0]
+                resumed = self.session.get(f"{self.base_url}/students/export", params={
+                    **params, "format": "csv", "after": f"{first['createdAt']},{first['id']}"
+                })
+                if resumed.status_code != 200 or resumed.text.splitlines() != csv_lines[2:]:
+                    self.log_test("Export Students", False, "Resumed CSV is not the rest of the full export")
+                    return False
+
+            # fake_api.py has no XLSX writer and answers 501; the real server must send a workbook
+            as_xlsx = self.session.get(f"{self.base_url}/students/export", params={**params, "format": "xlsx"})
+            formats = "NDJSON and CSV"
+            if as_xlsx.status_code != 501:
+                try:
+                    with zipfile.ZipFile(io.BytesIO(as_xlsx.content)) as workbook:
+                        sheet = workbook.read("xl/worksheets/sheet1.xml").decode("utf-8")
+                except (zipfile.BadZipFile, KeyError):
+                    sheet = ""
+                if as_xlsx.status_code != 200 or sheet.count("<row ") != len(exported) + 1:
+                    self.log_test("Export Students", False, f"Unexpected XLSX: status {as_xlsx.status_code}, {sheet.count('<row ')} rows")
+                    return False
+                formats = "NDJSON, CSV and XLSX"
+
+            self.log_test("Export Students", True, f"{len(exported)} rows as {formats}")
+            return True
+        except Exception as e:
+            self.log_test("Export Students", False, f"Exception: {str(e)}")
+            return False
+
     def test_student_login(self):
         """Test student login"""
         if not self.student_data:
@@ -132,7 +240,7 @@ class APITester:
         """Test academic/admin login"""
         try:
             payload = {
-                "userId": "admin@institute.edu",
+                "userId": f"admin+{self.namespace}@institute.edu",
                 "password": "admin123",
                 "role": "academic",
                 "name": "Academic Administrator"
@@ -155,11 +263,69 @@ class APITester:
             self.log_test("Academic Login", False, f"Exception: {str(e)}")
             return False
     
+    def test_session_tokens(self):
+        """Test login tokens: verification, tampering, refresh and logout"""
+        try:
+            session = requests.Session()
+            login = session.post(f"{self.base_url}/auth/login", json={
+                "userId": f"faculty+{self.namespace}@institute.edu", "password": "faculty123", "role": "faculty"
+            })
+            if login.status_code != 200 or not login.json().get("accessToken"):
+                self.log_test("Session Tokens", False, f"Login returned no token: {login.status_code}")
+                return False
+            data = login.json()
+            token = data["accessToken"]
+
+            me = requests.get(f"{self.base_url}/auth/me", headers={"Authorization": f"Bearer {token}"})
+            if me.status_code != 200 or me.json().get("id") != data["user"]["id"] or me.json().get("role") != "faculty":
+                self.log_test("Session Tokens", False, f"Bearer token not accepted: {me.status_code}")
+                return False
+
+            header, payload, signature = token.split(".")
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+            forged = base64.urlsafe_b64encode(json.dumps({**claims, "role": "academic"}).encode()).rstrip(b"=").decode()
+            tampered = requests.get(f"{self.base_url}/auth/me", headers={"Authorization": f"Bearer {header}.{forged}.{signature}"})
+            if tampered.status_code != 401:
+                self.log_test("Session Tokens", False, f"Tampered token returned {tampered.status_code}, expected 401")
+                return False
+
+            # A token signed with a rotated-out key must still verify (set in CI for the real server)
+            previous_secret = os.environ.get("SESSION_SECRET_PREVIOUS", "").split(",")[0]
+            if previous_secret:
+                kid = hashlib.sha256(previous_secret.encode()).hexdigest()[:12]
+                old_header = base64.urlsafe_b64encode(
+                    json.dumps({"alg": "HS256", "typ": "JWT", "kid": kid}, separators=(",", ":")).encode()
+                ).rstrip(b"=").decode()
+                signing_input = f"{old_header}.{payload}"
+                digest = hmac.new(previous_secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+                old_signature = base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+                rotated = requests.get(f"{self.base_url}/auth/me", headers={"Authorization": f"Bearer {signing_input}.{old_signature}"})
+                if rotated.status_code != 200 or rotated.json().get("id") != data["user"]["id"]:
+                    self.log_test("Session Tokens", False, f"Token signed with the previous secret returned {rotated.status_code}, expected 200")
+                    return False
+
+            refreshed = session.post(f"{self.base_url}/auth/refresh")
+            if refreshed.status_code != 200 or refreshed.json().get("user", {}).get("id") != data["user"]["id"]:
+                self.log_test("Session Tokens", False, f"Refresh failed: {refreshed.status_code}")
+                return False
+
+            session.post(f"{self.base_url}/auth/logout")
+            after_logout = session.post(f"{self.base_url}/auth/refresh")
+            if after_logout.status_code != 401:
+                self.log_test("Session Tokens", False, f"Refresh after logout returned {after_logout.status_code}, expected 401")
+                return False
+
+            self.log_test("Session Tokens", True, "Token verified, tampering rejected, refresh and logout work")
+            return True
+        except Exception as e:
+            self.log_test("Session Tokens", False, f"Exception: {str(e)}")
+            return False
+
     def test_faculty_login(self):
         """Test faculty login"""
         try:
             payload = {
-                "userId": "faculty@institute.edu",
+                "userId": f"faculty+{self.namespace}@institute.edu",
                 "password": "faculty123",
                 "role": "faculty",
                 "name": "Faculty Member"
@@ -293,6 +459,55 @@ class APITester:
             self.log_test("Update Request Status", False, f"Exception: {str(e)}")
             return False
     
+    def test_batch_update_requests(self):
+        """Test approving/rejecting several requests in one call"""
+        if not self.student_data:
+            self.log_test("Batch Update Requests", False, "No student data available")
+            return False
+            
+        try:
+            request_ids = []
+            for service_type in ["noc", "tc"]:
+                payload = {
+                    "studentId": self.student_data['id'],
+                    "studentName": self.student_data['name'],
+                    "studentEmail": self.student_data['email'],
+                    "rollNo": self.student_data['rollNo'],
+                    "department": self.student_data['department'],
+                    "serviceType": service_type,
+                    "details": {"purpose": "Batch update test"}
+                }
+                response = self.session.post(f"{self.base_url}/requests", json=payload)
+                if response.status_code != 200:
+                    self.log_test("Batch Update Requests", False, f"Could not create request: {response.status_code}")
+                    return False
+                request_ids.append(response.json()['id'])
+            
+            payload = {
+                "ids": request_ids + ["nonexistent-id"],
+                "status": "rejected",
+                "remarks": "Rejected in batch by testing agent"
+            }
+            response = self.session.put(f"{self.base_url}/requests/batch", json=payload)
+            
+            if response.status_code == 200:
+                data = response.json()
+                outcomes = {result['id']: result['ok'] for result in data.get('results', [])}
+                if (data.get('updated') == 2 and data.get('failed') == 1 and
+                        all(outcomes.get(request_id) for request_id in request_ids) and
+                        outcomes.get("nonexistent-id") is False):
+                    self.log_test("Batch Update Requests", True, "2 requests rejected, missing id reported")
+                    return True
+                else:
+                    self.log_test("Batch Update Requests", False, f"Unexpected outcomes: {data}")
+                    return False
+            else:
+                self.log_test("Batch Update Requests", False, f"Status: {response.status_code}, Response: {response.text}")
+                return False
+        except Exception as e:
+            self.log_test("Batch Update Requests", False, f"Exception: {str(e)}")
+            return False
+    
     def test_dashboard_stats(self):
         """Test dashboard statistics"""
         try:
@@ -493,13 +708,17 @@ class APITester:
             ("Root API", self.test_root_endpoint),
             ("CSV Upload", self.test_csv_upload),
             ("Get Students", self.test_get_students),
+            ("Get Students (Columns)", self.test_get_students_columns),
+            ("Export Students", self.test_export_students),
             ("Student Login", self.test_student_login),
             ("Academic Login", self.test_academic_login),
+            ("Session Tokens", self.test_session_tokens),
             ("Faculty Login", self.test_faculty_login),
             ("Create Service Request", self.test_create_service_request),
             ("Get All Requests", self.test_get_all_requests),
             ("Get Student Requests", self.test_get_student_requests),
             ("Update Request Status", self.test_update_request_status),
+            ("Batch Update Requests", self.test_batch_update_requests),
             ("Dashboard Stats", self.test_dashboard_stats),
             ("Fee Structures", self.test_fee_structures),
             ("Services", self.test_services),
@@ -511,19 +730,7 @@ class APITester:
             ("Update Student Invalid UUID", self.test_update_student_invalid_uuid)
         ]
         
-        passed = 0
-        failed = 0
-        
-        for test_name, test_func in tests:
-            try:
-                if test_func():
-                    passed += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                print(f"❌ FAIL {test_name}: Unexpected error - {str(e)}")
-                failed += 1
-            print("-" * 60)
+        passed, failed = self.run_tests(tests, "-" * 60)
         
         # Summary
         print("=" * 60)
@@ -538,6 +745,11 @@ class APITester:
         return passed, failed, self.test_results
 
 if __name__ == "__main__":
+    # `backend_test.py --load [options]` replays the same flows concurrently (see load_test.py)
+    if len(sys.argv) > 1 and sys.argv[1] == "--load":
+        import load_test
+        sys.exit(load_test.main(sys.argv[2:]))
+
     tester = APITester()
     passed, failed, results = tester.run_all_tests()
     
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Institute Service Portal Backend API - Latency Benchmarks
+Reuses the request flows of the functional test suites, times every call with
+warm-up and repeat runs against a seeded dataset, and compares p95 latency per
+endpoint against a stored JSON baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from backend_test import BASE_URL
+from load_test import percentile
+from run_tests import SUITES
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+DATASET_SIZES = {"1k": 1000, "10k": 10000, "100k": 100000}
+SEED_DEPARTMENT = "Benchmark"
+
+UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I)
+
+
+def endpoint_label(method, url, base_url):
+    """Collapse ids and query values so every call to a route lands in one bucket"""
+    path, _, query = url[len(base_url):].partition("?")
+    path = UUID_RE.sub(":id", path) or "/"
+    keys = sorted({pair.split("=", 1)[0] for pair in query.split("&") if pair})
+    return f"{method} {path}" + (f"?{'&'.join(keys)}" if keys else "")
+
+
+class TimedSession(requests.Session):
+    """requests.Session that records the latency of every call it makes"""
+
+    def __init__(self, base_url, recorder):
+        super().__init__()
+        self.base_url = base_url
+        self.recorder = recorder
+
+    def request(self, method, url, *args, **kwargs):
+        started = time.perf_counter()
+        response = super().request(method, url, *args, **kwargs)
+        self.recorder(endpoint_label(method.upper(), url, self.base_url), (time.perf_counter() - started) * 1000)
+        return response
+
+
+class Benchmark:
+    def __init__(self, base_url=BASE_URL, dataset="1k", warmup=1, repeat=5, threshold=0.2, min_slack_ms=5.0):
+        self.base_url = base_url.rstrip("/")
+        self.dataset = dataset
+        self.size = DATASET_SIZES[dataset]
+        self.warmup = warmup
+        self.repeat = repeat
+        self.threshold = threshold
+        self.min_slack_ms = min_slack_ms
+        self.samples = defaultdict(list)
+        self.recording = False
+
+    def record(self, endpoint, elapsed_ms):
+        if self.recording:
+            self.samples[endpoint].append(elapsed_ms)
+
+    # ---------- Dataset ----------
+
+    def read_all(self, path, params):
+        """Every row of a paged list endpoint, following X-Next-Cursor"""
+        rows = []
+        params = {**params, "limit": 1000}
+        while True:
+            page = requests.get(f"{self.base_url}{path}", params=params, timeout=60)
+            page.raise_for_status()
+            rows.extend(page.json())
+            params["after"] = page.headers.get("X-Next-Cursor")
+            if not params["after"]:
+                return rows
+
+    def seed(self, workers=16):
+        """Make sure the Benchmark department has at least `size` students and requests;
+        reruns reuse them and only add what is missing"""
+        students = self.read_all("/students", {"department": SEED_DEPARTMENT})
+        existing_emails = {student["email"] for student in students}
+        missing = [i for i in range(self.size) if f"bench-{i}@bench.local" not in existing_emails]
+        if missing:
+            print(f"Seeding {len(missing)} students ({len(students)} already there)...")
+            chunk = 5000
+            for start in range(0, len(missing), chunk):
+                lines = ["Name,Email,Roll No,Department"]
+                lines += [f"Bench Student {i},bench-{i}@bench.local,BN{i:06d},{SEED_DEPARTMENT}" for i in missing[start:start + chunk]]
+                response = requests.post(f"{self.base_url}/students/upload", json={"csvData": "\n".join(lines)}, timeout=600)
+                response.raise_for_status()
+            students = self.read_all("/students", {"department": SEED_DEPARTMENT})
+
+        existing_requests = len(self.read_all("/requests", {"department": SEED_DEPARTMENT}))
+        if existing_requests >= self.size:
+            print(f"Dataset already has {len(students)} students and {existing_requests} requests in {SEED_DEPARTMENT}")
+            return
+
+        print(f"Seeding {self.size - existing_requests} service requests ({existing_requests} already there)...")
+        # requests.Session is not thread-safe, so every worker thread keeps its own
+        local = threading.local()
+
+        def create(i):
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+            student = students[i % len(students)]
+            response = local.session.post(f"{self.base_url}/requests", json={
+                "studentId": student["id"],
+                "studentName": student["name"],
+                "studentEmail": student["email"],
+                "rollNo": student["rollNo"],
+                "department": student["department"],
+                "serviceType": ("bonafide", "fee", "tc", "noc")[i % 4],
+                "details": {"purpose": "Benchmark"},
+            }, timeout=60)
+            response.raise_for_status()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(create, range(existing_requests, self.size)))
+
+    # ---------- Runs ----------
+
+    def run_suites(self):
+        for label, tester_class, run_method in SUITES:
+            tester = tester_class()
+            tester.base_url = self.base_url
+            tester.session = TimedSession(self.base_url, self.record)
+            # The suites print every assertion; keep the benchmark output readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                getattr(tester, run_method)()
+
+    def run(self):
+        print("=" * 60)
+        print("INSTITUTE SERVICE PORTAL - LATENCY BENCHMARK")
+        print("=" * 60)
+        print(f"Base URL: {self.base_url}")
+        print(f"Dataset: {self.dataset} ({self.size} students/requests), warm-up: {self.warmup}, repeat: {self.repeat}")
+        print(f"Started at: {datetime.now().isoformat()}")
+        print("=" * 60)
+
+        for _ in range(self.warmup):
+            self.run_suites()
+        self.recording = True
+        for _ in range(self.repeat):
+            self.run_suites()
+        self.recording = False
+        return self.results()
+
+    def results(self):
+        results = {}
+        for endpoint, values in sorted(self.samples.items()):
+            ordered = sorted(values)
+            results[endpoint] = {
+                "count": len(ordered),
+                "p50": round(percentile(ordered, 50), 2),
+                "p95": round(percentile(ordered, 95), 2),
+                "p99": round(percentile(ordered, 99), 2),
+            }
+        return results
+
+    # ---------- Baselines ----------
+
+    def baseline_path(self):
+        return os.path.join(BASELINE_DIR, f"baseline-{self.dataset}.json")
+
+    def save_baseline(self, results):
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(self.baseline_path(), "w") as f:
+            json.dump({
+                "dataset": self.dataset,
+                "created": datetime.now().isoformat(),
+                "warmup": self.warmup,
+                "repeat": self.repeat,
+                "endpoints": results,
+            }, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {self.baseline_path()}")
+
+    def compare(self, results):
+        """Return the endpoints whose p95 regressed past the threshold"""
+        with open(self.baseline_path()) as f:
+            baseline = json.load(f)["endpoints"]
+
+        regressions = []
+        print(f"{'Endpoint':<44}{'Base p95':>10}{'p95':>10}{'Change':>9}")
+        for endpoint, current in results.items():
+            previous = baseline.get(endpoint)
+            if not previous:
+                print(f"{endpoint:<44}{'-':>10}{current['p95']:>10.1f}{'new':>9}")
+                continue
+            # Allow a small absolute slack so sub-millisecond endpoints don't flap
+            limit = max(previous["p95"] * (1 + self.threshold), previous["p95"] + self.min_slack_ms)
+            change = (current["p95"] / previous["p95"] - 1) * 100 if previous["p95"] else 0.0
+            flag = "  ❌" if current["p95"] > limit else ""
+            print(f"{endpoint:<44}{previous['p95']:>10.1f}{current['p95']:>10.1f}{change:>8.0f}%{flag}")
+            if current["p95"] > limit:
+                regressions.append(endpoint)
+        return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latency regression benchmarks for the portal API")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--local", action="store_true", help="run against an in-process fake_api server")
+    parser.add_argument("--dataset", choices=sorted(DATASET_SIZES), default="1k")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed passes before measuring")
+    parser.add_argument("--repeat", type=int, default=5, help="timed passes over every suite")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p95 regression, 0.2 = 20%%")
+    parser.add_argument("--skip-seed", action="store_true", help="use whatever data is already there")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args(argv)
+    if args.local:
+        from fake_api import start_server
+        _, args.base_url = start_server()
+
+    bench = Benchmark(args.base_url, args.dataset, args.warmup, args.repeat, args.threshold)
+    if not args.skip_seed:
+        bench.seed()
+    results = bench.run()
+
+    if args.save_baseline or not os.path.exists(bench.baseline_path()):
+        bench.save_baseline(results)
+        return 0
+
+    regressions = bench.compare(results)
+    print("=" * 60)
+    if regressions:
+        print(f"p95 regressed on {len(regressions)} endpoint(s): {', '.join(regressions)}")
+        return 1
+    print("No p95 regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
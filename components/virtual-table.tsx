@@ -0,0 +1,81 @@
+'use client';
+
+import { useState, type ReactNode } from 'react';
+import {
+  flexRender, getCoreRowModel, useReactTable,
+  type ColumnDef, type RowData
+} from '@tanstack/react-table';
+import { TableBody, TableCell, TableHead, TableHeader, TableRow } from '@/components/ui/table';
+
+declare module '@tanstack/react-table' {
+  // eslint-disable-next-line @typescript-eslint/no-unused-vars
+  interface ColumnMeta<TData extends RowData, TValue> {
+    className?: string;
+  }
+}
+
+interface VirtualTableProps<T> {
+  data: T[];
+  columns: ColumnDef<T, any>[];
+  getRowId: (row: T) => string;
+  // Every row is rendered at exactly this height so the window can be computed from scrollTop
+  rowHeight: number;
+  height?: number;
+  overscan?: number;
+  footer?: ReactNode;
+}
+
+// Table that only mounts the rows in view. Rows above and below the window are replaced
+// by two spacer rows, so the DOM holds a few dozen rows however long `data` is.
+export function VirtualTable<T>({
+  data, columns, getRowId, rowHeight, height = 500, overscan = 10, footer
+}: VirtualTableProps<T>) {
+  // Tracked in whole rows, so scrolling within a row doesn't re-render
+  const [firstVisible, setFirstVisible] = useState(0);
+  const table = useReactTable({ data, columns, getRowId, getCoreRowModel: getCoreRowModel() });
+
+  const rows = table.getRowModel().rows;
+  const start = Math.max(0, Math.min(firstVisible, rows.length) - overscan);
+  const end = Math.min(rows.length, firstVisible + Math.ceil(height / rowHeight) + overscan);
+  const columnCount = table.getVisibleLeafColumns().length;
+
+  return (
+    <div
+      className="relative overflow-auto"
+      style={{ height }}
+      onScroll={(e) => setFirstVisible(Math.floor(e.currentTarget.scrollTop / rowHeight))}
+    >
+      <table className="w-full caption-bottom text-sm">
+        <TableHeader className="sticky top-0 z-10 bg-gray-50">
+          {table.getHeaderGroups().map((group) => (
+            <TableRow key={group.id} className="bg-gray-50">
+              {group.headers.map((header) => (
+                <TableHead key={header.id} className={header.column.columnDef.meta?.className}>
+                  {header.isPlaceholder ? null : flexRender(header.column.columnDef.header, header.getContext())}
+                </TableHead>
+              ))}
+            </TableRow>
+          ))}
+        </TableHeader>
+        <TableBody>
+          {start > 0 && (
+            <tr aria-hidden style={{ height: start * rowHeight }}><td colSpan={columnCount} /></tr>
+          )}
+          {rows.slice(start, end).map((row) => (
+            <TableRow key={row.id} className="hover:bg-gray-50 whitespace-nowrap" style={{ height: rowHeight }}>
+              {row.getVisibleCells().map((cell) => (
+                <TableCell key={cell.id} className={cell.column.columnDef.meta?.className}>
+                  {flexRender(cell.column.columnDef.cell, cell.getContext())}
+                </TableCell>
+              ))}
+            </TableRow>
+          ))}
+          {end < rows.length && (
+            <tr aria-hidden style={{ height: (rows.length - end) * rowHeight }}><td colSpan={columnCount} /></tr>
+          )}
+        </TableBody>
+      </table>
+      {footer}
+    </div>
+  );
+}
@@ -7,12 +7,17 @@ Tests error handling and edge cases
 import requests
 import json
 import sys
+import os
 from datetime import datetime
 
-BASE_URL = "https://agent-alarm-3.preview.emergentagent.com/api"
+from namespaced_suite import NamespacedSuite
 
-class EdgeCaseTester:
-    def __init__(self):
+# Get base URL from environment
+BASE_URL = os.environ.get("API_BASE_URL", "https://agent-alarm-3.preview.emergentagent.com/api")
+
+class EdgeCaseTester(NamespacedSuite):
+    def __init__(self, namespace=None):
+        super().__init__(namespace)
         self.base_url = BASE_URL
         self.session = requests.Session()
         
@@ -25,7 +30,7 @@ class EdgeCaseTester:
         """Test login with invalid credentials"""
         try:
             payload = {
-                "userId": "nonexistent@test.com",
+                "userId": f"nonexistent+{self.namespace}@test.com",
                 "password": "wrongpassword",
                 "role": "student"
             }
@@ -122,6 +127,52 @@ class EdgeCaseTester:
             self.log_test("Invalid Route", False, f"Exception: {str(e)}")
             return False
     
+    def test_certificate_ranges(self):
+        """Test Range handling on a certificate: a valid range, an inverted one and one past the end"""
+        try:
+            created = self.session.post(f"{self.base_url}/requests", json={
+                "studentId": f"range-{self.namespace}",
+                "studentName": "Range Test",
+                "studentEmail": f"range+{self.namespace}@test.com",
+                "rollNo": "RANGE01",
+                "department": f"Test Run {self.namespace}",
+                "serviceType": "bonafide",
+                "details": {"purpose": "Range test"}
+            })
+            if created.status_code != 200:
+                self.log_test("Certificate Ranges", False, f"Could not create a request: {created.status_code}")
+                return False
+            request_id = created.json()["id"]
+            self.session.put(f"{self.base_url}/requests/{request_id}", json={"status": "approved"})
+
+            url = f"{self.base_url}/requests/{request_id}/certificate"
+            full = self.session.get(url)
+            if full.status_code != 200 or len(full.content) < 10:
+                self.log_test("Certificate Ranges", False, f"Full download returned {full.status_code}")
+                return False
+            size = len(full.content)
+
+            head = self.session.get(url, headers={"Range": "bytes=0-9"})
+            # RFC 7233: an invalid range (last byte before the first) is ignored, not a 416
+            inverted = self.session.get(url, headers={"Range": "bytes=5-3"})
+            past_end = self.session.get(url, headers={"Range": f"bytes={size}-"})
+
+            if head.status_code != 206 or head.content != full.content[:10]:
+                self.log_test("Certificate Ranges", False, f"bytes=0-9 returned {head.status_code}, expected 206 with the first 10 bytes")
+                return False
+            if inverted.status_code != 200 or inverted.content != full.content:
+                self.log_test("Certificate Ranges", False, f"bytes=5-3 returned {inverted.status_code}, expected 200 with the full body")
+                return False
+            if past_end.status_code != 416 or past_end.headers.get("Content-Range") != f"bytes */{size}":
+                self.log_test("Certificate Ranges", False, f"bytes={size}- returned {past_end.status_code}, expected 416")
+                return False
+
+            self.log_test("Certificate Ranges", True, "206 for a valid range, 200 for an inverted one, 416 past the end")
+            return True
+        except Exception as e:
+            self.log_test("Certificate Ranges", False, f"Exception: {str(e)}")
+            return False
+
     def run_edge_case_tests(self):
         """Run all edge case tests"""
         print("=" * 60)
@@ -134,7 +185,8 @@ class EdgeCaseTester:
             ("Empty CSV Upload", self.test_invalid_csv_upload),
             ("Invalid Service Request", self.test_invalid_service_request),
             ("Update Nonexistent Request", self.test_nonexistent_request_update),
-            ("Invalid Route", self.test_invalid_route)
+            ("Invalid Route", self.test_invalid_route),
+            ("Certificate Ranges", self.test_certificate_ranges)
         ]
         
         passed = 0
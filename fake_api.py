@@ -0,0 +1,839 @@
+#!/usr/bin/env python3
+"""
+Institute Service Portal Backend API - Local Stand-in
+An in-memory copy of the /api surface (auth, students, requests, notifications,
+services, fee structures, stats) so the test, load and benchmark suites can run
+offline and deterministically. Mirrors app/api/[[...path]]/route.ts response shapes
+"""
+
+import argparse
+import base64
+import bisect
+import csv
+import hashlib
+import hmac
+import io
+import json
+import os
+import re
+import secrets
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+DEFAULT_STUDENT_PASSWORD = "student@123"
+SESSION_SECRET = (os.environ.get("SESSION_SECRET") or secrets.token_hex(32)).encode()
+ACCESS_TTL_S = 900
+REFRESH_TTL_S = 7 * 24 * 60 * 60
+SESSION_ROLES = ("student", "faculty", "academic")
+
+SERVICE_NAMES = {
+    "bonafide": "Bonafide Certificate",
+    "fee": "Fee Structure",
+    "tc": "Transfer Certificate",
+    "noc": "NOC",
+}
+
+CURSOR_RE = re.compile(r"^(\d{4}-\d{2}-\d{2}T[\d:.]+Z),(.+)$")
+DATE_ONLY_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+STUDENT_EXPORT_COLUMNS = (
+    "id", "name", "email", "rollNo", "department", "phone", "address", "dateOfBirth",
+    "guardianName", "guardianPhone", "bloodGroup", "createdAt", "updatedAt",
+)
+REQUEST_EXPORT_COLUMNS = (
+    "id", "studentId", "studentName", "studentEmail", "rollNo", "department",
+    "serviceType", "status", "remarks", "details", "createdAt", "updatedAt",
+)
+
+
+def now_iso():
+    """Timestamps serialize like a JS Date, so they also sort lexicographically"""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def parse_limit(value, fallback=DEFAULT_PAGE_SIZE):
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return fallback
+    return min(limit, MAX_PAGE_SIZE) if limit > 0 else fallback
+
+
+def parse_cursor(value):
+    match = CURSOR_RE.match(value or "")
+    return (match.group(1), match.group(2)) if match else None
+
+
+def iso(moment):
+    return moment.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def created_at_range(start, end):
+    """(lower bound inclusive, upper bound exclusive) as sortable strings; a date-only `to` covers that whole day"""
+    bounds = []
+    for value, is_end in ((start, False), (end, True)):
+        if not value:
+            bounds.append(None)
+            continue
+        try:
+            moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            raise ApiError(400, "from and to must be dates (YYYY-MM-DD) or ISO timestamps")
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        if is_end:
+            moment += timedelta(days=1) if DATE_ONLY_RE.match(value) else timedelta(milliseconds=1)
+        bounds.append(iso(moment))
+    return tuple(bounds)
+
+
+def b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def b64url_decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+TOKEN_HEADER = b64url(json.dumps({"alg": "HS256", "typ": "JWT", "kid": "fake"}).encode())
+
+
+def sign_token(claims, ttl):
+    iat = int(time.time())
+    signing_input = f"{TOKEN_HEADER}.{b64url(json.dumps({**claims, 'iat': iat, 'exp': iat + ttl}).encode())}"
+    return f"{signing_input}.{b64url(hmac.new(SESSION_SECRET, signing_input.encode(), hashlib.sha256).digest())}"
+
+
+def verify_token(token, typ):
+    """Claims of a valid HS256 token of this type, as lib/session.ts checks them, or None"""
+    parts = (token or "").split(".")
+    if len(parts) != 3 or parts[0] != TOKEN_HEADER:
+        return None
+    expected = hmac.new(SESSION_SECRET, f"{parts[0]}.{parts[1]}".encode(), hashlib.sha256).digest()
+    try:
+        if not hmac.compare_digest(b64url_decode(parts[2]), expected):
+            return None
+        claims = json.loads(b64url_decode(parts[1]))
+    except ValueError:
+        return None
+    if claims.get("typ") != typ or claims.get("role") not in SESSION_ROLES or claims.get("exp", 0) <= time.time():
+        return None
+    return claims
+
+
+def cookie(headers, name):
+    jar = SimpleCookie(headers.get("Cookie") or "")
+    return jar[name].value if name in jar else None
+
+
+def session_cookies(access_token, refresh_token):
+    if access_token is None:
+        return [
+            "portal_session=; Path=/api; Max-Age=0",
+            "portal_refresh=; Path=/api/auth; Max-Age=0",
+        ]
+    return [
+        f"portal_session={access_token}; Path=/api; Max-Age={ACCESS_TTL_S}; HttpOnly; SameSite=lax",
+        f"portal_refresh={refresh_token}; Path=/api/auth; Max-Age={REFRESH_TTL_S}; HttpOnly; SameSite=lax",
+    ]
+
+
+def session_response(user, message):
+    """(status, payload, headers) with a fresh token pair, like sessionResponse in route.ts"""
+    claims = {"sub": user["id"], "role": user["role"], "name": user.get("name") or ""}
+    access_token = sign_token({**claims, "typ": "access"}, ACCESS_TTL_S)
+    refresh_token = sign_token({**claims, "typ": "refresh"}, REFRESH_TTL_S)
+    payload = {"user": user, "accessToken": access_token, "expiresIn": ACCESS_TTL_S, "message": message}
+    return 200, payload, {"Set-Cookie": session_cookies(access_token, refresh_token)}
+
+
+def request_session(headers):
+    authorization = headers.get("Authorization") or ""
+    token = authorization[7:] if authorization.startswith("Bearer ") else cookie(headers, "portal_session")
+    return verify_token(token, "access") if token else None
+
+
+def require_role(headers, *roles):
+    session = request_session(headers)
+    if session is None:
+        raise ApiError(401, "Authentication required")
+    if session["role"] not in roles:
+        raise ApiError(403, "Not allowed for this role")
+    return session
+
+
+def csv_cell(value):
+    if value is None or value == {}:
+        return ""
+    text = json.dumps(value) if isinstance(value, dict) else str(value)
+    return "'" + text if text[:1] in ("=", "+", "-", "@", "\t", "\r") else text
+
+
+class Collection:
+    """Documents keyed by id, plus a (createdAt, id) index kept in sort order"""
+
+    def __init__(self):
+        self.docs = {}
+        self.order = []
+
+    def insert(self, doc):
+        self.docs[doc["id"]] = doc
+        bisect.insort(self.order, (doc["createdAt"], doc["id"]))
+
+    def remove(self, doc_id):
+        doc = self.docs.pop(doc_id, None)
+        if doc is not None:
+            key = (doc["createdAt"], doc["id"])
+            self.order.pop(bisect.bisect_left(self.order, key))
+        return doc
+
+    def newest_first(self, match=None, after=None):
+        end = bisect.bisect_left(self.order, after) if after else len(self.order)
+        for i in range(end - 1, -1, -1):
+            doc = self.docs[self.order[i][1]]
+            if match is None or all(doc.get(field) == value for field, value in match.items()):
+                yield doc
+
+    def page(self, match, after, limit):
+        """Keyset page newest first; returns (items, next cursor or None)"""
+        items = []
+        for doc in self.newest_first(match, after):
+            items.append(doc)
+            if len(items) > limit:
+                break
+        if len(items) > limit:
+            items = items[:limit]
+            return items, f"{items[-1]['createdAt']},{items[-1]['id']}"
+        return items, None
+
+    def __len__(self):
+        return len(self.docs)
+
+
+class Store:
+    """All collections behind one lock; every handler holds it for its whole body"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.students = Collection()
+        self.students_by_email = {}
+        self.requests = Collection()
+        self.notifications = Collection()
+        self.users = {}
+        self.services = []
+        self.fee_structures = []
+
+    def upsert_student(self, doc):
+        existing = self.students_by_email.get(doc["email"])
+        if existing:
+            self.students.remove(existing["id"])
+            doc = {**existing, **doc}
+        self.students.insert(doc)
+        self.students_by_email[doc["email"]] = doc
+        return existing is None
+
+    def remove_student(self, student_id):
+        doc = self.students.remove(student_id)
+        if doc is not None:
+            self.students_by_email.pop(doc["email"], None)
+        return doc
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def without(doc, *fields):
+    return {key: value for key, value in doc.items() if key not in fields}
+
+
+def parse_range(header, size):
+    """A single `bytes=start-end` range as lib/byte-range.ts reads it: None means the whole
+    body (no header, several ranges or an invalid one like bytes=5-3)"""
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", header or "")
+    if not match or not (match[1] or match[2]):
+        return None
+    if not match[1]:
+        length = int(match[2])
+        return "unsatisfiable" if length == 0 else (max(0, size - length), size - 1)
+    start = int(match[1])
+    last = int(match[2]) if match[2] else None
+    if last is not None and last < start:
+        return None
+    if start >= size:
+        return "unsatisfiable"
+    return start, size - 1 if last is None else min(last, size - 1)
+
+
+def parse_csv(csv_string):
+    lines = csv_string.strip().split("\n")
+    if len(lines) < 2:
+        return []
+    headers = [re.sub(r"\s+", "_", h.strip().lower()) for h in lines[0].split(",")]
+    rows = []
+    for line in lines[1:]:
+        values = line.split(",")
+        rows.append({h: (values[i].strip() if i < len(values) else "") for i, h in enumerate(headers)})
+    return rows
+
+
+def student_document(name, email, roll_no, department):
+    return {
+        "id": str(uuid.uuid4()),
+        "name": name or "",
+        "email": email or "",
+        "rollNo": roll_no or "",
+        "department": department or "",
+        "password": DEFAULT_STUDENT_PASSWORD,
+        "createdAt": now_iso(),
+    }
+
+
+# ============ ROUTES ============
+
+class Api:
+    def __init__(self, store=None):
+        self.store = store or Store()
+        self.static_routes = {}
+        self.dynamic_routes = {}
+        for method, pattern, handler in [
+            ("GET", "/", self.root),
+            ("GET", "/root", self.root),
+            ("POST", "/auth/login", self.login),
+            ("POST", "/auth/refresh", self.refresh_session),
+            ("POST", "/auth/logout", self.logout),
+            ("GET", "/auth/me", self.current_session),
+            ("POST", "/students/upload", self.upload_students),
+            ("GET", "/students", self.list_students),
+            ("GET", "/students/export", self.export_students),
+            ("GET", "/students/:id", self.get_student),
+            ("PUT", "/students/:id", self.update_student),
+            ("DELETE", "/students/:id", self.delete_student),
+            ("POST", "/requests", self.create_request),
+            ("GET", "/requests", self.list_requests),
+            ("GET", "/requests/export", self.export_requests),
+            ("GET", "/requests/:id/certificate", self.certificate),
+            ("PUT", "/requests/batch", self.batch_update_requests),
+            ("PUT", "/requests/:id", self.update_request),
+            ("GET", "/notifications", self.list_notifications),
+            ("GET", "/notifications/feed", self.notification_feed),
+            ("PUT", "/notifications/mark-all-read", self.mark_all_read),
+            ("PUT", "/notifications/:id", self.mark_read),
+            ("GET", "/notifications/unread-count", self.unread_count),
+            ("GET", "/services", self.list_services),
+            ("PUT", "/services/:id", self.update_service),
+            ("GET", "/fee-structures", self.list_fee_structures),
+            ("GET", "/stats", self.stats),
+            ("GET", "/health", self.health),
+        ]:
+            self.add(method, pattern, handler)
+
+    def add(self, method, pattern, handler):
+        segments = [s for s in pattern.split("/") if s]
+        if any(s.startswith(":") for s in segments):
+            self.dynamic_routes.setdefault((method, len(segments)), []).append((segments, handler))
+        else:
+            self.static_routes[(method, "/" + "/".join(segments))] = handler
+
+    def match(self, method, path):
+        handler = self.static_routes.get((method, "/" + "/".join(path)))
+        if handler:
+            return handler, {}
+        for segments, candidate in self.dynamic_routes.get((method, len(path)), []):
+            params = {}
+            for segment, value in zip(segments, path):
+                if segment.startswith(":"):
+                    params[segment[1:]] = value
+                elif segment != value:
+                    break
+            else:
+                return candidate, params
+        return None, None
+
+    def dispatch(self, method, path, query, headers, body):
+        """Return (status, payload, extra headers); payload None means no body"""
+        handler, params = self.match(method, path)
+        if handler is None:
+            return 404, {"error": f"Route /{'/'.join(path)} not found"}, {}
+        try:
+            with self.store.lock:
+                result = handler(params=params, query=query, headers=headers, body=body)
+        except ApiError as error:
+            return error.status, {"error": str(error)}, {}
+        except Exception as error:
+            return 500, {"error": "Internal server error", "details": str(error)}, {}
+        if isinstance(result, tuple):
+            return result
+        return 200, result, {}
+
+    def json_body(self, body):
+        return json.loads(body or b"null") or {}
+
+    def root(self, **_):
+        return {"message": "Institute Service Portal API"}
+
+    # ---------- Auth ----------
+
+    def login(self, body, **_):
+        data = self.json_body(body)
+        user_id, password, role = data.get("userId"), data.get("password"), data.get("role")
+        if not user_id or not password or not role:
+            raise ApiError(400, "userId, password, and role are required")
+
+        if role in ("academic", "faculty"):
+            user = self.store.users.get((user_id, role))
+            if user is None:
+                user = {
+                    "id": str(uuid.uuid4()),
+                    "userId": user_id,
+                    "name": data.get("name") or ("Academic Admin" if role == "academic" else "Faculty Member"),
+                    "role": role,
+                    "password": password,
+                    "createdAt": now_iso(),
+                }
+                if role == "faculty":
+                    user["department"] = "General"
+                self.store.users[(user_id, role)] = user
+            elif user["password"] != password:
+                raise ApiError(401, "Invalid credentials")
+            return session_response(without(user, "password"), "Login successful")
+
+        if role == "student":
+            student = self.store.students_by_email.get(user_id)
+            if student is None:
+                raise ApiError(404, "Student not found. Please contact Academic section.")
+            if password != (student.get("password") or DEFAULT_STUDENT_PASSWORD):
+                raise ApiError(401, "Invalid password")
+            return session_response({**without(student, "password"), "role": "student"}, "Login successful")
+
+        raise ApiError(400, "Invalid role")
+
+    def refresh_session(self, headers, body, **_):
+        try:
+            data = self.json_body(body)
+        except ValueError:
+            data = {}
+        token = cookie(headers, "portal_refresh") or data.get("refreshToken")
+        claims = verify_token(token, "refresh") if token else None
+        if claims is None:
+            return 401, {"error": "Invalid or expired refresh token"}, {"Set-Cookie": session_cookies(None, None)}
+        if claims["role"] == "student":
+            student = self.store.students.docs.get(claims["sub"])
+            user = {**without(student, "password"), "role": "student"} if student else None
+        else:
+            user = next((without(u, "password") for u in self.store.users.values()
+                         if u["id"] == claims["sub"] and u["role"] == claims["role"]), None)
+        if user is None:
+            return 401, {"error": "Account no longer exists"}, {"Set-Cookie": session_cookies(None, None)}
+        return session_response(user, "Session refreshed")
+
+    def logout(self, **_):
+        return 200, {"message": "Logged out"}, {"Set-Cookie": session_cookies(None, None)}
+
+    def current_session(self, headers, **_):
+        session = require_role(headers, *SESSION_ROLES)
+        expires_at = datetime.fromtimestamp(session["exp"], timezone.utc)
+        return {"id": session["sub"], "role": session["role"], "name": session["name"], "expiresAt": iso(expires_at)}
+
+    # ---------- Students ----------
+
+    def upload_students(self, body, **_):
+        data = self.json_body(body)
+        if isinstance(data.get("students"), list):
+            docs = [
+                student_document(s.get("name"), s.get("email"), s.get("rollNo"), s.get("department"))
+                for s in data["students"]
+            ]
+        elif data.get("csvData"):
+            rows = parse_csv(data["csvData"])
+            if not rows:
+                raise ApiError(400, "No valid data found")
+            docs = [
+                student_document(
+                    r.get("name"),
+                    r.get("email") or r.get("email_id"),
+                    r.get("roll_no") or r.get("rollno"),
+                    r.get("department"),
+                )
+                for r in rows
+            ]
+        else:
+            raise ApiError(400, "No data provided")
+
+        result = {"inserted": 0, "updated": 0, "failed": 0, "errors": []}
+        for row, doc in enumerate(docs, start=1):
+            if not doc["email"]:
+                result["failed"] += 1
+                result["errors"].append({"row": row, "email": "", "error": "Missing email"})
+            elif self.store.upsert_student(doc):
+                result["inserted"] += 1
+            else:
+                result["updated"] += 1
+        count = result["inserted"] + result["updated"]
+        return {"message": f"{count} students uploaded successfully", "count": count, **result}
+
+    def list_students(self, query, **_):
+        match = {"department": query["department"]} if query.get("department") else None
+        return self.page_response(self.store.students, match, query, hide=("password",))
+
+    def export_students(self, query, headers, **_):
+        require_role(headers, "academic")
+        match = {"department": query["department"]} if query.get("department") else None
+        return self.export_response(self.store.students, match, query, "students", STUDENT_EXPORT_COLUMNS, hide=("password",))
+
+    def get_student(self, params, **_):
+        student = self.store.students.docs.get(params["id"])
+        if student is None:
+            raise ApiError(404, "Student not found")
+        return without(student, "password")
+
+    def update_student(self, params, body, **_):
+        data = self.json_body(body)
+        student = self.store.students.docs.get(params["id"])
+        if student is None:
+            raise ApiError(404, "Student not found")
+        for field in ("name", "phone", "address", "dateOfBirth", "guardianName", "guardianPhone", "bloodGroup"):
+            if data.get(field):
+                student[field] = data[field]
+        student["updatedAt"] = now_iso()
+        return without(student, "password")
+
+    def delete_student(self, params, **_):
+        if self.store.remove_student(params["id"]) is None:
+            raise ApiError(404, "Student not found")
+        return {"message": "Student deleted successfully"}
+
+    # ---------- Service requests ----------
+
+    def create_request(self, body, **_):
+        data = self.json_body(body)
+        if not data.get("studentId") or not data.get("serviceType"):
+            raise ApiError(400, "studentId and serviceType are required")
+        now = now_iso()
+        doc = {
+            "id": str(uuid.uuid4()),
+            "studentId": data["studentId"],
+            "studentName": data.get("studentName") or "",
+            "studentEmail": data.get("studentEmail") or "",
+            "rollNo": data.get("rollNo") or "",
+            "department": data.get("department") or "",
+            "serviceType": data["serviceType"],
+            "details": data.get("details") or {},
+            "status": "pending",
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        self.store.requests.insert(doc)
+        return dict(doc)
+
+    def list_requests(self, query, **_):
+        match = {f: query[f] for f in ("studentId", "status", "department", "serviceType") if query.get(f)}
+        return self.page_response(self.store.requests, match or None, query)
+
+    def export_requests(self, query, headers, **_):
+        require_role(headers, "academic")
+        match = {f: query[f] for f in ("status", "department", "serviceType") if query.get(f)}
+        return self.export_response(self.store.requests, match or None, query, "requests", REQUEST_EXPORT_COLUMNS)
+
+    def certificate(self, params, headers, **_):
+        """Placeholder bytes instead of a PDF, served with the real route's ETag and Range rules"""
+        doc = self.store.requests.docs.get(params["id"])
+        if doc is None:
+            raise ApiError(404, "Request not found")
+        if doc["status"] != "approved" or doc["serviceType"] not in SERVICE_NAMES:
+            raise ApiError(409, "Certificate is only available for approved requests")
+        body = f"%PDF-1.3\n% {SERVICE_NAMES[doc['serviceType']]} for {doc['studentName']} ({doc['updatedAt']})\n".encode()
+        etag = '"' + b64url(hashlib.sha256(body).digest())[:32] + '"'
+        response_headers = {
+            "Content-Type": "application/pdf",
+            "Content-Disposition": f'attachment; filename="{doc["serviceType"]}_{doc["id"][:8]}.pdf"',
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+        }
+        if etag in re.split(r"\s*,\s*", headers.get("If-None-Match") or ""):
+            return 304, None, response_headers
+        if_range = headers.get("If-Range")
+        byte_range = parse_range(headers.get("Range"), len(body)) if not if_range or if_range == etag else None
+        if byte_range == "unsatisfiable":
+            return 416, None, {**response_headers, "Content-Range": f"bytes */{len(body)}"}
+        if byte_range:
+            start, end = byte_range
+            return 206, body[start:end + 1], {**response_headers, "Content-Range": f"bytes {start}-{end}/{len(body)}"}
+        return 200, body, response_headers
+
+    def update_request(self, params, body, **_):
+        data = self.json_body(body)
+        status, remarks = data.get("status"), data.get("remarks")
+        if not status:
+            raise ApiError(400, "status is required")
+        doc = self.store.requests.docs.get(params["id"])
+        if doc is None:
+            raise ApiError(404, "Request not found")
+        doc.update(status=status, remarks=remarks or "", updatedAt=now_iso())
+        self.notify_status(doc, status, remarks)
+        return dict(doc)
+
+    def batch_update_requests(self, body, **_):
+        data = self.json_body(body)
+        ids, status, remarks = data.get("ids"), data.get("status"), data.get("remarks")
+        if not isinstance(ids, list) or not ids or not all(isinstance(i, str) for i in ids) or not status:
+            raise ApiError(400, "ids (non-empty array) and status are required")
+
+        results = []
+        now = now_iso()
+        for request_id in dict.fromkeys(ids):
+            doc = self.store.requests.docs.get(request_id)
+            if doc is None:
+                results.append({"id": request_id, "ok": False, "error": "Request not found"})
+                continue
+            results.append({"id": request_id, "ok": True, "previousStatus": doc["status"]})
+            doc.update(status=status, remarks=remarks or "", updatedAt=now)
+            self.notify_status(doc, status, remarks)
+        updated = sum(1 for result in results if result["ok"])
+        return {"status": status, "updated": updated, "failed": len(results) - updated, "results": results}
+
+    def notify_status(self, doc, status, remarks):
+        if status not in ("approved", "rejected"):
+            return
+        service = SERVICE_NAMES.get(doc["serviceType"], doc["serviceType"])
+        if status == "approved":
+            title = f"{service} Approved!"
+            message = f"Your {service} request has been approved. You can now download it from your dashboard."
+        else:
+            title = f"{service} Rejected"
+            reason = f"Reason: {remarks}" if remarks else "Please contact the academic section for more details."
+            message = f"Your {service} request has been rejected. {reason}"
+        self.store.notifications.insert({
+            "id": str(uuid.uuid4()),
+            "userId": doc["studentId"],
+            "title": title,
+            "message": message,
+            "type": "success" if status == "approved" else "error",
+            "read": False,
+            "relatedRequestId": doc["id"],
+            "createdAt": now_iso(),
+        })
+
+    # ---------- Notifications ----------
+
+    def require_user(self, value):
+        if not value:
+            raise ApiError(400, "userId is required")
+        return value
+
+    def list_notifications(self, query, **_):
+        user_id = self.require_user(query.get("userId"))
+        items = []
+        for doc in self.store.notifications.newest_first({"userId": user_id}):
+            items.append(dict(doc))
+            if len(items) == 50:
+                break
+        return items
+
+    def notification_feed(self, query, headers, **_):
+        user_id = self.require_user(query.get("userId"))
+        limit = parse_limit(query.get("limit"), 50)
+        notifications, unread = [], 0
+        for doc in self.store.notifications.newest_first({"userId": user_id}):
+            if len(notifications) < limit:
+                notifications.append(dict(doc))
+            unread += not doc["read"]
+
+        newest = notifications[0] if notifications else None
+        stamp = f"{newest['createdAt']}-{newest['id']}" if newest else "empty"
+        etag = f'W/"{stamp}-{unread}"'
+        extra = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if headers.get("If-None-Match") == etag:
+            return 304, None, extra
+        return 200, {"notifications": notifications, "unreadCount": unread}, extra
+
+    def mark_read(self, params, **_):
+        doc = self.store.notifications.docs.get(params["id"])
+        if doc is not None:
+            doc["read"] = True
+        return {"message": "Notification marked as read"}
+
+    def mark_all_read(self, body, **_):
+        user_id = self.require_user(self.json_body(body).get("userId"))
+        for doc in self.store.notifications.newest_first({"userId": user_id, "read": False}):
+            doc["read"] = True
+        return {"message": "All notifications marked as read"}
+
+    def unread_count(self, query, **_):
+        user_id = self.require_user(query.get("userId"))
+        return {"count": sum(1 for _ in self.store.notifications.newest_first({"userId": user_id, "read": False}))}
+
+    # ---------- Services, fees and stats ----------
+
+    def list_services(self, **_):
+        if not self.store.services:
+            self.store.services = [
+                {"id": str(uuid.uuid4()), "name": "Bonafide Certificate", "enabled": True, "description": "Certificate for various purposes"},
+                {"id": str(uuid.uuid4()), "name": "Fee Structure", "enabled": True, "description": "Get fee details for your category"},
+                {"id": str(uuid.uuid4()), "name": "Transfer Certificate", "enabled": True, "description": "TC for institute transfer"},
+                {"id": str(uuid.uuid4()), "name": "NOC", "enabled": True, "description": "No Objection Certificate"},
+            ]
+        return [dict(s) for s in self.store.services]
+
+    def update_service(self, params, body, **_):
+        data = self.json_body(body)
+        for service in self.store.services:
+            if service["id"] == params["id"]:
+                service.update(data, updatedAt=now_iso())
+                return dict(service)
+        raise ApiError(404, "Service not found")
+
+    def list_fee_structures(self, **_):
+        if not self.store.fee_structures:
+            self.store.fee_structures = [
+                {"id": str(uuid.uuid4()), "category": "General", "tuitionFee": 50000, "examFee": 5000, "libraryFee": 2000, "totalFee": 57000},
+                {"id": str(uuid.uuid4()), "category": "OBC", "tuitionFee": 40000, "examFee": 4000, "libraryFee": 1500, "totalFee": 45500},
+                {"id": str(uuid.uuid4()), "category": "SC/ST", "tuitionFee": 25000, "examFee": 2500, "libraryFee": 1000, "totalFee": 28500},
+                {"id": str(uuid.uuid4()), "category": "EWS", "tuitionFee": 30000, "examFee": 3000, "libraryFee": 1200, "totalFee": 34200},
+            ]
+        return [dict(f) for f in self.store.fee_structures]
+
+    def stats(self, **_):
+        by_status = {}
+        for doc in self.store.requests.docs.values():
+            by_status[doc["status"]] = by_status.get(doc["status"], 0) + 1
+        return {
+            "totalStudents": len(self.store.students),
+            "totalRequests": len(self.store.requests),
+            "pendingRequests": by_status.get("pending", 0),
+            "approvedRequests": by_status.get("approved", 0),
+            "rejectedRequests": by_status.get("rejected", 0),
+        }
+
+    def health(self, **_):
+        return {"status": "ok", "store": "memory"}
+
+    def page_response(self, collection, match, query, hide=()):
+        fmt = query.get("format") or "rows"
+        if fmt not in ("rows", "columns"):
+            raise ApiError(400, "format must be rows or columns")
+        items, next_cursor = collection.page(match, parse_cursor(query.get("after")), parse_limit(query.get("limit")))
+        headers = {"Access-Control-Expose-Headers": "X-Next-Cursor"}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        rows = [without(doc, *hide) for doc in items]
+        if fmt == "columns":
+            columns = list(dict.fromkeys(key for row in rows for key in row))
+            return 200, {"columns": columns, "rows": [[row.get(c) for c in columns] for row in rows]}, headers
+        return 200, rows, headers
+
+    def export_response(self, collection, match, query, name, columns, hide=()):
+        """Whole export in one body; the streaming itself is the real server's concern"""
+        fmt = query.get("format") or "ndjson"
+        if fmt not in ("ndjson", "csv", "xlsx"):
+            raise ApiError(400, "format must be ndjson, csv or xlsx")
+        if fmt == "xlsx":
+            raise ApiError(501, "xlsx export is not available in the local stand-in")
+        start, end = created_at_range(query.get("from"), query.get("to"))
+        after = parse_cursor(query.get("after"))
+        if query.get("after") and not after:
+            raise ApiError(400, "after must be <createdAt>,<id> of the last row received")
+        rows = [
+            without(doc, *hide) for doc in collection.newest_first(match, after)
+            if (not start or doc["createdAt"] >= start) and (not end or doc["createdAt"] < end)
+        ]
+        if fmt == "ndjson":
+            body = "".join(json.dumps(row) + "\n" for row in rows)
+            content_type = "application/x-ndjson"
+        else:
+            out = io.StringIO()
+            writer = csv.writer(out, lineterminator="\r\n")
+            if not after:
+                out.write("\ufeff")
+                writer.writerow(columns)
+            writer.writerows([csv_cell(row.get(column)) for column in columns] for row in rows)
+            body = out.getvalue()
+            content_type = "text/csv; charset=utf-8"
+        filename = f"{name}-{datetime.now(timezone.utc).date().isoformat()}.{fmt}"
+        return 200, body.encode(), {
+            "Content-Type": content_type,
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+            "Access-Control-Expose-Headers": "Content-Disposition",
+        }
+
+
+# ============ HTTP SERVER ============
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this keep-alive calls stall on delayed ACKs
+    disable_nagle_algorithm = True
+    api = None
+
+    def handle_request(self):
+        parts = urlsplit(self.path)
+        path = [s for s in parts.path.split("/") if s]
+        if path[:1] != ["api"]:
+            return self.send(404, {"error": "Not found"}, {})
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, payload, headers = self.api.dispatch(self.command, path[1:], query, self.headers, body)
+        self.send(status, payload, headers)
+
+    def send(self, status, payload, headers):
+        raw = isinstance(payload, bytes)
+        body = b"" if payload is None else payload if raw else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type, Authorization")
+        self.send_header("Access-Control-Allow-Credentials", "true")
+        for name, value in headers.items():
+            for item in value if isinstance(value, list) else [value]:
+                self.send_header(name, item)
+        if payload is not None and not raw:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        self.send(200, None, {})
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = handle_request
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(host="127.0.0.1", port=0, store=None):
+    """Serve the fake API on a daemon thread; returns (server, base URL ending in /api)"""
+    handler = type("BoundFakeApiHandler", (FakeApiHandler,), {"api": Api(store)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/api"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="In-memory stand-in for the portal API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args(argv)
+
+    server, base_url = start_server(args.host, args.port)
+    print(f"Fake API listening on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
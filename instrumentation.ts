@@ -0,0 +1,18 @@
+export async function register() {
+  if (process.env.NEXT_RUNTIME !== 'nodejs') return;
+
+  const { warmUp, connectToMongo } = await import('@/lib/db');
+  try {
+    await warmUp();
+    const db = await connectToMongo();
+    // Seed and load the default services and fee structures before the first request needs them
+    const { getCatalog } = await import('@/lib/catalog');
+    await Promise.all([getCatalog(db, 'services'), getCatalog(db, 'fee_structures')]);
+    // Start the notification worker now so a durable outbox left by the last process is replayed
+    const { startNotificationQueue } = await import('@/lib/notification-queue');
+    startNotificationQueue(db);
+  } catch (error: any) {
+    // Requests will retry the connection; don't block the server from starting
+    console.error('MongoDB warm-up failed:', error.message);
+  }
+}
@@ -0,0 +1,116 @@
+// Client-side cache for GET /api calls made by the dashboard.
+// - Concurrent reads of the same URL share one request.
+// - A cached value is returned at once; once older than maxAgeMs it is refetched in the
+//   background and handed to onRevalidate (stale-while-revalidate).
+// - Mutations patch cached values in place instead of refetching, and get a rollback
+//   for when the server rejects an optimistic update.
+
+export interface CachedResponse<T> {
+  data: T;
+  // X-Next-Cursor from paginated list endpoints
+  cursor: string | null;
+  fetchedAt: number;
+}
+
+interface CacheEntry extends CachedResponse<any> {
+  // Bumped by patchCached; a fetch that started before a patch must not overwrite it
+  version: number;
+}
+
+export interface CachedGetOptions<T> {
+  maxAgeMs?: number;
+  onRevalidate?: (response: CachedResponse<T>) => void;
+}
+
+const DEFAULT_MAX_AGE_MS = 30_000;
+
+const entries = new Map<string, CacheEntry>();
+const inFlight = new Map<string, Promise<CacheEntry>>();
+let generation = 0;
+
+function load(url: string): Promise<CacheEntry> {
+  const pending = inFlight.get(url);
+  if (pending) return pending;
+
+  const startVersion = entries.get(url)?.version ?? 0;
+  const startGeneration = generation;
+  const request = (async () => {
+    const res = await fetch(url);
+    if (!res.ok) throw new Error(`GET ${url} failed (${res.status})`);
+    const fresh: CacheEntry = {
+      data: await res.json(),
+      cursor: res.headers.get('X-Next-Cursor'),
+      fetchedAt: Date.now(),
+      version: startVersion
+    };
+    if (startGeneration !== generation) return fresh;
+    const current = entries.get(url);
+    if (current && current.version !== startVersion) {
+      // Patched while we were fetching: keep the local value and revalidate on the next read
+      current.fetchedAt = 0;
+      return current;
+    }
+    entries.set(url, fresh);
+    return fresh;
+  })();
+
+  inFlight.set(url, request);
+  const settle = () => {
+    if (inFlight.get(url) === request) inFlight.delete(url);
+  };
+  request.then(settle, settle);
+  return request;
+}
+
+export async function cachedGet<T>(url: string, options: CachedGetOptions<T> = {}): Promise<CachedResponse<T>> {
+  const { maxAgeMs = DEFAULT_MAX_AGE_MS, onRevalidate } = options;
+  const entry = entries.get(url);
+  if (!entry) return load(url);
+
+  if (Date.now() - entry.fetchedAt > maxAgeMs) {
+    load(url)
+      .then(fresh => {
+        if (fresh !== entry) onRevalidate?.(fresh);
+      })
+      .catch(error => console.error('Background refresh failed:', error));
+  }
+  return entry;
+}
+
+// `exact` matches the URL itself only, not the same path with other query strings
+function matching(prefix: string, exact = false): [string, CacheEntry][] {
+  return Array.from(entries).filter(([url]) => url === prefix || (!exact && url.startsWith(`${prefix}?`)));
+}
+
+// Mark every cached URL under a path stale; the next read serves it and refetches
+export function invalidate(prefix: string): void {
+  for (const [, entry] of matching(prefix)) entry.fetchedAt = 0;
+}
+
+export interface PatchOptions {
+  // Patch only the URL given, e.g. to insert a row into a first page but not into later pages
+  // (?after=) or other users' filtered lists
+  exact?: boolean;
+}
+
+// Apply an update to every cached URL under a path. Returns a function that restores
+// the previous values.
+export function patchCached<T>(prefix: string, update: (data: T) => T, options: PatchOptions = {}): () => void {
+  const snapshots = matching(prefix, options.exact).map(([url, entry]) => {
+    const previous = { ...entry };
+    entries.set(url, { ...entry, data: update(entry.data), version: entry.version + 1 });
+    return [url, previous] as const;
+  });
+  return () => {
+    for (const [url, previous] of snapshots) {
+      entries.set(url, { ...previous, version: (entries.get(url)?.version ?? previous.version) + 1 });
+    }
+  };
+}
+
+// Drop everything, e.g. on logout so the next user never sees the previous user's data
+export function clearCache(): void {
+  generation++;
+  entries.clear();
+  inFlight.clear();
+}
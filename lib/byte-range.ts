@@ -0,0 +1,80 @@
+import { createHash } from 'crypto';
+import { NextRequest, NextResponse } from 'next/server';
+
+export interface ByteRange {
+  start: number;
+  end: number;
+}
+
+// Strong validator: identical bytes always produce the same tag
+export function strongETag(bytes: Uint8Array): string {
+  return `"${createHash('sha256').update(bytes).digest('base64url').slice(0, 32)}"`;
+}
+
+// Parse a single `bytes=start-end` range. Returns null to serve the whole body and
+// 'unsatisfiable' for ranges past the end; multi-range requests and invalid ranges such as
+// `bytes=5-3` get the whole body, since RFC 7233 says an invalid range is ignored.
+export function parseRange(header: string | null, size: number): ByteRange | 'unsatisfiable' | null {
+  const match = header?.match(/^bytes=(\d*)-(\d*)$/);
+  if (!match || (!match[1] && !match[2])) return null;
+
+  if (!match[1]) {
+    // Suffix range: the last N bytes
+    const length = parseInt(match[2], 10);
+    if (length === 0) return 'unsatisfiable';
+    return { start: Math.max(0, size - length), end: size - 1 };
+  }
+
+  const start = parseInt(match[1], 10);
+  const last = match[2] ? parseInt(match[2], 10) : Infinity;
+  if (last < start) return null;
+  if (start >= size) return 'unsatisfiable';
+  return { start, end: Math.min(last, size - 1) };
+}
+
+// Serve an in-memory body with conditional GET and single-range support
+export function bytesResponse(
+  request: NextRequest,
+  bytes: Uint8Array,
+  etag: string,
+  headers: Record<string, string>
+): NextResponse {
+  const baseHeaders: Record<string, string> = {
+    ...headers,
+    'ETag': etag,
+    'Accept-Ranges': 'bytes',
+    'Access-Control-Expose-Headers': 'ETag, Content-Range, Content-Disposition'
+  };
+
+  const ifNoneMatch = request.headers.get('if-none-match');
+  if (ifNoneMatch && ifNoneMatch.split(/\s*,\s*/).includes(etag)) {
+    return new NextResponse(null, { status: 304, headers: baseHeaders });
+  }
+
+  // A stale If-Range means the client's partial copy is out of date, so send everything
+  const ifRange = request.headers.get('if-range');
+  const range = !ifRange || ifRange === etag
+    ? parseRange(request.headers.get('range'), bytes.length)
+    : null;
+
+  if (range === 'unsatisfiable') {
+    return new NextResponse(null, {
+      status: 416,
+      headers: { ...baseHeaders, 'Content-Range': `bytes */${bytes.length}` }
+    });
+  }
+  if (range) {
+    const body = bytes.subarray(range.start, range.end + 1);
+    return new NextResponse(body, {
+      status: 206,
+      headers: {
+        ...baseHeaders,
+        'Content-Range': `bytes ${range.start}-${range.end}/${bytes.length}`,
+        'Content-Length': String(body.length)
+      }
+    });
+  }
+  return new NextResponse(bytes, {
+    headers: { ...baseHeaders, 'Content-Length': String(bytes.length) }
+  });
+}
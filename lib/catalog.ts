@@ -0,0 +1,127 @@
+import { Db, MongoBulkWriteError } from 'mongodb';
+import { v4 as uuidv4 } from 'uuid';
+import { strongETag } from '@/lib/byte-range';
+
+// Services and fee structures change a few times a year, so they are served from memory.
+// Each catalog has a version that PUT /api/services/:id bumps; a TTL bounds how long another
+// instance keeps serving its copy after an edit made elsewhere. Defaults are seeded once at
+// startup rather than inside the first request.
+
+export type CatalogName = 'services' | 'fee_structures';
+
+export interface CatalogSnapshot {
+  version: number;
+  // Serialized once per load and reused for every response
+  body: string;
+  etag: string;
+}
+
+function envInt(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value >= 0 ? value : fallback;
+}
+
+const TTL_MS = envInt('CATALOG_CACHE_TTL_MS', 60000);
+const DUPLICATE_KEY = 11000;
+
+// Clients may keep a copy but must revalidate it with the ETag on every use, so an edit reaches
+// them on their next read; an unchanged catalog costs an empty 304
+export const CATALOG_CACHE_CONTROL = 'no-cache';
+
+// Defaults keyed by a natural key, which is unique-indexed in lib/indexes
+const DEFAULTS: Record<CatalogName, { key: string; documents: Record<string, any>[] }> = {
+  services: {
+    key: 'name',
+    documents: [
+      { name: 'Bonafide Certificate', enabled: true, description: 'Certificate for various purposes' },
+      { name: 'Fee Structure', enabled: true, description: 'Get fee details for your category' },
+      { name: 'Transfer Certificate', enabled: true, description: 'TC for institute transfer' },
+      { name: 'NOC', enabled: true, description: 'No Objection Certificate' }
+    ]
+  },
+  fee_structures: {
+    key: 'category',
+    documents: [
+      { category: 'General', tuitionFee: 50000, examFee: 5000, libraryFee: 2000, totalFee: 57000 },
+      { category: 'OBC', tuitionFee: 40000, examFee: 4000, libraryFee: 1500, totalFee: 45500 },
+      { category: 'SC/ST', tuitionFee: 25000, examFee: 2500, libraryFee: 1000, totalFee: 28500 },
+      { category: 'EWS', tuitionFee: 30000, examFee: 3000, libraryFee: 1200, totalFee: 34200 }
+    ]
+  }
+};
+
+const versions: Record<CatalogName, number> = { services: 0, fee_structures: 0 };
+const cache = new Map<CatalogName, { snapshot: CatalogSnapshot; expiresAt: number }>();
+const loading = new Map<CatalogName, { version: number; promise: Promise<CatalogSnapshot> }>();
+let seeded: Promise<void> | null = null;
+
+// Fill an empty collection with the defaults. Upserts on the natural key mean processes
+// seeding at the same moment insert each default once; the loser's duplicate-key errors are ignored.
+async function seedCollection(db: Db, name: CatalogName): Promise<void> {
+  const collection = db.collection(name);
+  if (await collection.countDocuments({}, { limit: 1 }) > 0) return;
+
+  const { key, documents } = DEFAULTS[name];
+  try {
+    await collection.bulkWrite(documents.map(doc => ({
+      updateOne: {
+        filter: { [key]: doc[key] },
+        update: { $setOnInsert: { id: uuidv4(), ...doc } },
+        upsert: true
+      }
+    })), { ordered: false });
+  } catch (error) {
+    const writeErrors = error instanceof MongoBulkWriteError
+      ? (Array.isArray(error.writeErrors) ? error.writeErrors : [error.writeErrors])
+      : [];
+    if (writeErrors.length === 0 || writeErrors.some(writeError => writeError.code !== DUPLICATE_KEY)) throw error;
+  }
+}
+
+// Seed both catalogs once per process; a failure is retried by the next caller
+export function seedCatalogOnce(db: Db): Promise<void> {
+  if (!seeded) {
+    seeded = Promise.all([seedCollection(db, 'services'), seedCollection(db, 'fee_structures')])
+      .then(() => undefined)
+      .catch(error => {
+        seeded = null;
+        throw error;
+      });
+  }
+  return seeded;
+}
+
+async function load(db: Db, name: CatalogName, version: number): Promise<CatalogSnapshot> {
+  await seedCatalogOnce(db);
+  const documents = await db.collection(name).find({}, { projection: { _id: 0 } }).toArray();
+  const body = JSON.stringify(documents);
+  const snapshot = { version, body, etag: strongETag(Buffer.from(body)) };
+  // A read that overlapped an invalidation is returned to its callers but not kept
+  if (versions[name] === version) {
+    cache.set(name, { snapshot, expiresAt: Date.now() + TTL_MS });
+  }
+  return snapshot;
+}
+
+// Serve from memory, sharing one database read between concurrent misses of the same version
+export function getCatalog(db: Db, name: CatalogName): Promise<CatalogSnapshot> {
+  const version = versions[name];
+  const cached = cache.get(name);
+  if (cached && cached.snapshot.version === version && cached.expiresAt > Date.now()) {
+    return Promise.resolve(cached.snapshot);
+  }
+
+  const pending = loading.get(name);
+  if (pending && pending.version === version) return pending.promise;
+
+  const promise = load(db, name, version).finally(() => {
+    if (loading.get(name)?.promise === promise) loading.delete(name);
+  });
+  loading.set(name, { version, promise });
+  return promise;
+}
+
+export function invalidateCatalog(name: CatalogName): void {
+  versions[name]++;
+  cache.delete(name);
+}
@@ -0,0 +1,311 @@
+import { Db, Document } from 'mongodb';
+import { jsPDF } from 'jspdf';
+import { strongETag } from '@/lib/byte-range';
+import { CatalogSnapshot, getCatalog } from '@/lib/catalog';
+
+// Server-side certificate rendering for approved service requests.
+// Each template is a fixed list of drawing operations compiled once at module load;
+// rendering only fills in the request's fields, and the bytes are cached per (id, updatedAt),
+// plus the fee catalog's ETag for fee certificates.
+
+export interface RenderedCertificate {
+  bytes: Uint8Array;
+  etag: string;
+  filename: string;
+  modified: Date;
+}
+
+type Fields = Record<string, string>;
+
+type Operation =
+  | { op: 'font'; size: number; style: 'bold' | 'normal' }
+  | { op: 'text'; text: string; x: number; y: number; align?: 'center' }
+  | { op: 'paragraph'; text: string; x: number; y: number; width: number }
+  | { op: 'line'; x1: number; y1: number; x2: number; y2: number }
+  | { op: 'fill'; x: number; y: number; width: number; height: number; shade: number };
+
+type CompiledOperation = (doc: jsPDF, fields: Fields) => void;
+
+function envInt(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value >= 0 ? value : fallback;
+}
+
+const INSTITUTE = 'EduPortal Institute of Technology';
+
+const TEMPLATES: Record<string, { prefix: string; operations: Operation[] }> = {
+  bonafide: {
+    prefix: 'bonafide',
+    operations: [
+      { op: 'font', size: 20, style: 'bold' },
+      { op: 'text', text: 'BONAFIDE CERTIFICATE', x: 105, y: 30, align: 'center' },
+      { op: 'font', size: 16, style: 'bold' },
+      { op: 'text', text: INSTITUTE, x: 105, y: 50, align: 'center' },
+      { op: 'font', size: 10, style: 'normal' },
+      { op: 'text', text: '(Affiliated to State University)', x: 105, y: 57, align: 'center' },
+      { op: 'text', text: '123 Education Lane, Knowledge City - 500001', x: 105, y: 63, align: 'center' },
+      { op: 'line', x1: 20, y1: 70, x2: 190, y2: 70 },
+      { op: 'font', size: 11, style: 'normal' },
+      { op: 'text', text: 'Ref No: BON/{{ref}}', x: 20, y: 85 },
+      { op: 'text', text: 'Date: {{date}}', x: 150, y: 85 },
+      { op: 'font', size: 14, style: 'bold' },
+      { op: 'text', text: 'TO WHOM IT MAY CONCERN', x: 105, y: 105, align: 'center' },
+      { op: 'font', size: 11, style: 'normal' },
+      {
+        op: 'paragraph',
+        x: 20,
+        y: 125,
+        width: 170,
+        text: 'This is to certify that {{studentName}} bearing Roll No. {{rollNo}} is a bonafide student of this institution, currently enrolled in the Department of {{department}}.\n\n' +
+          'The student\'s email ID registered with us is: {{studentEmail}}\n\n' +
+          'Purpose: {{purpose}}\n\n' +
+          'This certificate is issued upon the request of the student for the purpose mentioned above.'
+      },
+      { op: 'text', text: 'This certificate is valid for a period of 6 months from the date of issue.', x: 20, y: 185 },
+      { op: 'font', size: 11, style: 'bold' },
+      { op: 'text', text: 'Academic Section', x: 150, y: 220 },
+      { op: 'text', text: 'EduPortal Institute', x: 150, y: 227 }
+    ]
+  },
+  fee: {
+    prefix: 'fee',
+    operations: [
+      { op: 'font', size: 20, style: 'bold' },
+      { op: 'text', text: 'FEE STRUCTURE', x: 105, y: 30, align: 'center' },
+      { op: 'font', size: 16, style: 'bold' },
+      { op: 'text', text: INSTITUTE, x: 105, y: 50, align: 'center' },
+      { op: 'font', size: 10, style: 'normal' },
+      { op: 'text', text: 'Academic Year 2025-26', x: 105, y: 57, align: 'center' },
+      { op: 'line', x1: 20, y1: 65, x2: 190, y2: 65 },
+      { op: 'font', size: 11, style: 'normal' },
+      { op: 'text', text: 'Date: {{date}}', x: 150, y: 80 },
+      { op: 'text', text: 'Student: {{studentName}}', x: 20, y: 80 },
+      { op: 'text', text: 'Roll No: {{rollNo}}', x: 20, y: 87 },
+      { op: 'text', text: 'Department: {{department}}', x: 20, y: 94 },
+      { op: 'text', text: 'Category: {{category}}', x: 20, y: 101 },
+      { op: 'line', x1: 20, y1: 115, x2: 190, y2: 115 },
+      { op: 'font', size: 12, style: 'bold' },
+      { op: 'text', text: 'Fee Breakdown', x: 105, y: 130, align: 'center' },
+      { op: 'fill', x: 30, y: 140, width: 150, height: 10, shade: 240 },
+      { op: 'font', size: 11, style: 'bold' },
+      { op: 'text', text: 'Particulars', x: 35, y: 147 },
+      { op: 'text', text: 'Amount (INR)', x: 145, y: 147 },
+      // 'Rs.' rather than the rupee sign: U+20B9 is not in the WinAnsi encoding of jsPDF's built-in
+      // fonts, so it printed as a stray glyph; showing it would mean embedding a TTF in every PDF
+      { op: 'font', size: 11, style: 'normal' },
+      { op: 'text', text: 'Tuition Fee', x: 35, y: 160 },
+      { op: 'text', text: 'Rs. {{tuitionFee}}', x: 145, y: 160 },
+      { op: 'text', text: 'Examination Fee', x: 35, y: 172 },
+      { op: 'text', text: 'Rs. {{examFee}}', x: 145, y: 172 },
+      { op: 'text', text: 'Library Fee', x: 35, y: 184 },
+      { op: 'text', text: 'Rs. {{libraryFee}}', x: 145, y: 184 },
+      { op: 'line', x1: 30, y1: 192, x2: 180, y2: 192 },
+      { op: 'font', size: 11, style: 'bold' },
+      { op: 'text', text: 'Total Fee', x: 35, y: 202 },
+      { op: 'text', text: 'Rs. {{totalFee}}', x: 145, y: 202 },
+      { op: 'text', text: 'Accounts Section', x: 150, y: 260 }
+    ]
+  },
+  tc: {
+    prefix: 'tc',
+    operations: [
+      { op: 'font', size: 20, style: 'bold' },
+      { op: 'text', text: 'TRANSFER CERTIFICATE', x: 105, y: 30, align: 'center' },
+      { op: 'font', size: 16, style: 'bold' },
+      { op: 'text', text: INSTITUTE, x: 105, y: 50, align: 'center' },
+      { op: 'line', x1: 20, y1: 65, x2: 190, y2: 65 },
+      { op: 'font', size: 11, style: 'normal' },
+      { op: 'text', text: 'TC No: TC/{{ref}}', x: 20, y: 80 },
+      { op: 'text', text: 'Date: {{date}}', x: 150, y: 80 },
+      { op: 'font', size: 12, style: 'bold' },
+      { op: 'text', text: 'Student Details:', x: 20, y: 100 },
+      { op: 'font', size: 12, style: 'normal' },
+      { op: 'text', text: 'Name: {{studentName}}', x: 30, y: 115 },
+      { op: 'text', text: 'Roll No: {{rollNo}}', x: 30, y: 125 },
+      { op: 'text', text: 'Department: {{department}}', x: 30, y: 135 },
+      { op: 'text', text: 'Conduct: Good', x: 30, y: 150 },
+      { op: 'text', text: 'Dues: Cleared', x: 30, y: 160 },
+      { op: 'font', size: 12, style: 'bold' },
+      { op: 'text', text: 'Principal', x: 150, y: 250 }
+    ]
+  },
+  noc: {
+    prefix: 'noc',
+    operations: [
+      { op: 'font', size: 20, style: 'bold' },
+      { op: 'text', text: 'NO OBJECTION CERTIFICATE', x: 105, y: 30, align: 'center' },
+      { op: 'font', size: 16, style: 'bold' },
+      { op: 'text', text: INSTITUTE, x: 105, y: 50, align: 'center' },
+      { op: 'line', x1: 20, y1: 65, x2: 190, y2: 65 },
+      { op: 'font', size: 11, style: 'normal' },
+      { op: 'text', text: 'Ref No: NOC/{{ref}}', x: 20, y: 80 },
+      { op: 'text', text: 'Date: {{date}}', x: 150, y: 80 },
+      { op: 'font', size: 14, style: 'bold' },
+      { op: 'text', text: 'TO WHOM IT MAY CONCERN', x: 105, y: 100, align: 'center' },
+      { op: 'font', size: 11, style: 'normal' },
+      {
+        op: 'paragraph',
+        x: 20,
+        y: 120,
+        width: 170,
+        text: 'This is to certify that we have no objection to {{studentName}}, Roll No. {{rollNo}}, Department of {{department}}, participating in external activities, internships, or competitions.'
+      },
+      { op: 'text', text: 'This certificate is valid for a period of 3 months from the date of issue.', x: 20, y: 180 },
+      { op: 'font', size: 11, style: 'bold' },
+      { op: 'text', text: 'HOD / Dean', x: 150, y: 230 }
+    ]
+  }
+};
+
+// Split '{{field}}' placeholders once so rendering is a join over pre-split parts
+function compileText(template: string): (fields: Fields) => string {
+  const parts = template.split(/\{\{(\w+)\}\}/);
+  if (parts.length === 1) return () => template;
+  return fields => parts.map((part, i) => (i % 2 ? fields[part] : part)).join('');
+}
+
+function compileOperation(operation: Operation): CompiledOperation {
+  switch (operation.op) {
+    case 'font':
+      return doc => {
+        doc.setFontSize(operation.size);
+        doc.setFont('helvetica', operation.style);
+      };
+    case 'text': {
+      const text = compileText(operation.text);
+      const options = operation.align ? { align: operation.align } : undefined;
+      return (doc, fields) => { doc.text(text(fields), operation.x, operation.y, options); };
+    }
+    case 'paragraph': {
+      const text = compileText(operation.text);
+      return (doc, fields) => {
+        doc.text(doc.splitTextToSize(text(fields), operation.width), operation.x, operation.y);
+      };
+    }
+    case 'line':
+      return doc => { doc.line(operation.x1, operation.y1, operation.x2, operation.y2); };
+    case 'fill':
+      return doc => {
+        doc.setFillColor(operation.shade, operation.shade, operation.shade);
+        doc.rect(operation.x, operation.y, operation.width, operation.height, 'F');
+      };
+  }
+}
+
+const COMPILED = Object.fromEntries(
+  Object.entries(TEMPLATES).map(([type, template]) => [
+    type,
+    { prefix: template.prefix, operations: template.operations.map(compileOperation) }
+  ])
+);
+
+export function hasCertificate(serviceType: string): boolean {
+  return serviceType in COMPILED;
+}
+
+const DEFAULT_FEE = { tuitionFee: 50000, examFee: 5000, libraryFee: 2000, totalFee: 57000 };
+
+// Fee structures by category, parsed once per catalog snapshot
+const feesBySnapshot = new WeakMap<CatalogSnapshot, Map<string, Document>>();
+
+function feeFor(snapshot: CatalogSnapshot, category: string): Document {
+  let fees = feesBySnapshot.get(snapshot);
+  if (!fees) {
+    fees = new Map((JSON.parse(snapshot.body) as Document[]).map(fee => [fee.category, fee]));
+    feesBySnapshot.set(snapshot, fees);
+  }
+  return fees.get(category) || DEFAULT_FEE;
+}
+
+function certificateFields(request: Document, fees: CatalogSnapshot | null): Fields {
+  const formatAmount = (value: number) => Number(value || 0).toLocaleString('en-IN');
+  const fields: Fields = {
+    ref: String(request.id || '').substring(0, 8).toUpperCase(),
+    // The approval date, not today, so the same request always renders the same bytes
+    date: new Date(request.updatedAt).toLocaleDateString('en-IN', { day: '2-digit', month: 'long', year: 'numeric' }),
+    studentName: request.studentName || 'the student',
+    rollNo: request.rollNo || 'N/A',
+    department: request.department || 'N/A',
+    studentEmail: request.studentEmail || 'N/A',
+    purpose: request.details?.purpose || 'General Purpose',
+    category: request.details?.category || 'General'
+  };
+
+  if (fees) {
+    const fee = feeFor(fees, fields.category);
+    fields.tuitionFee = formatAmount(fee.tuitionFee);
+    fields.examFee = formatAmount(fee.examFee);
+    fields.libraryFee = formatAmount(fee.libraryFee);
+    fields.totalFee = formatAmount(fee.totalFee);
+  }
+  if (request.serviceType === 'fee' || request.serviceType === 'tc') {
+    fields.studentName = request.studentName || 'N/A';
+  }
+  return fields;
+}
+
+function renderPDF(request: Document, fields: Fields, modified: Date): Uint8Array {
+  const template = COMPILED[request.serviceType];
+  const doc = new jsPDF({ compress: true });
+  // Pin the timestamps and file id so a re-render after eviction yields identical bytes and ETag
+  doc.setCreationDate(modified);
+  doc.setFileId(String(request.id).replace(/-/g, '').padEnd(32, '0').slice(0, 32).toUpperCase());
+  doc.setProperties({ title: `${template.prefix} certificate ${fields.ref}` });
+  for (const operation of template.operations) operation(doc, fields);
+  return new Uint8Array(doc.output('arraybuffer'));
+}
+
+export function certificateFilename(request: Document): string {
+  const name = request.studentName?.replace(/\s+/g, '_') || 'certificate';
+  return `${COMPILED[request.serviceType]?.prefix || request.serviceType}_${name}_${String(request.id).substring(0, 8)}.pdf`;
+}
+
+// LRU by insertion order: a hit is deleted and re-set so it moves to the back
+const CACHE_MAX_BYTES = envInt('CERTIFICATE_CACHE_MAX_BYTES', 32 * 1024 * 1024);
+const cache = new Map<string, RenderedCertificate>();
+const rendering = new Map<string, Promise<RenderedCertificate>>();
+let cachedBytes = 0;
+
+function remember(key: string, certificate: RenderedCertificate): void {
+  if (certificate.bytes.length > CACHE_MAX_BYTES) return;
+  cache.set(key, certificate);
+  cachedBytes += certificate.bytes.length;
+  for (const [oldest, entry] of cache) {
+    if (cachedBytes <= CACHE_MAX_BYTES) break;
+    cache.delete(oldest);
+    cachedBytes -= entry.bytes.length;
+  }
+}
+
+// Render (or reuse) the certificate for an approved request. A status change bumps
+// updatedAt and a fee edit changes the catalog ETag, so stale entries are never served;
+// they just age out of the LRU. The response ETag hashes the bytes, so it follows both.
+export async function getCertificate(db: Db, request: Document): Promise<RenderedCertificate> {
+  const modified = new Date(request.updatedAt);
+  const fees = request.serviceType === 'fee' ? await getCatalog(db, 'fee_structures') : null;
+  const key = `${request.id}:${modified.getTime()}${fees ? `:${fees.etag}` : ''}`;
+
+  const hit = cache.get(key);
+  if (hit) {
+    cache.delete(key);
+    cache.set(key, hit);
+    return hit;
+  }
+
+  // Concurrent downloads of the same certificate share one render
+  let pending = rendering.get(key);
+  if (!pending) {
+    pending = (async () => {
+      const bytes = renderPDF(request, certificateFields(request, fees), modified);
+      const certificate = { bytes, etag: strongETag(bytes), filename: certificateFilename(request), modified };
+      remember(key, certificate);
+      return certificate;
+    })().finally(() => rendering.delete(key));
+    rendering.set(key, pending);
+  }
+  return pending;
+}
+
+export function getCertificateCacheStats(): { entries: number; bytes: number } {
+  return { entries: cache.size, bytes: cachedBytes };
+}
@@ -0,0 +1,114 @@
+import { pipeline, Readable } from 'stream';
+import { constants, createBrotliCompress, createGzip } from 'zlib';
+import { NextRequest, NextResponse } from 'next/server';
+
+function envInt(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value >= 0 ? value : fallback;
+}
+
+// Bodies smaller than this go out uncompressed; the framing costs more than it saves
+const MIN_BYTES = envInt('COMPRESSION_MIN_BYTES', 1024);
+// Brotli's default quality (11) is meant for static assets and far too slow per request
+const BROTLI_QUALITY = envInt('COMPRESSION_BROTLI_QUALITY', 4);
+
+export type ContentEncoding = 'br' | 'gzip' | 'identity';
+
+// Prefer br, then gzip, honouring q-values (including q=0 and `*`) in Accept-Encoding
+export function negotiateEncoding(header: string | null): ContentEncoding {
+  const weights = new Map<string, number>();
+  for (const part of (header || '').split(',')) {
+    const [name, ...params] = part.trim().toLowerCase().split(';');
+    if (!name) continue;
+    const q = params.map(param => param.trim()).find(param => param.startsWith('q='));
+    weights.set(name, q ? parseFloat(q.slice(2)) || 0 : 1);
+  }
+  const weight = (name: string) => weights.get(name) ?? weights.get('*') ?? 0;
+
+  if (weight('br') > 0 && weight('br') >= weight('gzip')) return 'br';
+  if (weight('gzip') > 0) return 'gzip';
+  return 'identity';
+}
+
+export interface EncodedResponseOptions {
+  status?: number;
+  // Off for bodies that are already compressed, e.g. XLSX (a zip archive)
+  compress?: boolean;
+}
+
+type Chunk = string | Uint8Array;
+
+// Respond with a body produced chunk by chunk, from an array serializer or a database cursor.
+// Chunks are buffered only until MIN_BYTES: a body that ends before that is sent as-is with a
+// Content-Length, anything larger is streamed through the encoding the client asked for.
+export async function encodedResponse(
+  request: NextRequest,
+  chunks: Iterable<Chunk> | AsyncIterable<Chunk>,
+  headers: Record<string, string>,
+  options: EncodedResponseOptions = {}
+): Promise<NextResponse> {
+  const { status = 200, compress = true } = options;
+  const encoder = new TextEncoder();
+  const toBytes = (chunk: Chunk) => typeof chunk === 'string' ? encoder.encode(chunk) : chunk;
+  const iterator: Iterator<Chunk> | AsyncIterator<Chunk> = Symbol.asyncIterator in chunks
+    ? (chunks as AsyncIterable<Chunk>)[Symbol.asyncIterator]()
+    : (chunks as Iterable<Chunk>)[Symbol.iterator]();
+  const head: Uint8Array[] = [];
+  let buffered = 0;
+  let finished = false;
+
+  while (buffered < MIN_BYTES) {
+    const next = await iterator.next();
+    if (next.done) {
+      finished = true;
+      break;
+    }
+    const bytes = toBytes(next.value);
+    head.push(bytes);
+    buffered += bytes.length;
+  }
+
+  const responseHeaders = new Headers(headers);
+  responseHeaders.append('Vary', 'Accept-Encoding');
+
+  if (finished) {
+    const body = Buffer.concat(head);
+    responseHeaders.set('Content-Length', String(body.length));
+    return new NextResponse(body, { status, headers: responseHeaders });
+  }
+
+  // Pull-based, so a slow client slows serialization down instead of it piling up in memory
+  const body = new ReadableStream<Uint8Array>({
+    async pull(controller) {
+      const bytes = head.shift();
+      if (bytes) {
+        controller.enqueue(bytes);
+        return;
+      }
+      const next = await iterator.next();
+      if (next.done) controller.close();
+      else controller.enqueue(toBytes(next.value));
+    },
+    // The client went away: let the source release its cursor
+    async cancel() {
+      await iterator.return?.();
+    }
+  });
+
+  const encoding = compress ? negotiateEncoding(request.headers.get('accept-encoding')) : 'identity';
+  if (encoding === 'identity') {
+    return new NextResponse(body, { status, headers: responseHeaders });
+  }
+
+  const compressor = encoding === 'br'
+    ? createBrotliCompress({ params: { [constants.BROTLI_PARAM_QUALITY]: BROTLI_QUALITY } })
+    : createGzip();
+  pipeline(Readable.fromWeb(body as any), compressor, (error: any) => {
+    // A client that disconnects mid-body is not a failure worth logging
+    if (error && error.code !== 'ERR_STREAM_PREMATURE_CLOSE') {
+      console.error('Response compression failed:', error.message);
+    }
+  });
+  responseHeaders.set('Content-Encoding', encoding);
+  return new NextResponse(Readable.toWeb(compressor) as ReadableStream<Uint8Array>, { status, headers: responseHeaders });
+}
@@ -1,18 +1,153 @@
-import { MongoClient, Db } from 'mongodb';
+import { MongoClient, MongoClientOptions, Db } from 'mongodb';
+import { ensureIndexesOnce } from '@/lib/indexes';
+import { observeMongoCommand } from '@/lib/metrics';
 
-let client: MongoClient | null = null;
-let db: Db | null = null;
+export interface PoolMetrics {
+  totalConnections: number;
+  checkedOut: number;
+  waitQueueLength: number;
+  checkouts: number;
+  checkoutFailures: number;
+  avgWaitMs: number;
+  maxWaitMs: number;
+}
 
-export async function connectToMongo(): Promise<Db> {
-  if (!client) {
-    client = new MongoClient(process.env.MONGO_URL!);
-    await client.connect();
-    db = client.db(process.env.DB_NAME);
+function envInt(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value >= 0 ? value : fallback;
+}
+
+function clientOptions(): MongoClientOptions {
+  return {
+    maxPoolSize: envInt('MONGO_MAX_POOL_SIZE', 50),
+    minPoolSize: envInt('MONGO_MIN_POOL_SIZE', 5),
+    maxIdleTimeMS: envInt('MONGO_MAX_IDLE_TIME_MS', 60000),
+    waitQueueTimeoutMS: envInt('MONGO_WAIT_QUEUE_TIMEOUT_MS', 10000),
+    connectTimeoutMS: envInt('MONGO_CONNECT_TIMEOUT_MS', 10000),
+    serverSelectionTimeoutMS: envInt('MONGO_SERVER_SELECTION_TIMEOUT_MS', 10000),
+    socketTimeoutMS: envInt('MONGO_SOCKET_TIMEOUT_MS', 0),
+    monitorCommands: process.env.MONGO_COMMAND_METRICS !== 'false'
+  };
+}
+
+const counters = {
+  created: 0,
+  closed: 0,
+  checkedOut: 0,
+  waiting: 0,
+  checkouts: 0,
+  checkoutFailures: 0,
+  totalWaitMs: 0,
+  maxWaitMs: 0
+};
+
+// Checkout events carry no correlation id, so waits are timed FIFO per server address
+const pendingCheckouts = new Map<string, number[]>();
+
+function recordWait(address: string): void {
+  const started = pendingCheckouts.get(address)?.shift();
+  counters.waiting = Math.max(0, counters.waiting - 1);
+  if (started === undefined) return;
+  const waited = Date.now() - started;
+  counters.totalWaitMs += waited;
+  counters.maxWaitMs = Math.max(counters.maxWaitMs, waited);
+}
+
+function monitorPool(client: MongoClient): void {
+  client.on('connectionCreated', () => { counters.created++; });
+  client.on('connectionClosed', () => { counters.closed++; });
+  client.on('connectionCheckOutStarted', event => {
+    counters.waiting++;
+    if (!pendingCheckouts.has(event.address)) pendingCheckouts.set(event.address, []);
+    pendingCheckouts.get(event.address)!.push(Date.now());
+  });
+  client.on('connectionCheckedOut', event => {
+    recordWait(event.address);
+    counters.checkedOut++;
+    counters.checkouts++;
+  });
+  client.on('connectionCheckOutFailed', event => {
+    recordWait(event.address);
+    counters.checkoutFailures++;
+  });
+  client.on('connectionCheckedIn', () => {
+    counters.checkedOut = Math.max(0, counters.checkedOut - 1);
+  });
+}
+
+// Time every command per collection for /api/metrics
+function monitorCommands(client: MongoClient): void {
+  const started = new Map<number, string>();
+
+  client.on('commandStarted', event => {
+    const target = event.command[event.commandName];
+    const collection = typeof target === 'string' ? target : event.command.collection;
+    if (typeof collection === 'string') started.set(event.requestId, collection);
+  });
+  client.on('commandSucceeded', event => {
+    const collection = started.get(event.requestId);
+    if (collection === undefined) return;
+    started.delete(event.requestId);
+    observeMongoCommand(collection, event.commandName, event.duration);
+  });
+  client.on('commandFailed', event => {
+    const collection = started.get(event.requestId);
+    if (collection === undefined) return;
+    started.delete(event.requestId);
+    observeMongoCommand(collection, event.commandName, event.duration, true);
+  });
+}
+
+// Kept on globalThis so dev-server hot reloads reuse the pool instead of leaking a new one
+const globalForMongo = globalThis as unknown as { mongoClientPromise?: Promise<MongoClient> };
+
+// Every caller shares one memoized connect promise, so concurrent first requests can't open two clients
+export function getClient(): Promise<MongoClient> {
+  if (!globalForMongo.mongoClientPromise) {
+    const client = new MongoClient(process.env.MONGO_URL!, clientOptions());
+    monitorPool(client);
+    monitorCommands(client);
+    globalForMongo.mongoClientPromise = client.connect()
+      .then(async connected => {
+        await ensureIndexesOnce(connected.db(process.env.DB_NAME));
+        return connected;
+      })
+      .catch(error => {
+        // Let the next request retry instead of caching the failure forever. The retry builds a
+        // new client, so close this one: after a connect that succeeded but an index build that
+        // failed, it still holds a live pool, monitors and listeners
+        globalForMongo.mongoClientPromise = undefined;
+        client.close().catch(() => {});
+        throw error;
+      });
   }
-  return db!;
+  return globalForMongo.mongoClientPromise;
+}
+
+export async function connectToMongo(): Promise<Db> {
+  const client = await getClient();
+  return client.db(process.env.DB_NAME);
 }
 
 export async function getCollection(collectionName: string) {
   const database = await connectToMongo();
   return database.collection(collectionName);
 }
+
+// Open the pool and run a ping at boot so the first user request doesn't pay for the handshake
+export async function warmUp(): Promise<void> {
+  const database = await connectToMongo();
+  await database.command({ ping: 1 });
+}
+
+export function getPoolMetrics(): PoolMetrics {
+  return {
+    totalConnections: counters.created - counters.closed,
+    checkedOut: counters.checkedOut,
+    waitQueueLength: counters.waiting,
+    checkouts: counters.checkouts,
+    checkoutFailures: counters.checkoutFailures,
+    avgWaitMs: counters.checkouts ? Math.round(counters.totalWaitMs / counters.checkouts) : 0,
+    maxWaitMs: counters.maxWaitMs
+  };
+}
@@ -7,6 +7,19 @@ export interface ParsedStudent {
   department: string;
 }
 
+function normalizeHeader(header: unknown): string {
+  return String(header).trim().toLowerCase().replace(/\s+/g, '_');
+}
+
+export function toParsedStudent(student: Record<string, string>): ParsedStudent {
+  return {
+    name: student.name || student.student_name || '',
+    email: student.email || student.email_id || '',
+    rollNo: student.roll_no || student.rollno || student.roll_number || '',
+    department: student.department || student.dept || ''
+  };
+}
+
 export function parseExcelFile(buffer: ArrayBuffer): ParsedStudent[] {
   const workbook = XLSX.read(buffer, { type: 'array' });
   const sheetName = workbook.SheetNames[0];
@@ -15,9 +28,7 @@ export function parseExcelFile(buffer: ArrayBuffer): ParsedStudent[] {
   
   if (jsonData.length < 2) return [];
   
-  const headers = jsonData[0].map(h => 
-    String(h).trim().toLowerCase().replace(/\s+/g, '_')
-  );
+  const headers = jsonData[0].map(normalizeHeader);
   
   const students: ParsedStudent[] = [];
   
@@ -30,12 +41,7 @@ export function parseExcelFile(buffer: ArrayBuffer): ParsedStudent[] {
       student[header] = String(row[index] || '').trim();
     });
     
-    students.push({
-      name: student.name || student.student_name || '',
-      email: student.email || student.email_id || '',
-      rollNo: student.roll_no || student.rollno || student.roll_number || '',
-      department: student.department || student.dept || ''
-    });
+    students.push(toParsedStudent(student));
   }
   
   return students.filter(s => s.email); // Only include students with email
@@ -45,9 +51,7 @@ export function parseCSVFile(content: string): ParsedStudent[] {
   const lines = content.trim().split('\n');
   if (lines.length < 2) return [];
   
-  const headers = lines[0].split(',').map(h => 
-    h.trim().toLowerCase().replace(/\s+/g, '_')
-  );
+  const headers = lines[0].split(',').map(normalizeHeader);
   
   const students: ParsedStudent[] = [];
   
@@ -59,13 +63,84 @@ export function parseCSVFile(content: string): ParsedStudent[] {
       student[header] = values[index]?.trim() || '';
     });
     
-    students.push({
-      name: student.name || student.student_name || '',
-      email: student.email || student.email_id || '',
-      rollNo: student.roll_no || student.rollno || student.roll_number || '',
-      department: student.department || student.dept || ''
-    });
+    students.push(toParsedStudent(student));
   }
   
   return students.filter(s => s.email);
 }
+
+// Yield to the event loop so long imports don't starve other requests.
+// Falls back to setTimeout in the browser, where the roster parser worker uses these generators.
+const nextTick = () => new Promise<void>(resolve =>
+  typeof setImmediate === 'function' ? setImmediate(resolve) : setTimeout(resolve, 0));
+
+// Read CSV rows from a byte stream one line at a time, never holding more than a chunk in memory
+export async function* streamCSVRows(stream: ReadableStream<Uint8Array>): AsyncGenerator<ParsedStudent> {
+  const reader = stream.getReader();
+  const decoder = new TextDecoder();
+  let headers: string[] | null = null;
+  let buffered = '';
+
+  const toStudent = (line: string): ParsedStudent | null => {
+    if (!line.trim()) return null;
+    const values = line.split(',');
+    if (!headers) {
+      headers = values.map(normalizeHeader);
+      return null;
+    }
+    const student: Record<string, string> = {};
+    headers.forEach((header, index) => {
+      student[header] = values[index]?.trim() || '';
+    });
+    return toParsedStudent(student);
+  };
+
+  try {
+    while (true) {
+      const { done, value } = await reader.read();
+      buffered += done ? decoder.decode() : decoder.decode(value, { stream: true });
+
+      const lines = buffered.split('\n');
+      buffered = done ? '' : lines.pop()!;
+
+      for (const line of lines) {
+        const student = toStudent(line.replace(/\r$/, ''));
+        if (student) yield student;
+      }
+      if (done) break;
+    }
+  } finally {
+    reader.releaseLock();
+  }
+}
+
+// Walk the first worksheet cell by cell instead of materializing sheet_to_json.
+// The workbook itself still has to be read whole since XLSX is a zip archive.
+export async function* streamExcelRows(buffer: ArrayBuffer, yieldEvery = 500): AsyncGenerator<ParsedStudent> {
+  const workbook = XLSX.read(buffer, { type: 'array' });
+  const worksheet = workbook.Sheets[workbook.SheetNames[0]];
+  if (!worksheet || !worksheet['!ref']) return;
+
+  const range = XLSX.utils.decode_range(worksheet['!ref']);
+  const cellText = (r: number, c: number) => {
+    const cell = worksheet[XLSX.utils.encode_cell({ r, c })];
+    return cell ? String(cell.v ?? '').trim() : '';
+  };
+
+  const headers: string[] = [];
+  for (let c = range.s.c; c <= range.e.c; c++) {
+    headers.push(normalizeHeader(cellText(range.s.r, c)));
+  }
+
+  for (let r = range.s.r + 1; r <= range.e.r; r++) {
+    const student: Record<string, string> = {};
+    let hasValue = false;
+    headers.forEach((header, index) => {
+      const value = cellText(r, range.s.c + index);
+      student[header] = value;
+      if (value) hasValue = true;
+    });
+    if (hasValue) yield toParsedStudent(student);
+    if ((r - range.s.r) % yieldEvery === 0) await nextTick();
+  }
+}
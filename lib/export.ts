@@ -0,0 +1,218 @@
+import { Collection, Document, Filter } from 'mongodb';
+import { keysetFilter, PageCursor } from '@/lib/pagination';
+import { streamZip } from '@/lib/zip';
+
+// Streaming exports for the admin. Rows come straight off a Mongo cursor and are written out
+// in ~64 KiB chunks, so memory stays flat however many rows match. Rows are ordered newest
+// first by (createdAt, id), the keyset the list endpoints use: a download that breaks off is
+// resumed with ?after=<createdAt>,<id> of the last complete row received.
+
+export type ExportFormat = 'ndjson' | 'csv' | 'xlsx';
+
+export interface ExportColumn {
+  header: string;
+  value: (doc: Document) => unknown;
+}
+
+export const EXPORT_CONTENT_TYPES: Record<ExportFormat, string> = {
+  ndjson: 'application/x-ndjson',
+  csv: 'text/csv; charset=utf-8',
+  xlsx: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+};
+
+const EXPORT_FORMATS = Object.keys(EXPORT_CONTENT_TYPES) as ExportFormat[];
+const CHUNK_CHARS = 64 * 1024;
+const DAY_MS = 24 * 60 * 60 * 1000;
+const DATE_ONLY = /^\d{4}-\d{2}-\d{2}$/;
+
+const fields = (...names: string[]): ExportColumn[] =>
+  names.map(name => ({ header: name, value: doc => doc[name] }));
+
+export const STUDENT_EXPORT_COLUMNS: ExportColumn[] = fields(
+  'id', 'name', 'email', 'rollNo', 'department', 'phone', 'address', 'dateOfBirth',
+  'guardianName', 'guardianPhone', 'bloodGroup', 'createdAt', 'updatedAt'
+);
+
+export const REQUEST_EXPORT_COLUMNS: ExportColumn[] = fields(
+  'id', 'studentId', 'studentName', 'studentEmail', 'rollNo', 'department',
+  'serviceType', 'status', 'remarks', 'details', 'createdAt', 'updatedAt'
+);
+
+export function parseExportFormat(value: string | null): ExportFormat | null {
+  const format = (value || 'ndjson') as ExportFormat;
+  return EXPORT_FORMATS.includes(format) ? format : null;
+}
+
+function parseDate(value: string): Date | null {
+  const date = new Date(DATE_ONLY.test(value) ? `${value}T00:00:00.000Z` : value);
+  return isNaN(date.getTime()) ? null : date;
+}
+
+// `from`/`to` take YYYY-MM-DD (whole UTC days, `to` inclusive) or ISO timestamps.
+// Returns null when either can't be parsed.
+export function createdAtRange(from: string | null, to: string | null): Filter<Document> | null {
+  const range: Record<string, Date> = {};
+  if (from) {
+    const start = parseDate(from);
+    if (!start) return null;
+    range.$gte = start;
+  }
+  if (to) {
+    const end = parseDate(to);
+    if (!end) return null;
+    if (DATE_ONLY.test(to)) range.$lt = new Date(end.getTime() + DAY_MS);
+    else range.$lte = end;
+  }
+  return Object.keys(range).length > 0 ? { createdAt: range } : {};
+}
+
+// Every matching row, newest first; the cursor is closed however iteration ends
+export async function* exportRows(
+  collection: Collection,
+  filter: Filter<Document>,
+  after: PageCursor | null,
+  projection: Document
+): AsyncGenerator<Document> {
+  const cursor = collection
+    .find(keysetFilter(filter, after), { projection })
+    .sort({ createdAt: -1, id: -1 })
+    .batchSize(1000);
+  try {
+    for await (const doc of cursor) yield doc;
+  } finally {
+    await cursor.close();
+  }
+}
+
+async function* lines(rows: AsyncIterable<Document>, toLine: (doc: Document) => string): AsyncGenerator<string> {
+  for await (const row of rows) yield toLine(row);
+}
+
+// Join small pieces into chunks worth a write
+async function* coalesce(pieces: AsyncIterable<string>): AsyncGenerator<string> {
+  let buffer = '';
+  for await (const piece of pieces) {
+    buffer += piece;
+    if (buffer.length >= CHUNK_CHARS) {
+      yield buffer;
+      buffer = '';
+    }
+  }
+  if (buffer) yield buffer;
+}
+
+function cellText(value: unknown): string {
+  if (value === null || value === undefined) return '';
+  if (value instanceof Date) return value.toISOString();
+  if (typeof value === 'object') return Object.keys(value).length > 0 ? JSON.stringify(value) : '';
+  return String(value);
+}
+
+// Quote when needed, and defuse values a spreadsheet would evaluate as a formula
+function csvCell(value: unknown): string {
+  let text = cellText(value);
+  if (/^[=+\-@\t\r]/.test(text)) text = `'${text}`;
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+}
+
+const XML_ESCAPES: Record<string, string> = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;' };
+
+function xmlText(value: unknown): string {
+  return cellText(value)
+    // Control characters are not allowed in XML 1.0 at all
+    .replace(/[\u0000-\u0008\u000b\u000c\u000e-\u001f]/g, '')
+    .replace(/[&<>"]/g, char => XML_ESCAPES[char]);
+}
+
+function columnName(index: number): string {
+  let name = '';
+  for (let n = index + 1; n > 0; n = Math.floor((n - 1) / 26)) {
+    name = String.fromCharCode(65 + ((n - 1) % 26)) + name;
+  }
+  return name;
+}
+
+function sheetRow(rowNumber: number, values: unknown[]): string {
+  const cells = values.map((value, index) => {
+    const text = xmlText(value);
+    return text
+      ? `<c r="${columnName(index)}${rowNumber}" t="inlineStr"><is><t xml:space="preserve">${text}</t></is></c>`
+      : '';
+  });
+  return `<row r="${rowNumber}">${cells.join('')}</row>`;
+}
+
+const XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n';
+const RELATIONSHIPS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships';
+
+// The fixed parts of a one-sheet workbook; cells use inline strings so no shared string table is needed
+function workbookParts(sheetName: string): Record<string, string> {
+  return {
+    '[Content_Types].xml': XML_HEADER
+      + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+      + '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+      + '<Default Extension="xml" ContentType="application/xml"/>'
+      + '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+      + '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+      + '</Types>',
+    '_rels/.rels': XML_HEADER
+      + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+      + `<Relationship Id="rId1" Type="${RELATIONSHIPS}/officeDocument" Target="xl/workbook.xml"/>`
+      + '</Relationships>',
+    'xl/workbook.xml': XML_HEADER
+      + `<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="${RELATIONSHIPS}">`
+      + `<sheets><sheet name="${xmlText(sheetName)}" sheetId="1" r:id="rId1"/></sheets>`
+      + '</workbook>',
+    'xl/_rels/workbook.xml.rels': XML_HEADER
+      + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+      + `<Relationship Id="rId1" Type="${RELATIONSHIPS}/worksheet" Target="worksheets/sheet1.xml"/>`
+      + '</Relationships>'
+  };
+}
+
+export interface ExportOptions {
+  sheetName: string;
+  // Resumed downloads skip the CSV header (and BOM) so the bytes can be appended to the partial file
+  header: boolean;
+}
+
+export async function* exportChunks(
+  format: ExportFormat,
+  rows: AsyncIterable<Document>,
+  columns: ExportColumn[],
+  options: ExportOptions
+): AsyncGenerator<string | Uint8Array> {
+  if (format === 'ndjson') {
+    yield* coalesce(lines(rows, doc => JSON.stringify(doc) + '\n'));
+    return;
+  }
+
+  if (format === 'csv') {
+    // The BOM makes Excel read the file as UTF-8
+    if (options.header) yield '\ufeff' + columns.map(column => csvCell(column.header)).join(',') + '\r\n';
+    yield* coalesce(lines(rows, doc => columns.map(column => csvCell(column.value(doc))).join(',') + '\r\n'));
+    return;
+  }
+
+  const encoder = new TextEncoder();
+  const modified = new Date();
+  async function* sheet(): AsyncGenerator<Uint8Array> {
+    yield encoder.encode(XML_HEADER
+      + '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+      + sheetRow(1, columns.map(column => column.header)));
+    let rowNumber = 1;
+    for await (const chunk of coalesce(lines(rows, doc => sheetRow(++rowNumber, columns.map(column => column.value(doc)))))) {
+      yield encoder.encode(chunk);
+    }
+    yield encoder.encode('</sheetData></worksheet>');
+  }
+
+  yield* streamZip([
+    ...Object.entries(workbookParts(options.sheetName)).map(([name, xml]) => ({
+      name,
+      modified,
+      content: [encoder.encode(xml)]
+    })),
+    { name: 'xl/worksheets/sheet1.xml', modified, content: sheet() }
+  ]);
+}
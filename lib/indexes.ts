@@ -0,0 +1,115 @@
+import { Db, Document, IndexDescription, Sort } from 'mongodb';
+
+// Indexes backing every lookup the API performs, keyed by collection
+export const INDEXES: Record<string, IndexDescription[]> = {
+  students: [
+    { key: { email: 1 }, name: 'email_unique', unique: true },
+    { key: { id: 1 }, name: 'id_unique', unique: true },
+    { key: { createdAt: -1, id: -1 }, name: 'createdAt_id' },
+    { key: { department: 1, createdAt: -1, id: -1 }, name: 'department_createdAt_id' }
+  ],
+  service_requests: [
+    { key: { id: 1 }, name: 'id_unique', unique: true },
+    { key: { studentId: 1, createdAt: -1, id: -1 }, name: 'studentId_createdAt_id' },
+    { key: { status: 1, createdAt: -1, id: -1 }, name: 'status_createdAt_id' },
+    { key: { department: 1, createdAt: -1, id: -1 }, name: 'department_createdAt_id' },
+    { key: { serviceType: 1, createdAt: -1, id: -1 }, name: 'serviceType_createdAt_id' },
+    { key: { status: 1, updatedAt: 1 }, name: 'status_updatedAt' },
+    { key: { createdAt: -1, id: -1 }, name: 'createdAt_id' }
+  ],
+  notifications: [
+    { key: { id: 1 }, name: 'id_unique', unique: true },
+    { key: { userId: 1, read: 1, createdAt: -1 }, name: 'userId_read_createdAt' },
+    { key: { userId: 1, createdAt: -1 }, name: 'userId_createdAt' }
+  ],
+  users: [
+    { key: { userId: 1, role: 1 }, name: 'userId_role_unique', unique: true }
+  ],
+  services: [
+    { key: { id: 1 }, name: 'id_unique', unique: true },
+    // Natural keys the startup seed upserts on (lib/catalog)
+    { key: { name: 1 }, name: 'name_unique', unique: true }
+  ],
+  fee_structures: [
+    { key: { id: 1 }, name: 'id_unique', unique: true },
+    { key: { category: 1 }, name: 'category_unique', unique: true }
+  ]
+};
+
+// Representative query for each hot route, used to verify the plans above are picked
+interface PlanCheck {
+  name: string;
+  collection: string;
+  filter: Document;
+  sort?: Sort;
+}
+
+const PLAN_CHECKS: PlanCheck[] = [
+  { name: 'student login', collection: 'students', filter: { email: 'check@example.com' } },
+  { name: 'student by id', collection: 'students', filter: { id: 'check' } },
+  { name: 'students page', collection: 'students', filter: {}, sort: { createdAt: -1, id: -1 } },
+  { name: 'students by department', collection: 'students', filter: { department: 'check' }, sort: { createdAt: -1, id: -1 } },
+  { name: 'requests page', collection: 'service_requests', filter: {}, sort: { createdAt: -1, id: -1 } },
+  { name: 'requests by student', collection: 'service_requests', filter: { studentId: 'check' }, sort: { createdAt: -1, id: -1 } },
+  { name: 'requests by status', collection: 'service_requests', filter: { status: 'pending' }, sort: { createdAt: -1, id: -1 } },
+  { name: 'request by id', collection: 'service_requests', filter: { id: 'check' } },
+  { name: 'approvals by day', collection: 'service_requests', filter: { status: 'approved', updatedAt: { $gte: new Date(0) } }, sort: { updatedAt: 1 } },
+  { name: 'notifications by user', collection: 'notifications', filter: { userId: 'check' }, sort: { createdAt: -1 } },
+  { name: 'unread notification count', collection: 'notifications', filter: { userId: 'check', read: false } },
+  { name: 'notification by id', collection: 'notifications', filter: { id: 'check' } },
+  { name: 'staff login', collection: 'users', filter: { userId: 'check', role: 'academic' } },
+  { name: 'service by id', collection: 'services', filter: { id: 'check' } }
+];
+
+export interface PlanResult {
+  name: string;
+  collection: string;
+  stages: string[];
+  ok: boolean;
+}
+
+let ensured: Promise<void> | null = null;
+
+export async function ensureIndexes(db: Db): Promise<void> {
+  await Promise.all(Object.entries(INDEXES).map(async ([collection, indexes]) => {
+    try {
+      await db.collection(collection).createIndexes(indexes);
+    } catch (error: any) {
+      // Usually duplicate data blocking a unique index; keep serving and let the check surface it
+      console.error(`Failed to create indexes on ${collection}:`, error.message);
+    }
+  }));
+}
+
+// Run index creation once per process, on the first connection
+export function ensureIndexesOnce(db: Db): Promise<void> {
+  if (!ensured) {
+    ensured = ensureIndexes(db);
+  }
+  return ensured;
+}
+
+function collectStages(plan: any, stages: string[] = []): string[] {
+  if (!plan || typeof plan !== 'object') return stages;
+  if (typeof plan.stage === 'string') stages.push(plan.stage);
+  for (const value of Object.values(plan)) {
+    if (value && typeof value === 'object') collectStages(value, stages);
+  }
+  return stages;
+}
+
+// Explain every hot query and flag any winning plan that falls back to a collection scan
+export async function verifyQueryPlans(db: Db): Promise<PlanResult[]> {
+  return Promise.all(PLAN_CHECKS.map(async check => {
+    let cursor = db.collection(check.collection).find(check.filter);
+    if (check.sort) cursor = cursor.sort(check.sort);
+    const explained = await cursor.limit(1).explain('queryPlanner');
+    const stages = collectStages(explained.queryPlanner?.winningPlan);
+    return {
+      name: check.name,
+      collection: check.collection,
+      stages,
+      ok: stages.length > 0 && !stages.includes('COLLSCAN')
+    };
+  }));
+}
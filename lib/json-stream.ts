@@ -0,0 +1,39 @@
+import { Document } from 'mongodb';
+
+// Serialize list responses a few rows at a time. The caller pulls chunks as the response
+// body is read, so the whole JSON string is never held in memory at once.
+
+const ROWS_PER_CHUNK = 100;
+
+// `[row,row,...]`, the default list format
+export function* jsonArrayChunks(items: Document[], rowsPerChunk = ROWS_PER_CHUNK): Generator<string> {
+  yield '[';
+  for (let i = 0; i < items.length; i += rowsPerChunk) {
+    const rows = items.slice(i, i + rowsPerChunk).map(item => JSON.stringify(item));
+    yield (i > 0 ? ',' : '') + rows.join(',');
+  }
+  yield ']';
+}
+
+// `{"columns":[...],"rows":[[...],...]}` for `?format=columns`: field names are sent once and
+// each row is an array of values in column order, with null where a row lacks the field
+export function* columnarChunks(items: Document[], rowsPerChunk = ROWS_PER_CHUNK): Generator<string> {
+  const columns: string[] = [];
+  const seen = new Set<string>();
+  for (const item of items) {
+    for (const key of Object.keys(item)) {
+      if (!seen.has(key)) {
+        seen.add(key);
+        columns.push(key);
+      }
+    }
+  }
+
+  yield `{"columns":${JSON.stringify(columns)},"rows":[`;
+  for (let i = 0; i < items.length; i += rowsPerChunk) {
+    const rows = items.slice(i, i + rowsPerChunk)
+      .map(item => JSON.stringify(columns.map(column => item[column] === undefined ? null : item[column])));
+    yield (i > 0 ? ',' : '') + rows.join(',');
+  }
+  yield ']}';
+}
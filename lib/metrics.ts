@@ -0,0 +1,162 @@
+// In-process metrics rendered in Prometheus text format by GET /api/metrics.
+// Recording is a map lookup plus a short bucket scan, so it is safe on every request.
+
+const LATENCY_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000];
+const SIZE_BUCKETS_BYTES = [256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304];
+const QUANTILES = [0.5, 0.95, 0.99];
+
+type Labels = Record<string, string>;
+
+class Histogram {
+  readonly counts: number[];
+  sum = 0;
+  count = 0;
+
+  constructor(readonly buckets: number[]) {
+    this.counts = new Array(buckets.length + 1).fill(0);
+  }
+
+  observe(value: number): void {
+    let i = 0;
+    while (i < this.buckets.length && value > this.buckets[i]) i++;
+    this.counts[i]++;
+    this.sum += value;
+    this.count++;
+  }
+
+  // Estimate a quantile by interpolating inside the bucket it falls in
+  quantile(q: number): number {
+    if (this.count === 0) return 0;
+    const rank = q * this.count;
+    let seen = 0;
+    for (let i = 0; i < this.counts.length; i++) {
+      if (seen + this.counts[i] >= rank) {
+        const lower = i === 0 ? 0 : this.buckets[i - 1];
+        const upper = i < this.buckets.length ? this.buckets[i] : lower;
+        const within = this.counts[i] ? (rank - seen) / this.counts[i] : 0;
+        return lower + (upper - lower) * within;
+      }
+      seen += this.counts[i];
+    }
+    return this.buckets[this.buckets.length - 1];
+  }
+}
+
+class HistogramFamily {
+  private series = new Map<string, { labels: Labels; histogram: Histogram }>();
+
+  constructor(readonly name: string, readonly help: string, private buckets: number[]) {}
+
+  observe(labels: Labels, value: number): void {
+    const key = labelKey(labels);
+    let entry = this.series.get(key);
+    if (!entry) {
+      entry = { labels, histogram: new Histogram(this.buckets) };
+      this.series.set(key, entry);
+    }
+    entry.histogram.observe(value);
+  }
+
+  render(lines: string[]): void {
+    lines.push(`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} histogram`);
+    for (const { labels, histogram } of this.series.values()) {
+      let cumulative = 0;
+      histogram.buckets.forEach((bucket, i) => {
+        cumulative += histogram.counts[i];
+        lines.push(`${this.name}_bucket${formatLabels({ ...labels, le: String(bucket) })} ${cumulative}`);
+      });
+      lines.push(`${this.name}_bucket${formatLabels({ ...labels, le: '+Inf' })} ${histogram.count}`);
+      lines.push(`${this.name}_sum${formatLabels(labels)} ${histogram.sum}`);
+      lines.push(`${this.name}_count${formatLabels(labels)} ${histogram.count}`);
+    }
+
+    // Pre-computed percentiles for dashboards that don't run histogram_quantile
+    lines.push(`# HELP ${this.name}_quantile ${this.help} (estimated percentiles)`, `# TYPE ${this.name}_quantile gauge`);
+    for (const { labels, histogram } of this.series.values()) {
+      for (const q of QUANTILES) {
+        lines.push(`${this.name}_quantile${formatLabels({ ...labels, quantile: String(q) })} ${histogram.quantile(q).toFixed(2)}`);
+      }
+    }
+  }
+}
+
+class CounterFamily {
+  private series = new Map<string, { labels: Labels; value: number }>();
+
+  constructor(readonly name: string, readonly help: string) {}
+
+  inc(labels: Labels, amount = 1): void {
+    const key = labelKey(labels);
+    const entry = this.series.get(key);
+    if (entry) entry.value += amount;
+    else this.series.set(key, { labels, value: amount });
+  }
+
+  render(lines: string[]): void {
+    lines.push(`# HELP ${this.name} ${this.help}`, `# TYPE ${this.name} counter`);
+    for (const { labels, value } of this.series.values()) {
+      lines.push(`${this.name}${formatLabels(labels)} ${value}`);
+    }
+  }
+}
+
+function labelKey(labels: Labels): string {
+  let key = '';
+  for (const name in labels) key += `${name}=${labels[name]};`;
+  return key;
+}
+
+function formatLabels(labels: Labels): string {
+  const parts = Object.entries(labels).map(([name, value]) =>
+    `${name}="${value.replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n')}"`
+  );
+  return parts.length ? `{${parts.join(',')}}` : '';
+}
+
+const httpRequests = new CounterFamily('http_requests_total', 'HTTP requests by route and status code');
+const httpDuration = new HistogramFamily('http_request_duration_ms', 'HTTP request latency in milliseconds', LATENCY_BUCKETS_MS);
+const httpRequestSize = new HistogramFamily('http_request_size_bytes', 'HTTP request body size in bytes', SIZE_BUCKETS_BYTES);
+const httpResponseSize = new HistogramFamily('http_response_size_bytes', 'HTTP response body size in bytes, when known', SIZE_BUCKETS_BYTES);
+const mongoDuration = new HistogramFamily('mongo_command_duration_ms', 'MongoDB command latency in milliseconds', LATENCY_BUCKETS_MS);
+const mongoFailures = new CounterFamily('mongo_command_failures_total', 'Failed MongoDB commands');
+
+export interface RequestObservation {
+  method: string;
+  pattern: string;
+  status: number;
+  durationMs: number;
+  requestBytes?: number;
+  responseBytes?: number;
+}
+
+export function observeRequest({ method, pattern, status, durationMs, requestBytes, responseBytes }: RequestObservation): void {
+  const route = { method, route: pattern };
+  httpRequests.inc({ ...route, status: String(status) });
+  httpDuration.observe(route, durationMs);
+  if (requestBytes) httpRequestSize.observe(route, requestBytes);
+  if (responseBytes) httpResponseSize.observe(route, responseBytes);
+}
+
+export function observeMongoCommand(collection: string, command: string, durationMs: number, failed = false): void {
+  const labels = { collection, command };
+  mongoDuration.observe(labels, durationMs);
+  if (failed) mongoFailures.inc(labels);
+}
+
+// A value read from another module at scrape time; counters must be monotonic and end in _total
+export interface Sample {
+  type: 'counter' | 'gauge';
+  help: string;
+  value: number;
+}
+
+export function renderMetrics(samples: Record<string, Sample> = {}): string {
+  const lines: string[] = [];
+  for (const family of [httpRequests, httpDuration, httpRequestSize, httpResponseSize, mongoDuration, mongoFailures]) {
+    family.render(lines);
+  }
+  for (const [name, { type, help, value }] of Object.entries(samples)) {
+    lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`, `${name} ${value}`);
+  }
+  return lines.join('\n') + '\n';
+}
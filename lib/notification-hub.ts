@@ -0,0 +1,142 @@
+import { ChangeStream, Db, Document } from 'mongodb';
+
+// One watcher per process fans notification changes out to every open stream,
+// instead of each connected user holding its own change stream or poll loop.
+
+export type HubEvent =
+  | { type: 'notification'; notification: Document }
+  | { type: 'changed' };
+
+type Listener = (event: HubEvent) => void;
+
+const POLL_INTERVAL_MS = parseInt(process.env.NOTIFICATION_POLL_MS || '5000', 10);
+// Re-read a short window on every poll so inserts from servers with slightly skewed clocks aren't missed
+const POLL_OVERLAP_MS = 2000;
+
+const listeners = new Map<string, Set<Listener>>();
+let changeStream: ChangeStream | null = null;
+let pollTimer: ReturnType<typeof setInterval> | null = null;
+let changeStreamsUnavailable = false;
+
+function emit(userId: string, event: HubEvent): void {
+  listeners.get(userId)?.forEach(listener => listener(event));
+}
+
+// Unread count per connected user, so the poll can notice reads (mark-read, another tab)
+async function unreadCounts(db: Db, userIds: string[]): Promise<Map<string, number>> {
+  const groups = await db.collection('notifications')
+    .aggregate([
+      { $match: { userId: { $in: userIds }, read: false } },
+      { $group: { _id: '$userId', count: { $sum: 1 } } }
+    ])
+    .toArray();
+  // Users with nothing unread have no group
+  const counts = new Map(userIds.map(userId => [userId, 0]));
+  groups.forEach(group => counts.set(group._id, group.count));
+  return counts;
+}
+
+function startPolling(db: Db): void {
+  if (pollTimer) return;
+
+  let since = new Date(Date.now() - POLL_OVERLAP_MS);
+  let seen = new Set<string>();
+  let unread = new Map<string, number>();
+
+  pollTimer = setInterval(async () => {
+    if (listeners.size === 0) return;
+    try {
+      const userIds = Array.from(listeners.keys());
+      const windowStart = new Date(since.getTime() - POLL_OVERLAP_MS);
+      const [notifications, counts] = await Promise.all([
+        db.collection('notifications')
+          .find(
+            { userId: { $in: userIds }, createdAt: { $gt: windowStart } },
+            { projection: { _id: 0 } }
+          )
+          .sort({ createdAt: 1 })
+          .toArray(),
+        unreadCounts(db, userIds)
+      ]);
+
+      const current = new Set<string>();
+      for (const notification of notifications) {
+        current.add(notification.id);
+        if (notification.createdAt > since) since = notification.createdAt;
+        if (!seen.has(notification.id)) {
+          emit(notification.userId, { type: 'notification', notification });
+        }
+      }
+      seen = current;
+
+      // The change stream reports updates as 'changed'; here a moved unread count stands in for them.
+      // A user's first poll only records the count, since the stream sent it on connect.
+      for (const [userId, count] of counts) {
+        const previous = unread.get(userId);
+        if (previous !== undefined && previous !== count) emit(userId, { type: 'changed' });
+      }
+      unread = counts;
+    } catch (error: any) {
+      console.error('Notification poll failed:', error.message);
+    }
+  }, POLL_INTERVAL_MS);
+}
+
+function startWatching(db: Db): void {
+  if (changeStream || pollTimer) return;
+  if (changeStreamsUnavailable) {
+    startPolling(db);
+    return;
+  }
+
+  try {
+    changeStream = db.collection('notifications').watch(
+      [{ $match: { operationType: { $in: ['insert', 'update', 'replace'] } } }],
+      { fullDocument: 'updateLookup' }
+    );
+  } catch (error) {
+    changeStreamsUnavailable = true;
+    startPolling(db);
+    return;
+  }
+
+  changeStream.on('change', (change: any) => {
+    const doc = change.fullDocument;
+    if (!doc?.userId || !listeners.has(doc.userId)) return;
+    if (change.operationType === 'insert') {
+      const { _id, ...notification } = doc;
+      emit(doc.userId, { type: 'notification', notification });
+    } else {
+      emit(doc.userId, { type: 'changed' });
+    }
+  });
+
+  // Standalone mongod has no oplog, so change streams fail on first use; fall back to polling
+  changeStream.on('error', (error: any) => {
+    console.warn('Notification change stream unavailable, polling instead:', error.message);
+    changeStream?.close().catch(() => {});
+    changeStream = null;
+    changeStreamsUnavailable = true;
+    startPolling(db);
+  });
+}
+
+function stop(): void {
+  changeStream?.close().catch(() => {});
+  changeStream = null;
+  if (pollTimer) clearInterval(pollTimer);
+  pollTimer = null;
+}
+
+export function subscribe(db: Db, userId: string, listener: Listener): () => void {
+  if (!listeners.has(userId)) listeners.set(userId, new Set());
+  listeners.get(userId)!.add(listener);
+  startWatching(db);
+
+  return () => {
+    const userListeners = listeners.get(userId);
+    userListeners?.delete(listener);
+    if (userListeners?.size === 0) listeners.delete(userId);
+    if (listeners.size === 0) stop();
+  };
+}
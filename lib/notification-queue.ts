@@ -0,0 +1,195 @@
+import { Db, Document, MongoBulkWriteError } from 'mongodb';
+
+// Background writer for notifications. Handlers enqueue and return; a worker batches
+// queued notifications into insertMany calls and retries failures with backoff.
+// With NOTIFICATION_QUEUE_DURABLE=true jobs are also kept in an outbox collection until
+// delivered, so a restart picks them up again. Inserts are idempotent on the notification
+// id, so a job delivered twice (e.g. recovered by two processes) is only stored once.
+
+export interface NotificationQueueMetrics {
+  depth: number;
+  inFlight: number;
+  oldestLagMs: number;
+  lastLagMs: number;
+  maxLagMs: number;
+  delivered: number;
+  failedAttempts: number;
+  retries: number;
+  dropped: number;
+  batches: number;
+}
+
+interface NotificationJob {
+  notification: Document;
+  enqueuedAt: number;
+  attempts: number;
+  notBefore: number;
+}
+
+function envInt(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value >= 0 ? value : fallback;
+}
+
+const BATCH_SIZE = Math.max(1, envInt('NOTIFICATION_QUEUE_BATCH_SIZE', 100));
+const FLUSH_MS = envInt('NOTIFICATION_QUEUE_FLUSH_MS', 50);
+const MAX_ATTEMPTS = Math.max(1, envInt('NOTIFICATION_QUEUE_MAX_ATTEMPTS', 5));
+const RETRY_BASE_MS = envInt('NOTIFICATION_QUEUE_RETRY_MS', 500);
+const DURABLE = process.env.NOTIFICATION_QUEUE_DURABLE === 'true';
+const OUTBOX = 'notification_outbox';
+const DUPLICATE_KEY = 11000;
+
+const queue: NotificationJob[] = [];
+let database: Db | null = null;
+let timer: ReturnType<typeof setTimeout> | null = null;
+let running = false;
+let inFlight: NotificationJob[] = [];
+
+const counters = {
+  lastLagMs: 0,
+  maxLagMs: 0,
+  delivered: 0,
+  failedAttempts: 0,
+  retries: 0,
+  dropped: 0,
+  batches: 0
+};
+
+function schedule(delay: number): void {
+  if (timer) return;
+  timer = setTimeout(() => {
+    timer = null;
+    drain().catch(error => console.error('Notification queue error:', error));
+  }, delay);
+}
+
+function takeReady(now: number): NotificationJob[] {
+  const batch: NotificationJob[] = [];
+  for (let i = 0; i < queue.length && batch.length < BATCH_SIZE;) {
+    if (queue[i].notBefore <= now) batch.push(queue.splice(i, 1)[0]);
+    else i++;
+  }
+  return batch;
+}
+
+async function deliver(db: Db, batch: NotificationJob[]): Promise<void> {
+  let failed: NotificationJob[] = [];
+  try {
+    // Copies, so the driver's generated _id never sticks to a job that might be retried
+    await db.collection('notifications').insertMany(batch.map(job => ({ ...job.notification })), { ordered: false });
+  } catch (error: any) {
+    if (error instanceof MongoBulkWriteError) {
+      const writeErrors = Array.isArray(error.writeErrors) ? error.writeErrors : [error.writeErrors];
+      failed = writeErrors
+        .filter(writeError => writeError.code !== DUPLICATE_KEY)
+        .map(writeError => batch[writeError.index]);
+    } else {
+      failed = batch;
+    }
+    if (failed.length > 0) console.error(`Notification insert failed for ${failed.length} job(s):`, error.message);
+  }
+
+  const now = Date.now();
+  const failedSet = new Set(failed);
+  const done = batch.filter(job => !failedSet.has(job));
+  counters.batches++;
+  counters.delivered += done.length;
+  counters.failedAttempts += failed.length;
+  for (const job of done) {
+    counters.lastLagMs = now - job.enqueuedAt;
+    counters.maxLagMs = Math.max(counters.maxLagMs, counters.lastLagMs);
+  }
+
+  for (const job of failed) {
+    job.attempts++;
+    if (job.attempts >= MAX_ATTEMPTS) {
+      counters.dropped++;
+      console.error(`Dropping notification ${job.notification.id} after ${job.attempts} attempts`
+        + (DURABLE ? ' (left in the outbox for the next restart)' : ''));
+      continue;
+    }
+    counters.retries++;
+    job.notBefore = now + RETRY_BASE_MS * 2 ** (job.attempts - 1);
+    queue.push(job);
+  }
+
+  if (DURABLE && done.length > 0) {
+    await db.collection(OUTBOX)
+      .deleteMany({ _id: { $in: done.map(job => job.notification.id) } } as Document)
+      .catch(error => console.error('Notification outbox cleanup failed:', error.message));
+  }
+}
+
+async function drain(): Promise<void> {
+  if (running || !database) return;
+  running = true;
+  try {
+    for (let batch = takeReady(Date.now()); batch.length > 0; batch = takeReady(Date.now())) {
+      inFlight = batch;
+      await deliver(database, batch);
+      inFlight = [];
+    }
+  } finally {
+    running = false;
+    if (queue.length > 0) {
+      const next = queue.reduce((earliest, job) => Math.min(earliest, job.notBefore), Infinity);
+      schedule(Math.max(FLUSH_MS, next - Date.now()));
+    }
+  }
+}
+
+function push(notifications: Document[], enqueuedAt: number): void {
+  for (const notification of notifications) {
+    queue.push({ notification, enqueuedAt, attempts: 0, notBefore: 0 });
+  }
+  schedule(queue.length >= BATCH_SIZE ? 0 : FLUSH_MS);
+}
+
+// Reload jobs a previous process left in the outbox
+async function recoverOutbox(db: Db): Promise<void> {
+  const leftovers = await db.collection(OUTBOX).find({}).sort({ enqueuedAt: 1 }).toArray();
+  if (leftovers.length === 0) return;
+  const queued = new Set(queue.map(job => job.notification.id));
+  const recovered = leftovers.filter(doc => !queued.has(doc._id)).map(doc => doc.notification);
+  console.log(`Recovered ${recovered.length} queued notification(s) from the outbox`);
+  push(recovered, Date.now());
+}
+
+export function startNotificationQueue(db: Db): void {
+  if (database) return;
+  database = db;
+  if (DURABLE) {
+    recoverOutbox(db).catch(error => console.error('Notification outbox recovery failed:', error.message));
+  }
+}
+
+// Queue notifications for delivery. Only the durable outbox write (if enabled) is awaited,
+// and a failure there falls back to the in-memory queue rather than failing the caller.
+export async function enqueueNotifications(db: Db, notifications: Document[]): Promise<void> {
+  if (notifications.length === 0) return;
+  startNotificationQueue(db);
+
+  const enqueuedAt = Date.now();
+  if (DURABLE) {
+    try {
+      await db.collection(OUTBOX).insertMany(
+        notifications.map(notification => ({ _id: notification.id, notification, enqueuedAt: new Date(enqueuedAt) })) as Document[],
+        { ordered: false }
+      );
+    } catch (error: any) {
+      console.error('Notification outbox write failed, queueing in memory only:', error.message);
+    }
+  }
+  push(notifications, enqueuedAt);
+}
+
+export function getNotificationQueueMetrics(): NotificationQueueMetrics {
+  const now = Date.now();
+  const waiting = [...queue, ...inFlight];
+  return {
+    depth: waiting.length,
+    inFlight: inFlight.length,
+    oldestLagMs: waiting.reduce((oldest, job) => Math.max(oldest, now - job.enqueuedAt), 0),
+    ...counters
+  };
+}
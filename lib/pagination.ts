@@ -0,0 +1,73 @@
+import { Collection, Document, Filter } from 'mongodb';
+
+export const DEFAULT_PAGE_SIZE = 100;
+export const MAX_PAGE_SIZE = 1000;
+
+export interface PageCursor {
+  createdAt: Date;
+  id: string;
+}
+
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+// Cursors look like `<createdAt ISO>,<id>` and point at the last row already returned
+export function parseCursor(after: string | null): PageCursor | null {
+  if (!after) return null;
+  const separator = after.indexOf(',');
+  if (separator === -1) return null;
+
+  const createdAt = new Date(after.slice(0, separator));
+  const id = after.slice(separator + 1);
+  if (isNaN(createdAt.getTime()) || !id) return null;
+  return { createdAt, id };
+}
+
+export function encodeCursor(doc: Document): string {
+  return `${new Date(doc.createdAt).toISOString()},${doc.id}`;
+}
+
+export function parseLimit(value: string | null, fallback = DEFAULT_PAGE_SIZE): number {
+  const limit = parseInt(value || '', 10);
+  if (!Number.isFinite(limit) || limit <= 0) return fallback;
+  return Math.min(limit, MAX_PAGE_SIZE);
+}
+
+// Rows strictly after the cursor in newest-first (createdAt, id) order
+export function keysetFilter(filter: Filter<Document>, after: PageCursor | null): Filter<Document> {
+  if (!after) return filter;
+  return {
+    $and: [
+      filter,
+      {
+        $or: [
+          { createdAt: { $lt: after.createdAt } },
+          { createdAt: after.createdAt, id: { $lt: after.id } }
+        ]
+      }
+    ]
+  };
+}
+
+// Fetch one page ordered newest first, using (createdAt, id) as a stable keyset
+export async function findPage(
+  collection: Collection,
+  filter: Filter<Document>,
+  options: { after: PageCursor | null; limit: number; projection: Document }
+): Promise<Page<Document>> {
+  const { after, limit, projection } = options;
+  const query = keysetFilter(filter, after);
+
+  // One extra row tells us whether another page exists without a count
+  const docs = await collection
+    .find(query, { projection })
+    .sort({ createdAt: -1, id: -1 })
+    .limit(limit + 1)
+    .toArray();
+
+  const items = docs.slice(0, limit);
+  const nextCursor = docs.length > limit ? encodeCursor(items[items.length - 1]) : null;
+  return { items, nextCursor };
+}
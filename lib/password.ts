@@ -0,0 +1,134 @@
+import { createHmac, randomBytes, scrypt, timingSafeEqual } from 'crypto';
+
+// Password hashing. Hashes are stored as `scrypt$<N>$<r>$<p>$<salt>$<key>` (base64 salt/key).
+// crypto.scrypt runs on libuv's worker thread pool, so a hash never blocks the event loop;
+// a semaphore keeps hashing from occupying every pool thread that fs and dns lookups also need.
+// Successful checks are remembered for a short while, keyed by the stored hash, so a burst of
+// logins (a class signing in with the shared default password) pays for scrypt once, not per login.
+
+export interface PasswordCheck {
+  valid: boolean;
+  // The stored value is plaintext or was hashed at a different cost; store a fresh hash
+  needsRehash: boolean;
+}
+
+export interface PasswordHashMetrics {
+  active: number;
+  queued: number;
+  hashes: number;
+  cacheHits: number;
+  cacheMisses: number;
+}
+
+interface ScryptParams {
+  N: number;
+  r: number;
+  p: number;
+}
+
+function envInt(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value >= 0 ? value : fallback;
+}
+
+const isPowerOfTwo = (n: number) => n > 1 && (n & (n - 1)) === 0;
+
+const CONFIGURED_N = envInt('PASSWORD_SCRYPT_N', 16384);
+const COST: ScryptParams = { N: isPowerOfTwo(CONFIGURED_N) ? CONFIGURED_N : 16384, r: 8, p: 1 };
+const KEY_BYTES = 32;
+const SALT_BYTES = 16;
+// Leave one libuv thread free for everything else; the pool has 4 unless UV_THREADPOOL_SIZE says otherwise
+const CONCURRENCY = Math.max(1, envInt('PASSWORD_HASH_CONCURRENCY', envInt('UV_THREADPOOL_SIZE', 4) - 1));
+const CACHE_TTL_MS = envInt('PASSWORD_VERIFY_CACHE_TTL_MS', 300000);
+const CACHE_SIZE = envInt('PASSWORD_VERIFY_CACHE_SIZE', 10000);
+
+// Cache entries hold an HMAC of the password under a per-process key, never the password itself
+const cacheKey = randomBytes(32);
+const verified = new Map<string, { digest: Buffer; expiresAt: number }>();
+
+let active = 0;
+const waiting: (() => void)[] = [];
+const counters = { hashes: 0, cacheHits: 0, cacheMisses: 0 };
+
+async function withSlot<T>(task: () => Promise<T>): Promise<T> {
+  if (active < CONCURRENCY) active++;
+  else await new Promise<void>(resolve => waiting.push(resolve));
+  try {
+    return await task();
+  } finally {
+    // Hand the slot straight to the next waiter so a new arrival can't jump the queue
+    const next = waiting.shift();
+    if (next) next();
+    else active--;
+  }
+}
+
+function derive(password: string, salt: Buffer, params: ScryptParams, keyBytes: number): Promise<Buffer> {
+  return withSlot(() => new Promise<Buffer>((resolve, reject) => {
+    counters.hashes++;
+    const maxmem = 256 * params.N * params.r;
+    scrypt(password, salt, keyBytes, { ...params, maxmem }, (error, key) => (error ? reject(error) : resolve(key)));
+  }));
+}
+
+function parseHash(stored: string): { params: ScryptParams; salt: Buffer; key: Buffer } | null {
+  const parts = stored.split('$');
+  if (parts.length !== 6 || parts[0] !== 'scrypt') return null;
+  const [N, r, p] = parts.slice(1, 4).map(Number);
+  if (!isPowerOfTwo(N) || !(r > 0) || !(p > 0)) return null;
+  return { params: { N, r, p }, salt: Buffer.from(parts[4], 'base64'), key: Buffer.from(parts[5], 'base64') };
+}
+
+export function isPasswordHash(stored: string): boolean {
+  return parseHash(stored) !== null;
+}
+
+export async function hashPassword(password: string): Promise<string> {
+  const salt = randomBytes(SALT_BYTES);
+  const key = await derive(password, salt, COST, KEY_BYTES);
+  return `scrypt$${COST.N}$${COST.r}$${COST.p}$${salt.toString('base64')}$${key.toString('base64')}`;
+}
+
+function passwordDigest(password: string): Buffer {
+  return createHmac('sha256', cacheKey).update(password).digest();
+}
+
+function rememberValid(stored: string, digest: Buffer): void {
+  if (CACHE_SIZE === 0 || CACHE_TTL_MS === 0) return;
+  verified.delete(stored);
+  verified.set(stored, { digest, expiresAt: Date.now() + CACHE_TTL_MS });
+  // Maps iterate in insertion order, so the first key is the least recently verified
+  if (verified.size > CACHE_SIZE) verified.delete(verified.keys().next().value as string);
+}
+
+function safeEqual(a: Buffer, b: Buffer): boolean {
+  return a.length === b.length && timingSafeEqual(a, b);
+}
+
+// Check a password against a stored hash. Values that aren't hashes are treated as legacy
+// plaintext, so accounts created before hashing keep working and get upgraded on login.
+export async function verifyPassword(password: string, stored: string): Promise<PasswordCheck> {
+  const parsed = parseHash(stored);
+  if (!parsed) {
+    const valid = safeEqual(Buffer.from(password), Buffer.from(stored));
+    return { valid, needsRehash: valid };
+  }
+
+  const needsRehash = parsed.params.N !== COST.N || parsed.params.r !== COST.r || parsed.params.p !== COST.p;
+  const digest = passwordDigest(password);
+  const cached = verified.get(stored);
+  if (cached && cached.expiresAt > Date.now() && safeEqual(cached.digest, digest)) {
+    counters.cacheHits++;
+    return { valid: true, needsRehash };
+  }
+
+  counters.cacheMisses++;
+  const key = await derive(password, parsed.salt, parsed.params, parsed.key.length);
+  const valid = safeEqual(key, parsed.key);
+  if (valid) rememberValid(stored, digest);
+  return { valid, needsRehash: valid && needsRehash };
+}
+
+export function getPasswordHashMetrics(): PasswordHashMetrics {
+  return { active, queued: waiting.length, ...counters };
+}
@@ -0,0 +1,61 @@
+import { streamCSVRows, streamExcelRows, type ParsedStudent } from '@/lib/excel-parser';
+
+// Parses an uploaded roster off the main thread. Rows are posted back in chunks as they are
+// read, with progress in between, so the page stays responsive on large workbooks. The xlsx
+// library is only bundled into this worker, not into the page.
+
+export interface RosterParseRequest {
+  id: number;
+  file: File;
+  chunkSize: number;
+}
+
+export type RosterParseMessage =
+  | { id: number; type: 'chunk'; students: ParsedStudent[] }
+  // `fraction` is how much of the file has been read; unknown for XLSX, which is read whole
+  | { id: number; type: 'progress'; rows: number; fraction: number | null }
+  | { id: number; type: 'done'; rows: number }
+  | { id: number; type: 'error'; error: string };
+
+const post = (message: RosterParseMessage) => self.postMessage(message);
+
+// Pass a file's bytes through unchanged, reporting how many have been read
+function countBytes(file: File, onRead: (bytes: number) => void): ReadableStream<Uint8Array> {
+  let read = 0;
+  return file.stream().pipeThrough(new TransformStream<Uint8Array, Uint8Array>({
+    transform(chunk, controller) {
+      read += chunk.length;
+      onRead(read);
+      controller.enqueue(chunk);
+    }
+  }));
+}
+
+self.onmessage = async (event: MessageEvent<RosterParseRequest>) => {
+  const { id, file, chunkSize } = event.data;
+  const isCSV = file.name.toLowerCase().endsWith('.csv');
+  let bytesRead = 0;
+
+  try {
+    const rows = isCSV
+      ? streamCSVRows(countBytes(file, bytes => { bytesRead = bytes; }))
+      : streamExcelRows(await file.arrayBuffer());
+
+    let chunk: ParsedStudent[] = [];
+    let count = 0;
+    for await (const student of rows) {
+      if (!student.email) continue;
+      chunk.push(student);
+      count++;
+      if (chunk.length >= chunkSize) {
+        post({ id, type: 'chunk', students: chunk });
+        post({ id, type: 'progress', rows: count, fraction: isCSV && file.size ? bytesRead / file.size : null });
+        chunk = [];
+      }
+    }
+    if (chunk.length > 0) post({ id, type: 'chunk', students: chunk });
+    post({ id, type: 'done', rows: count });
+  } catch (error: any) {
+    post({ id, type: 'error', error: error?.message || 'Failed to parse file' });
+  }
+};
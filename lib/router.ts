@@ -0,0 +1,147 @@
+import { Db } from 'mongodb';
+import { NextRequest, NextResponse } from 'next/server';
+import type { Session } from '@/lib/session';
+
+// '/students/:id' -> 'id'
+type ParamNames<P extends string> =
+  P extends `${string}:${infer Name}/${infer Rest}`
+    ? Name | ParamNames<`/${Rest}`>
+    : P extends `${string}:${infer Name}`
+      ? Name
+      : never;
+
+export type PathParams<P extends string> = { [K in ParamNames<P>]: string };
+
+export interface RouteContext<P extends string = string> {
+  request: NextRequest;
+  url: URL;
+  params: PathParams<P>;
+  // Only handlers that touch the database call this, so static routes never wait on Mongo
+  getDb: () => Promise<Db>;
+  // Verified access token of the caller, or null when there is none (or it is invalid/expired)
+  session: Session | null;
+}
+
+export type RouteHandler<P extends string = string> = (context: RouteContext<P>) => Promise<NextResponse>;
+
+export interface RouteTiming {
+  method: string;
+  pattern: string;
+  status: number;
+  durationMs: number;
+  requestBytes: number;
+  // Only known when the handler set Content-Length (streamed and JSON bodies usually don't)
+  responseBytes: number;
+}
+
+interface CompiledRoute {
+  pattern: string;
+  segments: string[];
+  handler: RouteHandler<any>;
+}
+
+export class Router {
+  // Exact paths dispatch with a single map lookup
+  private staticRoutes = new Map<string, CompiledRoute>();
+  // Parameterised paths are only compared against routes with the same method and segment count
+  private dynamicRoutes = new Map<string, CompiledRoute[]>();
+  private timingHooks: ((timing: RouteTiming) => void)[] = [];
+  private authenticator: ((request: NextRequest) => Session | null) | null = null;
+
+  get<P extends string>(pattern: P, handler: RouteHandler<P>): this {
+    return this.add('GET', pattern, handler);
+  }
+
+  post<P extends string>(pattern: P, handler: RouteHandler<P>): this {
+    return this.add('POST', pattern, handler);
+  }
+
+  put<P extends string>(pattern: P, handler: RouteHandler<P>): this {
+    return this.add('PUT', pattern, handler);
+  }
+
+  delete<P extends string>(pattern: P, handler: RouteHandler<P>): this {
+    return this.add('DELETE', pattern, handler);
+  }
+
+  add<P extends string>(method: string, pattern: P, handler: RouteHandler<P>): this {
+    const segments = pattern.split('/').filter(Boolean);
+    const route: CompiledRoute = { pattern, segments, handler };
+
+    if (segments.some(segment => segment.startsWith(':'))) {
+      const key = `${method} ${segments.length}`;
+      if (!this.dynamicRoutes.has(key)) this.dynamicRoutes.set(key, []);
+      this.dynamicRoutes.get(key)!.push(route);
+    } else {
+      this.staticRoutes.set(`${method} /${segments.join('/')}`, route);
+    }
+    return this;
+  }
+
+  onTiming(hook: (timing: RouteTiming) => void): this {
+    this.timingHooks.push(hook);
+    return this;
+  }
+
+  // Runs once per matched request, before the handler; must be synchronous and cheap
+  authenticate(authenticator: (request: NextRequest) => Session | null): this {
+    this.authenticator = authenticator;
+    return this;
+  }
+
+  match(method: string, path: string[]): { route: CompiledRoute; params: Record<string, string> } | null {
+    const route = this.staticRoutes.get(`${method} /${path.join('/')}`);
+    if (route) return { route, params: {} };
+
+    for (const candidate of this.dynamicRoutes.get(`${method} ${path.length}`) || []) {
+      const params: Record<string, string> = {};
+      const matched = candidate.segments.every((segment, i) => {
+        if (segment.startsWith(':')) {
+          params[segment.slice(1)] = path[i];
+          return true;
+        }
+        return segment === path[i];
+      });
+      if (matched) return { route: candidate, params };
+    }
+    return null;
+  }
+
+  // Returns null when nothing matches so the caller decides how to answer
+  async dispatch(
+    request: NextRequest,
+    path: string[],
+    getDb: () => Promise<Db>
+  ): Promise<NextResponse | null> {
+    const match = this.match(request.method, path);
+    if (!match) return null;
+
+    const started = performance.now();
+    let status = 500;
+    let responseBytes = 0;
+    try {
+      const response = await match.route.handler({
+        request,
+        url: new URL(request.url),
+        params: match.params,
+        getDb,
+        session: this.authenticator ? this.authenticator(request) : null
+      });
+      status = response.status;
+      responseBytes = Number(response.headers.get('content-length')) || 0;
+      return response;
+    } finally {
+      if (this.timingHooks.length > 0) {
+        const timing = {
+          method: request.method,
+          pattern: match.route.pattern,
+          status,
+          durationMs: performance.now() - started,
+          requestBytes: Number(request.headers.get('content-length')) || 0,
+          responseBytes
+        };
+        this.timingHooks.forEach(hook => hook(timing));
+      }
+    }
+  }
+}
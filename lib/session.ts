@@ -0,0 +1,143 @@
+import { createHash, createHmac, createSecretKey, KeyObject, randomBytes, timingSafeEqual } from 'crypto';
+import { NextRequest, NextResponse } from 'next/server';
+
+// Stateless sessions. Login issues a short-lived access token and a longer-lived refresh token,
+// both HS256 JWTs carried in httpOnly cookies (or an `Authorization: Bearer` header).
+// Access tokens are checked in-process on every request: one HMAC, no database read.
+// Refreshing re-reads the account, so a deleted user can't renew.
+// SESSION_SECRET signs. SESSION_SECRET_PREVIOUS (comma-separated) still verifies tokens
+// signed before a rotation until they expire.
+
+export type SessionRole = 'student' | 'faculty' | 'academic';
+export type TokenType = 'access' | 'refresh';
+
+export const SESSION_ROLES: SessionRole[] = ['student', 'faculty', 'academic'];
+
+export interface Session {
+  // Account id: users.id for staff, students.id for students
+  sub: string;
+  role: SessionRole;
+  name: string;
+  typ: TokenType;
+  iat: number;
+  exp: number;
+}
+
+export interface IssuedSession {
+  accessToken: string;
+  refreshToken: string;
+  // Access token lifetime in seconds
+  expiresIn: number;
+}
+
+function envInt(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
+
+const ACCESS_TTL_S = envInt('SESSION_ACCESS_TTL_S', 900);
+const REFRESH_TTL_S = envInt('SESSION_REFRESH_TTL_S', 7 * 24 * 60 * 60);
+// Tolerate small clock differences between instances
+const CLOCK_SKEW_S = 30;
+
+const ACCESS_COOKIE = 'portal_session';
+const REFRESH_COOKIE = 'portal_refresh';
+// The refresh token is only sent to the endpoints that need it
+const REFRESH_COOKIE_PATH = '/api/auth';
+
+const base64url = (value: string | Buffer) => Buffer.from(value).toString('base64url');
+
+interface SigningKey {
+  key: KeyObject;
+  // base64url of {"alg":"HS256","typ":"JWT","kid":...}; every token this key signs starts with it
+  header: string;
+}
+
+function signingKey(secret: string): SigningKey {
+  const kid = createHash('sha256').update(secret).digest('hex').slice(0, 12);
+  return {
+    key: createSecretKey(Buffer.from(secret)),
+    header: base64url(JSON.stringify({ alg: 'HS256', typ: 'JWT', kid }))
+  };
+}
+
+function loadKeys(): { current: SigningKey; byHeader: Map<string, KeyObject> } {
+  let secret = process.env.SESSION_SECRET;
+  if (!secret) {
+    console.warn('SESSION_SECRET is not set: using a random key, so sessions end on restart and are not shared between instances');
+    secret = randomBytes(32).toString('hex');
+  }
+  const current = signingKey(secret);
+  const previous = (process.env.SESSION_SECRET_PREVIOUS || '').split(',').filter(Boolean).map(signingKey);
+  // Tokens are matched to a key by their exact header segment, so verifying never parses the header
+  const byHeader = new Map([current, ...previous].map(({ key, header }) => [header, key]));
+  return { current, byHeader };
+}
+
+const keys = loadKeys();
+
+function signature(key: KeyObject, signingInput: string): Buffer {
+  return createHmac('sha256', key).update(signingInput).digest();
+}
+
+function signToken(claims: Omit<Session, 'iat' | 'exp'>, ttlSeconds: number): string {
+  const iat = Math.floor(Date.now() / 1000);
+  const signingInput = `${keys.current.header}.${base64url(JSON.stringify({ ...claims, iat, exp: iat + ttlSeconds }))}`;
+  return `${signingInput}.${base64url(signature(keys.current.key, signingInput))}`;
+}
+
+// Returns the claims of a valid, unexpired token of the given type, or null
+export function verifyToken(token: string, typ: TokenType): Session | null {
+  const parts = token.split('.');
+  if (parts.length !== 3) return null;
+  const key = keys.byHeader.get(parts[0]);
+  if (!key) return null;
+
+  const expected = signature(key, `${parts[0]}.${parts[1]}`);
+  const actual = Buffer.from(parts[2], 'base64url');
+  if (actual.length !== expected.length || !timingSafeEqual(actual, expected)) return null;
+
+  let claims: Session;
+  try {
+    claims = JSON.parse(Buffer.from(parts[1], 'base64url').toString());
+  } catch {
+    return null;
+  }
+  const now = Math.floor(Date.now() / 1000);
+  if (claims.typ !== typ || !SESSION_ROLES.includes(claims.role) || typeof claims.sub !== 'string') return null;
+  if (!(claims.exp + CLOCK_SKEW_S > now) || !(claims.iat - CLOCK_SKEW_S <= now)) return null;
+  return claims;
+}
+
+export function issueSession(account: { id: string; role: SessionRole; name?: string }): IssuedSession {
+  const claims = { sub: account.id, role: account.role, name: account.name || '' };
+  return {
+    accessToken: signToken({ ...claims, typ: 'access' }, ACCESS_TTL_S),
+    refreshToken: signToken({ ...claims, typ: 'refresh' }, REFRESH_TTL_S),
+    expiresIn: ACCESS_TTL_S
+  };
+}
+
+// The verified access token of a request, from the Authorization header or the session cookie
+export function sessionFromRequest(request: NextRequest): Session | null {
+  const authorization = request.headers.get('authorization');
+  const token = authorization?.startsWith('Bearer ')
+    ? authorization.slice(7)
+    : request.cookies.get(ACCESS_COOKIE)?.value;
+  return token ? verifyToken(token, 'access') : null;
+}
+
+export function refreshTokenFromRequest(request: NextRequest): string | null {
+  return request.cookies.get(REFRESH_COOKIE)?.value || null;
+}
+
+export function setSessionCookies(response: NextResponse, issued: IssuedSession, secure: boolean): void {
+  const options = { httpOnly: true, sameSite: 'lax' as const, secure };
+  response.cookies.set(ACCESS_COOKIE, issued.accessToken, { ...options, path: '/api', maxAge: ACCESS_TTL_S });
+  response.cookies.set(REFRESH_COOKIE, issued.refreshToken, { ...options, path: REFRESH_COOKIE_PATH, maxAge: REFRESH_TTL_S });
+}
+
+export function clearSessionCookies(response: NextResponse): void {
+  response.cookies.set(ACCESS_COOKIE, '', { path: '/api', maxAge: 0 });
+  response.cookies.set(REFRESH_COOKIE, '', { path: REFRESH_COOKIE_PATH, maxAge: 0 });
+}
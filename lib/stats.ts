@@ -0,0 +1,108 @@
+import { Db } from 'mongodb';
+import type { DashboardStats } from '@/types';
+
+type StatsDelta = Partial<Record<keyof DashboardStats, number>>;
+
+const COUNTERS_ID = 'dashboard';
+const STATUS_COUNTERS: Record<string, keyof DashboardStats> = {
+  pending: 'pendingRequests',
+  approved: 'approvedRequests',
+  rejected: 'rejectedRequests'
+};
+
+const CACHE_TTL_MS = parseInt(process.env.STATS_CACHE_TTL_MS || '5000', 10);
+let cached: { stats: DashboardStats; expiresAt: number } | null = null;
+
+// Count everything in one round trip: group requests by status and union in the student count
+export async function computeStats(db: Db): Promise<DashboardStats> {
+  const rows = await db.collection('service_requests').aggregate([
+    { $group: { _id: '$status', count: { $sum: 1 } } },
+    {
+      $unionWith: {
+        coll: 'students',
+        pipeline: [{ $count: 'count' }, { $project: { _id: '__students', count: 1 } }]
+      }
+    }
+  ]).toArray();
+
+  const stats: DashboardStats = {
+    totalStudents: 0,
+    totalRequests: 0,
+    pendingRequests: 0,
+    approvedRequests: 0,
+    rejectedRequests: 0
+  };
+  for (const row of rows) {
+    if (row._id === '__students') {
+      stats.totalStudents = row.count;
+      continue;
+    }
+    stats.totalRequests += row.count;
+    const counter = STATUS_COUNTERS[row._id];
+    if (counter) stats[counter] += row.count;
+  }
+  return stats;
+}
+
+// Recount from scratch and overwrite the counters document
+export async function rebuildStats(db: Db): Promise<DashboardStats> {
+  const stats = await computeStats(db);
+  await db.collection('counters').replaceOne(
+    { _id: COUNTERS_ID },
+    { ...stats, updatedAt: new Date() },
+    { upsert: true }
+  );
+  cached = { stats, expiresAt: Date.now() + CACHE_TTL_MS };
+  return stats;
+}
+
+// Serve from the in-process cache, then the counters document, rebuilding only when it is missing
+export async function getStats(db: Db): Promise<DashboardStats> {
+  if (cached && cached.expiresAt > Date.now()) {
+    return cached.stats;
+  }
+
+  const counters = await db.collection('counters').findOne(
+    { _id: COUNTERS_ID },
+    { projection: { _id: 0, updatedAt: 0 } }
+  );
+  if (!counters) {
+    return rebuildStats(db);
+  }
+
+  const stats = counters as unknown as DashboardStats;
+  cached = { stats, expiresAt: Date.now() + CACHE_TTL_MS };
+  return stats;
+}
+
+// Atomically apply a change to the counters; a missing document is left for getStats to rebuild
+export async function adjustStats(db: Db, delta: StatsDelta): Promise<void> {
+  const inc = Object.fromEntries(Object.entries(delta).filter(([, value]) => value));
+  if (Object.keys(inc).length === 0) return;
+
+  cached = null;
+  try {
+    await db.collection('counters').updateOne({ _id: COUNTERS_ID }, { $inc: inc });
+  } catch (error: any) {
+    // The write that triggered this already succeeded; GET /api/stats?refresh=true repairs drift
+    console.error('Failed to update stats counters:', error.message);
+  }
+}
+
+export function statusDelta(from: string | null, to: string | null): StatsDelta {
+  const delta: StatsDelta = {};
+  if (from && STATUS_COUNTERS[from]) delta[STATUS_COUNTERS[from]] = -1;
+  if (to && STATUS_COUNTERS[to]) delta[STATUS_COUNTERS[to]] = (delta[STATUS_COUNTERS[to]] || 0) + 1;
+  return delta;
+}
+
+// Combined counter change for moving several requests to the same status at once
+export function batchStatusDelta(fromStatuses: string[], to: string): StatsDelta {
+  const delta: StatsDelta = {};
+  for (const from of fromStatuses) {
+    for (const [counter, change] of Object.entries(statusDelta(from, to)) as [keyof DashboardStats, number][]) {
+      delta[counter] = (delta[counter] || 0) + change;
+    }
+  }
+  return delta;
+}
@@ -0,0 +1,207 @@
+import { AnyBulkWriteOperation, BulkWriteResult, Db, MongoBulkWriteError } from 'mongodb';
+import { v4 as uuidv4 } from 'uuid';
+import type { ParsedStudent } from '@/lib/excel-parser';
+import { hashPassword } from '@/lib/password';
+
+export const DEFAULT_STUDENT_PASSWORD = 'student@123';
+
+export interface BulkUpsertOptions {
+  chunkSize?: number;
+  concurrency?: number;
+}
+
+export interface RowError {
+  row: number;
+  email: string;
+  message: string;
+}
+
+export interface BulkUpsertResult {
+  inserted: number;
+  updated: number;
+  failed: number;
+  errors: RowError[];
+}
+
+export interface IngestProgress extends BulkUpsertResult {
+  rows: number;
+}
+
+export interface IngestOptions extends BulkUpsertOptions {
+  batchSize?: number;
+  onProgress?: (progress: IngestProgress) => void | Promise<void>;
+}
+
+// Only the first errors are echoed back so a broken 20k-row file can't blow up the response
+const MAX_REPORTED_ERRORS = 100;
+
+function envInt(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
+
+function emptyUpsertResult(): BulkUpsertResult {
+  return { inserted: 0, updated: 0, failed: 0, errors: [] };
+}
+
+function mergeUpsertResults(target: BulkUpsertResult, source: BulkUpsertResult): void {
+  target.inserted += source.inserted;
+  target.updated += source.updated;
+  target.failed += source.failed;
+  for (const error of source.errors) {
+    if (target.errors.length >= MAX_REPORTED_ERRORS) break;
+    target.errors.push(error);
+  }
+}
+
+function recordError(result: BulkUpsertResult, row: number, email: string, message: string): void {
+  result.failed++;
+  if (result.errors.length < MAX_REPORTED_ERRORS) {
+    result.errors.push({ row, email, message });
+  }
+}
+
+// Run tasks with at most `limit` in flight at once
+async function runWithConcurrency<T>(
+  items: T[],
+  limit: number,
+  worker: (item: T) => Promise<void>
+): Promise<void> {
+  let next = 0;
+  const runners = Array.from({ length: Math.min(limit, items.length) }, async () => {
+    while (next < items.length) {
+      await worker(items[next++]);
+    }
+  });
+  await Promise.all(runners);
+}
+
+async function writeChunk(
+  db: Db,
+  students: Record<string, any>[],
+  indexes: number[],
+  result: BulkUpsertResult,
+  rowOffset: number
+): Promise<void> {
+  const operations: AnyBulkWriteOperation[] = indexes.map(i => ({
+    updateOne: {
+      filter: { email: students[i].email },
+      update: { $set: students[i] },
+      upsert: true
+    }
+  }));
+
+  const tally = (bulkResult: BulkWriteResult) => {
+    result.inserted += bulkResult.upsertedCount;
+    result.updated += bulkResult.matchedCount;
+  };
+
+  try {
+    tally(await db.collection('students').bulkWrite(operations, { ordered: false }));
+  } catch (error: any) {
+    if (!(error instanceof MongoBulkWriteError)) {
+      indexes.forEach(i => recordError(result, i + rowOffset, students[i].email, error.message));
+      return;
+    }
+
+    // Unordered writes keep going past failures, so the rest of the chunk still counts
+    tally(error.result);
+    const writeErrors = Array.isArray(error.writeErrors) ? error.writeErrors : [error.writeErrors];
+    for (const writeError of writeErrors) {
+      const i = indexes[writeError.index];
+      recordError(result, i + rowOffset, students[i].email, writeError.errmsg || 'Write failed');
+    }
+  }
+}
+
+let defaultHash: Promise<string> | null = null;
+
+// Every uploaded student starts with the same password, so it is hashed once per process
+// and the hash shared, instead of running scrypt for each of thousands of rows
+export function defaultPasswordHash(): Promise<string> {
+  if (!defaultHash) {
+    defaultHash = hashPassword(DEFAULT_STUDENT_PASSWORD).catch(error => {
+      defaultHash = null;
+      throw error;
+    });
+  }
+  return defaultHash;
+}
+
+export function toStudentDocument(student: ParsedStudent, passwordHash: string): Record<string, any> {
+  return {
+    id: uuidv4(),
+    name: student.name || '',
+    email: student.email || '',
+    rollNo: student.rollNo || '',
+    department: student.department || '',
+    password: passwordHash,
+    createdAt: new Date()
+  };
+}
+
+// Upsert students by email using chunked, unordered bulk writes.
+// Rows are reported 1-based; `rowOffset` keeps numbering continuous across streamed batches.
+export async function bulkUpsertStudents(
+  db: Db,
+  students: Record<string, any>[],
+  options: BulkUpsertOptions = {},
+  rowOffset = 1
+): Promise<BulkUpsertResult> {
+  const chunkSize = options.chunkSize || envInt('STUDENT_UPLOAD_CHUNK_SIZE', 1000);
+  const concurrency = options.concurrency || envInt('STUDENT_UPLOAD_CONCURRENCY', 4);
+  const result = emptyUpsertResult();
+
+  // Later rows win for repeated emails, matching the old one-upsert-per-row behaviour
+  const latestByEmail = new Map<string, number>();
+  students.forEach((student, i) => {
+    if (!student.email) {
+      recordError(result, i + rowOffset, '', 'Missing email');
+      return;
+    }
+    if (latestByEmail.has(student.email)) {
+      result.updated++;
+    }
+    latestByEmail.set(student.email, i);
+  });
+
+  const indexes = Array.from(latestByEmail.values()).sort((a, b) => a - b);
+  const chunks: number[][] = [];
+  for (let i = 0; i < indexes.length; i += chunkSize) {
+    chunks.push(indexes.slice(i, i + chunkSize));
+  }
+
+  await runWithConcurrency(chunks, concurrency, chunk => writeChunk(db, students, chunk, result, rowOffset));
+  return result;
+}
+
+// Pull rows from an async source in batches. The next batch is not read until the
+// previous one is written, so a slow database throttles the upload instead of buffering it.
+export async function ingestStudentStream(
+  db: Db,
+  rows: AsyncIterable<ParsedStudent>,
+  options: IngestOptions = {}
+): Promise<IngestProgress> {
+  const batchSize = options.batchSize || envInt('STUDENT_UPLOAD_BATCH_SIZE', 5000);
+  const progress: IngestProgress = { ...emptyUpsertResult(), rows: 0 };
+  const passwordHash = await defaultPasswordHash();
+  let batch: Record<string, any>[] = [];
+
+  const flush = async () => {
+    if (batch.length === 0) return;
+    const rowOffset = progress.rows + 1;
+    const students = batch;
+    batch = [];
+    mergeUpsertResults(progress, await bulkUpsertStudents(db, students, options, rowOffset));
+    progress.rows += students.length;
+    await options.onProgress?.({ ...progress });
+  };
+
+  for await (const row of rows) {
+    batch.push(toStudentDocument(row, passwordHash));
+    if (batch.length >= batchSize) await flush();
+  }
+  await flush();
+
+  return progress;
+}
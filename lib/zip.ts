@@ -0,0 +1,223 @@
+import { constants, createDeflateRaw } from 'zlib';
+
+// Minimal ZIP writers. createZip stores entries uncompressed: PDFs are already deflated
+// internally, so compressing them again costs CPU for almost no size benefit. streamZip
+// deflates entries whose content is produced incrementally (e.g. spreadsheet exports).
+
+export interface ZipEntry {
+  name: string;
+  data: Uint8Array;
+  modified: Date;
+}
+
+const CRC_TABLE = (() => {
+  const table = new Uint32Array(256);
+  for (let n = 0; n < 256; n++) {
+    let c = n;
+    for (let k = 0; k < 8; k++) c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1;
+    table[n] = c >>> 0;
+  }
+  return table;
+})();
+
+// Pass the previous result as `crc` to continue a checksum across chunks
+export function crc32(data: Uint8Array, crc = 0): number {
+  crc ^= 0xffffffff;
+  for (let i = 0; i < data.length; i++) crc = CRC_TABLE[(crc ^ data[i]) & 0xff] ^ (crc >>> 8);
+  return (crc ^ 0xffffffff) >>> 0;
+}
+
+function dosDateTime(date: Date): { time: number; date: number } {
+  return {
+    time: (date.getUTCHours() << 11) | (date.getUTCMinutes() << 5) | (date.getUTCSeconds() >> 1),
+    date: ((Math.max(date.getUTCFullYear(), 1980) - 1980) << 9) | ((date.getUTCMonth() + 1) << 5) | date.getUTCDate()
+  };
+}
+
+export function createZip(entries: ZipEntry[]): Uint8Array {
+  const encoder = new TextEncoder();
+  const locals: Uint8Array[] = [];
+  const centrals: Uint8Array[] = [];
+  let offset = 0;
+
+  for (const entry of entries) {
+    const name = encoder.encode(entry.name);
+    const crc = crc32(entry.data);
+    const { time, date } = dosDateTime(entry.modified);
+
+    const local = new Uint8Array(30 + name.length);
+    const lv = new DataView(local.buffer);
+    lv.setUint32(0, 0x04034b50, true);
+    lv.setUint16(4, 20, true);
+    lv.setUint16(6, 0x0800, true); // UTF-8 names
+    lv.setUint16(8, 0, true); // stored
+    lv.setUint16(10, time, true);
+    lv.setUint16(12, date, true);
+    lv.setUint32(14, crc, true);
+    lv.setUint32(18, entry.data.length, true);
+    lv.setUint32(22, entry.data.length, true);
+    lv.setUint16(26, name.length, true);
+    local.set(name, 30);
+
+    const central = new Uint8Array(46 + name.length);
+    const cv = new DataView(central.buffer);
+    cv.setUint32(0, 0x02014b50, true);
+    cv.setUint16(4, 20, true);
+    cv.setUint16(6, 20, true);
+    cv.setUint16(8, 0x0800, true);
+    cv.setUint16(10, 0, true);
+    cv.setUint16(12, time, true);
+    cv.setUint16(14, date, true);
+    cv.setUint32(16, crc, true);
+    cv.setUint32(20, entry.data.length, true);
+    cv.setUint32(24, entry.data.length, true);
+    cv.setUint16(28, name.length, true);
+    cv.setUint32(42, offset, true);
+    central.set(name, 46);
+
+    locals.push(local, entry.data);
+    centrals.push(central);
+    offset += local.length + entry.data.length;
+  }
+
+  const centralSize = centrals.reduce((sum, part) => sum + part.length, 0);
+  const end = new Uint8Array(22);
+  const ev = new DataView(end.buffer);
+  ev.setUint32(0, 0x06054b50, true);
+  ev.setUint16(8, entries.length, true);
+  ev.setUint16(10, entries.length, true);
+  ev.setUint32(12, centralSize, true);
+  ev.setUint32(16, offset, true);
+
+  const zip = new Uint8Array(offset + centralSize + end.length);
+  let position = 0;
+  for (const part of [...locals, ...centrals, end]) {
+    zip.set(part, position);
+    position += part.length;
+  }
+  return zip;
+}
+
+export interface StreamedZipEntry {
+  name: string;
+  modified: Date;
+  content: Iterable<Uint8Array> | AsyncIterable<Uint8Array>;
+}
+
+const DATA_DESCRIPTOR = 0x0008;
+const UTF8_NAMES = 0x0800;
+const DEFLATED = 8;
+const MAX_ZIP32 = 0xffffffff;
+
+// Deflate chunk by chunk; each push returns the compressed bytes produced so far
+function deflater() {
+  const stream = createDeflateRaw();
+  const output: Buffer[] = [];
+  let failure: Error | null = null;
+  stream.on('data', (chunk: Buffer) => output.push(chunk));
+  stream.on('error', (error: Error) => { failure = error; });
+
+  const take = () => {
+    if (failure) throw failure;
+    const bytes = Buffer.concat(output);
+    output.length = 0;
+    return bytes;
+  };
+  return {
+    push: (data: Uint8Array) => new Promise<Buffer>((resolve, reject) => {
+      stream.write(data);
+      stream.flush(constants.Z_SYNC_FLUSH, () => {
+        try { resolve(take()); } catch (error) { reject(error); }
+      });
+    }),
+    end: () => new Promise<Buffer>((resolve, reject) => {
+      stream.once('end', () => {
+        try { resolve(take()); } catch (error) { reject(error); }
+      });
+      stream.once('error', reject);
+      stream.end();
+    })
+  };
+}
+
+// Write a ZIP without knowing entry sizes up front: CRC and sizes follow each entry in a data
+// descriptor, so only the current chunk is held in memory. Limited to ZIP32 sizes (4 GiB).
+export async function* streamZip(entries: StreamedZipEntry[]): AsyncGenerator<Uint8Array> {
+  const encoder = new TextEncoder();
+  const centrals: Uint8Array[] = [];
+  let offset = 0;
+
+  for (const entry of entries) {
+    const name = encoder.encode(entry.name);
+    const { time, date } = dosDateTime(entry.modified);
+
+    const local = new Uint8Array(30 + name.length);
+    const lv = new DataView(local.buffer);
+    lv.setUint32(0, 0x04034b50, true);
+    lv.setUint16(4, 20, true);
+    lv.setUint16(6, UTF8_NAMES | DATA_DESCRIPTOR, true);
+    lv.setUint16(8, DEFLATED, true);
+    lv.setUint16(10, time, true);
+    lv.setUint16(12, date, true);
+    lv.setUint16(26, name.length, true);
+    local.set(name, 30);
+    yield local;
+
+    const deflate = deflater();
+    let crc = 0;
+    let size = 0;
+    let compressedSize = 0;
+    for await (const chunk of entry.content) {
+      crc = crc32(chunk, crc);
+      size += chunk.length;
+      const compressed = await deflate.push(chunk);
+      compressedSize += compressed.length;
+      if (compressed.length > 0) yield compressed;
+    }
+    const tail = await deflate.end();
+    compressedSize += tail.length;
+    if (tail.length > 0) yield tail;
+    if (size > MAX_ZIP32 || offset + local.length + compressedSize > MAX_ZIP32) {
+      throw new Error('ZIP entry too large');
+    }
+
+    const descriptor = new Uint8Array(16);
+    const dv = new DataView(descriptor.buffer);
+    dv.setUint32(0, 0x08074b50, true);
+    dv.setUint32(4, crc, true);
+    dv.setUint32(8, compressedSize, true);
+    dv.setUint32(12, size, true);
+    yield descriptor;
+
+    const central = new Uint8Array(46 + name.length);
+    const cv = new DataView(central.buffer);
+    cv.setUint32(0, 0x02014b50, true);
+    cv.setUint16(4, 20, true);
+    cv.setUint16(6, 20, true);
+    cv.setUint16(8, UTF8_NAMES | DATA_DESCRIPTOR, true);
+    cv.setUint16(10, DEFLATED, true);
+    cv.setUint16(12, time, true);
+    cv.setUint16(14, date, true);
+    cv.setUint32(16, crc, true);
+    cv.setUint32(20, compressedSize, true);
+    cv.setUint32(24, size, true);
+    cv.setUint16(28, name.length, true);
+    cv.setUint32(42, offset, true);
+    central.set(name, 46);
+    centrals.push(central);
+
+    offset += local.length + compressedSize + descriptor.length;
+  }
+
+  const centralSize = centrals.reduce((sum, part) => sum + part.length, 0);
+  for (const central of centrals) yield central;
+
+  const end = new Uint8Array(22);
+  const ev = new DataView(end.buffer);
+  ev.setUint32(0, 0x06054b50, true);
+  ev.setUint16(8, entries.length, true);
+  ev.setUint16(10, entries.length, true);
+  ev.setUint32(12, centralSize, true);
+  ev.setUint32(16, offset, true);
+  yield end;
+}
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Institute Service Portal Backend API - Load Testing
+Replays realistic mixes of the APITester flows from many concurrent virtual users
+and reports throughput and latency percentiles per endpoint
+"""
+
+import argparse
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from backend_test import BASE_URL
+
+# Relative weight of each flow in the traffic mix
+DEFAULT_MIX = {
+    "notifications_poll": 40,
+    "student_session": 25,
+    "create_request": 15,
+    "admin_dashboard": 10,
+    "approve_request": 8,
+    "upload_roster": 2,
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class LoadStats:
+    """Thread-safe latency and status recorder keyed by endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint, elapsed_ms, status):
+        with self.lock:
+            self.latencies[endpoint].append(elapsed_ms)
+            self.statuses[endpoint][status] += 1
+            if status == 0 or status >= 400:
+                self.errors[endpoint] += 1
+
+    def summary(self, duration):
+        rows = []
+        with self.lock:
+            for endpoint, values in sorted(self.latencies.items()):
+                ordered = sorted(values)
+                rows.append({
+                    'endpoint': endpoint,
+                    'count': len(ordered),
+                    'errors': self.errors[endpoint],
+                    'rps': len(ordered) / duration if duration else 0.0,
+                    'p50': percentile(ordered, 50),
+                    'p95': percentile(ordered, 95),
+                    'p99': percentile(ordered, 99),
+                    'max': ordered[-1] if ordered else 0.0,
+                    'statuses': dict(self.statuses[endpoint]),
+                })
+        return rows
+
+
+class LoadTester:
+    def __init__(self, base_url=BASE_URL, users=20, rate=10.0, duration=60, students=200, mix=None, seed=None):
+        self.base_url = base_url.rstrip('/')
+        self.users = users
+        self.rate = rate
+        self.duration = duration
+        self.student_count = students
+        self.mix = mix or DEFAULT_MIX
+        self.random = random.Random(seed)
+        self.run_id = uuid.uuid4().hex[:8]
+        self.stats = LoadStats()
+        self.local = threading.local()
+        self.students = []
+        self.pending_requests = []
+        self.pending_lock = threading.Lock()
+        self.scheduled = 0
+        self.queued_at_deadline = 0
+
+    # ---------- HTTP helpers ----------
+
+    def session(self):
+        """One keep-alive session per worker thread, like one browser per virtual user"""
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def call(self, method, endpoint, path, **kwargs):
+        """Issue a request and record its latency under the endpoint label.
+        A flow's first request is timed from the flow's scheduled arrival, so time spent
+        waiting for a free worker counts against the server instead of disappearing."""
+        started = getattr(self.local, 'arrival', None) or time.perf_counter()
+        self.local.arrival = None
+        status = 0
+        try:
+            response = self.session().request(method, f"{self.base_url}{path}", timeout=30, **kwargs)
+            status = response.status_code
+            return response
+        except requests.RequestException:
+            return None
+        finally:
+            self.stats.record(endpoint, (time.perf_counter() - started) * 1000, status)
+
+    # ---------- Setup ----------
+
+    def seed_students(self):
+        """Upload a roster of namespaced students for the flows to log in as"""
+        lines = ["Name,Email,Roll No,Department"]
+        for i in range(self.student_count):
+            lines.append(f"Load Student {i},load-{self.run_id}-{i}@loadtest.local,LT{i:05d},Load Testing")
+        response = requests.post(f"{self.base_url}/students/upload", json={"csvData": "\n".join(lines)}, timeout=120)
+        response.raise_for_status()
+
+        emails = {f"load-{self.run_id}-{i}@loadtest.local" for i in range(self.student_count)}
+        after = None
+        while len(self.students) < self.student_count:
+            params = {"department": "Load Testing", "limit": 1000}
+            if after:
+                params["after"] = after
+            page = requests.get(f"{self.base_url}/students", params=params, timeout=60)
+            page.raise_for_status()
+            self.students.extend(s for s in page.json() if s.get('email') in emails)
+            after = page.headers.get('X-Next-Cursor')
+            if not after:
+                break
+
+        if not self.students:
+            raise RuntimeError("Seeded students could not be read back")
+
+    # ---------- Flows ----------
+
+    def flow_notifications_poll(self, rng):
+        student = rng.choice(self.students)
+        self.call("GET", "GET /notifications/feed", f"/notifications/feed?userId={student['id']}")
+
+    def flow_student_session(self, rng):
+        student = rng.choice(self.students)
+        self.call("POST", "POST /auth/login", "/auth/login",
+                  json={"userId": student['email'], "password": "student@123", "role": "student"})
+        self.call("GET", "GET /requests?studentId", f"/requests?studentId={student['id']}")
+        self.call("GET", "GET /fee-structures", "/fee-structures")
+        self.call("GET", "GET /notifications/feed", f"/notifications/feed?userId={student['id']}")
+
+    def flow_create_request(self, rng):
+        student = rng.choice(self.students)
+        response = self.call("POST", "POST /requests", "/requests", json={
+            "studentId": student['id'],
+            "studentName": student['name'],
+            "studentEmail": student['email'],
+            "rollNo": student['rollNo'],
+            "department": student['department'],
+            "serviceType": rng.choice(["bonafide", "fee", "tc", "noc"]),
+            "details": {"purpose": "Load test"},
+        })
+        if response is not None and response.status_code == 200:
+            with self.pending_lock:
+                self.pending_requests.append(response.json()['id'])
+
+    def flow_admin_dashboard(self, rng):
+        self.call("POST", "POST /auth/login", "/auth/login",
+                  json={"userId": "loadtest-admin@institute.edu", "password": "admin123", "role": "academic"})
+        self.call("GET", "GET /stats", "/stats")
+        self.call("GET", "GET /students", "/students")
+        self.call("GET", "GET /requests", "/requests")
+
+    def flow_approve_request(self, rng):
+        with self.pending_lock:
+            request_id = self.pending_requests.pop() if self.pending_requests else None
+        if not request_id:
+            return self.flow_create_request(rng)
+        status = rng.choice(["approved", "approved", "rejected"])
+        self.call("PUT", "PUT /requests/:id", f"/requests/{request_id}",
+                  json={"status": status, "remarks": "Load test decision"})
+
+    def flow_upload_roster(self, rng):
+        batch = uuid.uuid4().hex[:6]
+        lines = ["Name,Email,Roll No,Department"]
+        lines += [f"Upload {i},upload-{self.run_id}-{batch}-{i}@loadtest.local,UP{i:04d},Load Testing" for i in range(50)]
+        self.call("POST", "POST /students/upload", "/students/upload", json={"csvData": "\n".join(lines)})
+
+    # ---------- Driver ----------
+
+    def schedule(self):
+        """(arrival offset, flow name, flow seed) for every flow of the run, drawn up front on one
+        thread so the same --seed always gives the same arrivals, mix and per-flow choices"""
+        names = list(self.mix)
+        weights = [self.mix[n] for n in names]
+        arrivals = []
+        offset = 0.0
+        while True:
+            offset += self.random.expovariate(self.rate)
+            if offset >= self.duration:
+                return arrivals
+            arrivals.append((offset, self.random.choices(names, weights=weights)[0], self.random.getrandbits(64)))
+
+    def run_flow(self, name, seed, arrival):
+        self.local.arrival = arrival
+        try:
+            getattr(self, f"flow_{name}")(random.Random(seed))
+        finally:
+            self.local.arrival = None
+
+    def run(self):
+        print("=" * 60)
+        print("INSTITUTE SERVICE PORTAL - LOAD TEST")
+        print("=" * 60)
+        print(f"Base URL: {self.base_url}")
+        print(f"Virtual users: {self.users}, arrival rate: {self.rate}/s, duration: {self.duration}s")
+        print(f"Run id: {self.run_id}, started at: {datetime.now().isoformat()}")
+        print("=" * 60)
+
+        self.seed_students()
+        print(f"Seeded {len(self.students)} students")
+
+        # Open-loop arrivals: flows start on a Poisson schedule whether or not earlier ones finished,
+        # and latency is measured from the scheduled arrival, so a slow server shows up as growing
+        # latency (and a backlog at the deadline) instead of silently lowering the offered load
+        arrivals = self.schedule()
+        self.scheduled = len(arrivals)
+        started = time.perf_counter()
+        futures = []
+        with ThreadPoolExecutor(max_workers=self.users) as pool:
+            for offset, name, seed in arrivals:
+                arrival = started + offset
+                time.sleep(max(0.0, arrival - time.perf_counter()))
+                futures.append(pool.submit(self.run_flow, name, seed, arrival))
+            time.sleep(max(0.0, started + self.duration - time.perf_counter()))
+            # Flows still waiting for a worker; they run to completion and their wait is recorded
+            self.queued_at_deadline = sum(1 for future in futures if not future.running() and not future.done())
+        elapsed = time.perf_counter() - started
+
+        rows = self.stats.summary(elapsed)
+        self.print_report(rows, elapsed)
+        return rows
+
+    def print_report(self, rows, elapsed):
+        print("=" * 60)
+        print("LOAD TEST SUMMARY")
+        print("=" * 60)
+        print(f"{'Endpoint':<28}{'Count':>7}{'Err':>6}{'RPS':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'Max':>9}")
+        for row in rows:
+            print(f"{row['endpoint']:<28}{row['count']:>7}{row['errors']:>6}{row['rps']:>8.1f}"
+                  f"{row['p50']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}{row['max']:>9.1f}")
+        total = sum(row['count'] for row in rows)
+        errors = sum(row['errors'] for row in rows)
+        print("-" * 60)
+        print(f"Total requests: {total} in {elapsed:.1f}s ({total / elapsed:.1f} req/s), errors: {errors}")
+        print(f"Flows scheduled: {self.scheduled}, still queued at the deadline: {self.queued_at_deadline}")
+        print("Latencies in milliseconds")
+        print("=" * 60)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Institute Service Portal API")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--local", action="store_true", help="run against an in-process fake_api server")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users (worker threads)")
+    parser.add_argument("--rate", type=float, default=10.0, help="flow arrivals per second")
+    parser.add_argument("--duration", type=int, default=60, help="seconds to generate load for")
+    parser.add_argument("--students", type=int, default=200, help="students to seed before the run")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for a repeatable arrival schedule and mix")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.local:
+        from fake_api import start_server
+        _, args.base_url = start_server()
+    tester = LoadTester(
+        base_url=args.base_url,
+        users=args.users,
+        rate=args.rate,
+        duration=args.duration,
+        students=args.students,
+        seed=args.seed,
+    )
+    rows = tester.run()
+    return 1 if any(row['errors'] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Institute Service Portal Backend API - Login Throughput Benchmark
+Measures what a scrypt cost means for login capacity: the hash rate of one core at
+each cost (the same scrypt parameters lib/password.ts uses), and the login rate a
+running server sustains for first logins, uncached password checks and cached ones
+"""
+
+import argparse
+import hashlib
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from backend_test import BASE_URL
+from load_test import percentile
+
+# Must match lib/password.ts
+SCRYPT_R = 8
+SCRYPT_P = 1
+KEY_BYTES = 32
+DEFAULT_COST = int(os.environ.get("PASSWORD_SCRYPT_N", "16384"))
+SWEEP_COSTS = [2 ** exponent for exponent in range(13, 18)]
+
+
+def scrypt(password, salt, n):
+    return hashlib.scrypt(password, salt=salt, n=n, r=SCRYPT_R, p=SCRYPT_P, maxmem=256 * n * SCRYPT_R, dklen=KEY_BYTES)
+
+
+def hash_rate(n, seconds=2.0):
+    """(ms per hash, hashes per second) for one thread, i.e. one core"""
+    salt = os.urandom(16)
+    scrypt(b"warm-up", salt, n)
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        scrypt(f"password-{count}".encode(), salt, n)
+        count += 1
+    elapsed = time.perf_counter() - started
+    return elapsed * 1000 / count, count / elapsed
+
+
+class LoginBenchmark:
+    def __init__(self, base_url=BASE_URL, accounts=200, users=16, duration=10, server_cores=None):
+        self.base_url = base_url.rstrip("/")
+        self.accounts = [
+            (f"bench-{uuid.uuid4().hex[:8]}-{i}", f"pw-{uuid.uuid4().hex}") for i in range(accounts)
+        ]
+        self.users = users
+        self.duration = duration
+        self.server_cores = server_cores or os.cpu_count() or 1
+        self.local = threading.local()
+
+    def session(self):
+        if not hasattr(self.local, "session"):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def login(self, account):
+        user_id, password = account
+        started = time.perf_counter()
+        response = self.session().post(f"{self.base_url}/auth/login", json={
+            "userId": user_id, "password": password, "role": "faculty", "name": "Benchmark Faculty"
+        }, timeout=60)
+        return (time.perf_counter() - started) * 1000, response.status_code == 200
+
+    def phase(self, name, accounts):
+        """Log in once per listed account, `users` at a time"""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.users) as pool:
+            results = list(pool.map(self.login, accounts))
+        return self.summarize(name, results, time.perf_counter() - started)
+
+    def timed_phase(self, name):
+        """Log in round-robin over every account until `duration` runs out"""
+        deadline = time.perf_counter() + self.duration
+        results = []
+        lock = threading.Lock()
+
+        def worker(offset):
+            i = offset
+            while time.perf_counter() < deadline:
+                outcome = self.login(self.accounts[i % len(self.accounts)])
+                with lock:
+                    results.append(outcome)
+                i += self.users
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.users) as pool:
+            list(pool.map(worker, range(self.users)))
+        return self.summarize(name, results, time.perf_counter() - started)
+
+    def summarize(self, name, results, elapsed):
+        latencies = sorted(ms for ms, _ in results)
+        rate = len(results) / elapsed if elapsed else 0.0
+        return {
+            "phase": name,
+            "count": len(results),
+            "errors": sum(1 for _, ok in results if not ok),
+            "rate": rate,
+            "per_core": rate / self.server_cores,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+        }
+
+    def run(self):
+        # First logins create the accounts (one hash each), the next pass verifies each once
+        # before any cache entry exists, and the timed pass repeats logins the cache has seen
+        return [
+            self.phase("first login (hash)", self.accounts),
+            self.phase("verify (uncached)", self.accounts),
+            self.timed_phase("verify (cached)"),
+        ]
+
+
+def print_cost_table(costs, seconds):
+    print("=" * 60)
+    print("SCRYPT COST (one core, r=8 p=1)")
+    print("=" * 60)
+    print(f"{'N':>8}{'ms/hash':>12}{'logins/s/core':>16}")
+    for n in costs:
+        ms, rate = hash_rate(n, seconds)
+        marker = "  <- PASSWORD_SCRYPT_N" if n == DEFAULT_COST else ""
+        print(f"{n:>8}{ms:>12.1f}{rate:>16.1f}{marker}")
+    print("=" * 60)
+
+
+def print_login_report(rows, cores):
+    print("=" * 60)
+    print(f"LOGIN THROUGHPUT (server cores: {cores})")
+    print("=" * 60)
+    print(f"{'Phase':<22}{'Count':>7}{'Err':>5}{'Login/s':>9}{'Per core':>10}{'p50':>8}{'p95':>8}")
+    for row in rows:
+        print(f"{row['phase']:<22}{row['count']:>7}{row['errors']:>5}{row['rate']:>9.1f}"
+              f"{row['per_core']:>10.1f}{row['p50']:>8.1f}{row['p95']:>8.1f}")
+    print("Latencies in milliseconds")
+    print("=" * 60)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark password hashing cost and login throughput")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--local", action="store_true", help="run against an in-process fake_api server (no hashing)")
+    parser.add_argument("--hash-only", action="store_true", help="only measure the scrypt cost on this machine")
+    parser.add_argument("--sweep", action="store_true", help="measure every cost from N=8192 to N=131072")
+    parser.add_argument("--seconds", type=float, default=2.0, help="time spent measuring each cost")
+    parser.add_argument("--accounts", type=int, default=200, help="faculty accounts to create and log in as")
+    parser.add_argument("--users", type=int, default=16, help="concurrent logins")
+    parser.add_argument("--duration", type=int, default=10, help="seconds of repeated (cached) logins")
+    parser.add_argument("--server-cores", type=int, default=None, help="CPU cores of the server, for per-core rates")
+    args = parser.parse_args(argv)
+
+    print_cost_table(SWEEP_COSTS if args.sweep else [DEFAULT_COST], args.seconds)
+    if args.hash_only:
+        return 0
+
+    if args.local:
+        from fake_api import start_server
+        _, args.base_url = start_server()
+    benchmark = LoginBenchmark(args.base_url, args.accounts, args.users, args.duration, args.server_cores)
+    rows = benchmark.run()
+    print_login_report(rows, benchmark.server_cores)
+    return 1 if any(row["errors"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
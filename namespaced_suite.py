@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Institute Service Portal Backend API - Shared Suite Setup
+Namespacing and teardown shared by the functional suites, so run_tests.py can run
+any number of them in parallel against one server
+"""
+
+import uuid
+
+
+class NamespacedSuite:
+    """Base class for a suite run. Every run gets its own emails (via `namespace`) and a
+    `Test Run <namespace>` department so parallel runs never share rows.
+
+    Teardown deletes the run's students. The service requests and notifications the run
+    created stay behind because the API has no endpoint that deletes them; they are
+    isolated by the namespaced student ids and don't affect other runs."""
+
+    def __init__(self, namespace=None):
+        self.namespace = namespace or uuid.uuid4().hex[:8]
+        self.department = f"Test Run {self.namespace}"
+
+    def cleanup(self):
+        """Delete every student in this run's department, following X-Next-Cursor"""
+        try:
+            student_ids = []
+            params = {"department": self.department, "limit": 1000}
+            while True:
+                response = self.session.get(f"{self.base_url}/students", params=params)
+                response.raise_for_status()
+                student_ids.extend(student["id"] for student in response.json())
+                cursor = response.headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+                params["after"] = cursor
+            # Collect first, then delete, so deleting never shifts the pages being read
+            for student_id in student_ids:
+                self.session.delete(f"{self.base_url}/students/{student_id}")
+        except Exception as e:
+            print(f"⚠️  Cleanup failed: {str(e)}")
+
+    def run_tests(self, tests, rule="-" * 60):
+        """Run (name, test function) pairs in order and return (passed, failed); the run's
+        students are deleted afterwards even if a test raises"""
+        passed = 0
+        failed = 0
+        try:
+            for test_name, test_func in tests:
+                try:
+                    if test_func():
+                        passed += 1
+                    else:
+                        failed += 1
+                except Exception as e:
+                    print(f"❌ FAIL {test_name}: Unexpected error - {str(e)}")
+                    failed += 1
+                print(rule)
+        finally:
+            self.cleanup()
+        return passed, failed
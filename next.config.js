@@ -5,7 +5,9 @@ const nextConfig = {
   },
   experimental: {
     // Remove if not using Server Components
-    serverComponentsExternalPackages: ['mongodb'],
+    serverComponentsExternalPackages: ['mongodb', 'jspdf'],
+    // Runs instrumentation.ts on boot to warm up the MongoDB pool
+    instrumentationHook: true,
   },
   webpack(config, { dev }) {
     if (dev) {
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Institute Service Portal Backend API - Parallel Test Runner
+Runs the backend, edge case, student profile and TypeScript feature suites in
+parallel worker processes, each with its own namespaced data and teardown
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from backend_test import BASE_URL, APITester
+from edge_case_test import EdgeCaseTester
+from student_profile_test import StudentProfileTester
+from typescript_features_test import TypeScriptFeaturesTester
+
+# (label, tester class, name of its run method)
+SUITES = [
+    ("backend", APITester, "run_all_tests"),
+    ("edge_cases", EdgeCaseTester, "run_edge_case_tests"),
+    ("student_profile", StudentProfileTester, "run_student_profile_tests"),
+    ("typescript_features", TypeScriptFeaturesTester, "run_typescript_feature_tests"),
+]
+
+
+def run_suite(label, namespace, base_url):
+    """Run one suite in this worker and return its counts and captured output"""
+    _, tester_class, run_method = next(suite for suite in SUITES if suite[0] == label)
+    tester = tester_class(namespace=namespace)
+    tester.base_url = base_url
+
+    output = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        passed, failed = getattr(tester, run_method)()[:2]
+    return {
+        "suite": label,
+        "namespace": namespace,
+        "passed": passed,
+        "failed": failed,
+        "seconds": time.perf_counter() - started,
+        "output": output.getvalue(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API test suites in parallel")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--local", action="store_true", help="run against an in-process fake_api server")
+    parser.add_argument("--workers", type=int, default=4, help="worker processes")
+    parser.add_argument("--copies", type=int, default=1,
+                        help="independent copies of each suite; more than 1 turns the run into a concurrency stress test")
+    parser.add_argument("--suite", action="append", choices=[suite[0] for suite in SUITES],
+                        help="only run these suites (repeatable)")
+    parser.add_argument("--verbose", action="store_true", help="print every suite's output, not just failing ones")
+    args = parser.parse_args(argv)
+
+    if args.local:
+        from fake_api import start_server
+        _, args.base_url = start_server()
+
+    labels = args.suite or [suite[0] for suite in SUITES]
+    jobs = [(label, uuid.uuid4().hex[:8]) for _ in range(args.copies) for label in labels]
+
+    print("=" * 60)
+    print("INSTITUTE SERVICE PORTAL - PARALLEL TEST RUN")
+    print("=" * 60)
+    print(f"Base URL: {args.base_url}")
+    print(f"Suites: {len(jobs)} ({args.copies} x {', '.join(labels)}), workers: {args.workers}")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_suite, label, namespace, args.base_url) for label, namespace in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = "✅ PASS" if result["failed"] == 0 else "❌ FAIL"
+            print(f"{status} {result['suite']} [{result['namespace']}]: "
+                  f"{result['passed']} passed, {result['failed']} failed in {result['seconds']:.1f}s")
+            if args.verbose or result["failed"]:
+                print(result["output"])
+    elapsed = time.perf_counter() - started
+
+    passed = sum(result["passed"] for result in results)
+    failed = sum(result["failed"] for result in results)
+    print("=" * 60)
+    print("PARALLEL TEST SUMMARY")
+    print("=" * 60)
+    print(f"Total Tests: {passed + failed}")
+    print(f"Passed: {passed}")
+    print(f"Failed: {failed}")
+    print(f"Wall clock: {elapsed:.1f}s (suite time {sum(r['seconds'] for r in results):.1f}s)")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
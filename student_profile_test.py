@@ -7,13 +7,17 @@ Focused testing for GET /api/students/:id and PUT /api/students/:id endpoints
 import requests
 import json
 import sys
+import os
 from datetime import datetime
 
+from namespaced_suite import NamespacedSuite
+
 # Get base URL from environment
-BASE_URL = "https://agent-alarm-3.preview.emergentagent.com/api"
+BASE_URL = os.environ.get("API_BASE_URL", "https://agent-alarm-3.preview.emergentagent.com/api")
 
-class StudentProfileTester:
-    def __init__(self):
+class StudentProfileTester(NamespacedSuite):
+    def __init__(self, namespace=None):
+        super().__init__(namespace)
         self.base_url = BASE_URL
         self.session = requests.Session()
         self.test_results = []
@@ -36,7 +40,8 @@ class StudentProfileTester:
         """Upload a test student and get the student ID for testing"""
         try:
             # Step 1: Upload a student via CSV
-            csv_data = "Name,Email,Roll No,Department\nTest User,test@example.com,TEST001,Computer Science"
+            self.email = f"test+{self.namespace}@example.com"
+            csv_data = f"Name,Email,Roll No,Department\nTest User,{self.email},TEST001,{self.department}"
             
             payload = {"csvData": csv_data}
             response = self.session.post(f"{self.base_url}/students/upload", json=payload)
@@ -46,7 +51,7 @@ class StudentProfileTester:
                 return False
             
             # Step 2: Get all students to find the uploaded student
-            response = self.session.get(f"{self.base_url}/students")
+            response = self.session.get(f"{self.base_url}/students", params={"department": self.department})
             
             if response.status_code != 200:
                 self.log_test("Setup - Get Students", False, f"Get students failed: {response.status_code}")
@@ -56,7 +61,7 @@ class StudentProfileTester:
             test_student = None
             
             for student in students:
-                if student.get('email') == 'test@example.com':
+                if student.get('email') == self.email:
                     test_student = student
                     break
             
@@ -84,7 +89,7 @@ class StudentProfileTester:
             if response.status_code == 200:
                 data = response.json()
                 if ('id' in data and data['id'] == self.student_id and 
-                    'email' in data and data['email'] == 'test@example.com'):
+                    'email' in data and data['email'] == self.email):
                     self.log_test("GET Single Student", True, f"Successfully retrieved student: {data.get('name')}")
                     return True
                 else:
@@ -234,6 +239,7 @@ class StudentProfileTester:
         # Setup test data first
         if not self.setup_test_data():
             print("❌ Setup failed - cannot proceed with tests")
+            self.cleanup()
             return 0, 1, self.test_results
         
         print("-" * 70)
@@ -247,19 +253,7 @@ class StudentProfileTester:
             ("PUT Invalid UUID (404)", self.test_put_invalid_uuid)
         ]
         
-        passed = 0
-        failed = 0
-        
-        for test_name, test_func in tests:
-            try:
-                if test_func():
-                    passed += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                print(f"❌ FAIL {test_name}: Unexpected error - {str(e)}")
-                failed += 1
-            print("-" * 70)
+        passed, failed = self.run_tests(tests, "-" * 70)
         
         # Summary
         print("=" * 70)
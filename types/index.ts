@@ -97,6 +97,21 @@ export interface ApiResponse<T> {
   message?: string;
 }
 
+// Outcome of PUT /api/requests/batch for one id
+export interface BatchRequestOutcome {
+  id: string;
+  ok: boolean;
+  previousStatus?: RequestStatus;
+  error?: string;
+}
+
+export interface BatchUpdateResult {
+  status: RequestStatus;
+  updated: number;
+  failed: number;
+  results: BatchRequestOutcome[];
+}
+
 // Form Types
 export interface LoginForm {
   userId: string;
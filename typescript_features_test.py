@@ -12,13 +12,17 @@ import requests
 import json
 import sys
 import os
+import time
 from datetime import datetime
 
+from namespaced_suite import NamespacedSuite
+
 # Get base URL from environment
-BASE_URL = "https://agent-alarm-3.preview.emergentagent.com/api"
+BASE_URL = os.environ.get("API_BASE_URL", "https://agent-alarm-3.preview.emergentagent.com/api")
 
-class TypeScriptFeaturesTester:
-    def __init__(self):
+class TypeScriptFeaturesTester(NamespacedSuite):
+    def __init__(self, namespace=None):
+        super().__init__(namespace)
         self.base_url = BASE_URL
         self.session = requests.Session()
         self.test_results = []
@@ -47,15 +51,15 @@ class TypeScriptFeaturesTester:
                 "students": [
                     {
                         "name": "Excel Test Student",
-                        "email": "excel.test@test.com",
+                        "email": f"excel.test+{self.namespace}@test.com",
                         "rollNo": "EXL001",
-                        "department": "Computer Science"
+                        "department": self.department
                     },
                     {
                         "name": "Another Test Student",
-                        "email": "another.test@test.com", 
+                        "email": f"another.test+{self.namespace}@test.com",
                         "rollNo": "EXL002",
-                        "department": "Electronics"
+                        "department": self.department
                     }
                 ]
             }
@@ -80,7 +84,7 @@ class TypeScriptFeaturesTester:
     def test_get_students_and_verify_persistence(self):
         """Test: Get Students and verify persistence"""
         try:
-            response = self.session.get(f"{self.base_url}/students")
+            response = self.session.get(f"{self.base_url}/students", params={"department": self.department})
             
             if response.status_code == 200:
                 data = response.json()
@@ -88,7 +92,7 @@ class TypeScriptFeaturesTester:
                     # Find our test student
                     test_student = None
                     for student in data:
-                        if student.get('email') == 'excel.test@test.com':
+                        if student.get('email') == f"excel.test+{self.namespace}@test.com":
                             test_student = student
                             break
                     
@@ -183,7 +187,14 @@ class TypeScriptFeaturesTester:
             return False
             
         try:
-            response = self.session.get(f"{self.base_url}/notifications?userId={self.student_data['id']}")
+            # Notifications are written by a background queue, so allow a moment for delivery
+            for _ in range(20):
+                response = self.session.get(f"{self.base_url}/notifications?userId={self.student_data['id']}")
+                if response.status_code != 200 or any(
+                    notif.get('relatedRequestId') == self.request_id for notif in response.json()
+                ):
+                    break
+                time.sleep(0.1)
             
             if response.status_code == 200:
                 data = response.json()
@@ -358,19 +369,7 @@ class TypeScriptFeaturesTester:
             ("Basic APIs Test", self.test_basic_apis)
         ]
         
-        passed = 0
-        failed = 0
-        
-        for test_name, test_func in tests:
-            try:
-                if test_func():
-                    passed += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                print(f"❌ FAIL {test_name}: Unexpected error - {str(e)}")
-                failed += 1
-            print("-" * 70)
+        passed, failed = self.run_tests(tests, "-" * 70)
         
         # Summary
         print("=" * 70)